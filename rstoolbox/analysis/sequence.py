@@ -16,8 +16,6 @@
 .. func:: positional_enrichment
 """
 # Standard Libraries
-import copy
-import collections
 import re
 import operator
 
@@ -169,30 +167,22 @@ def sequential_frequencies( df, seqID, query="sequence", seqType="protein",
            ...: df.head()
     """
     from rstoolbox.components import SequenceFrame
-
-    def count_instances( seq, table ):
-        t = copy.deepcopy(table)
-        c = collections.Counter(seq)
-        for aa in table:
-            _ = c[aa]
-            if _ > 0:
-                t[aa] = float(_) / len(seq)
-            else:
-                t[aa] = 0
-        return t
+    from rstoolbox.components.designFrame import _positional_counts, _symbol_codes
 
     # Cast if possible, so that we can access the different methods of DesignFrame
     if df._subtyp != 'design_frame' and isinstance(df, pd.DataFrame):
         from rstoolbox.components import DesignFrame
         df = DesignFrame(df)
 
-    # Get all sequences; exclude empty ones (might happen) and uppercase all residues.
-    sserie = df.get_sequential_data(query, seqID).replace('', np.nan).dropna().str.upper()
+    # Count residues per position; empty sequences (might happen) do not count
+    # and all residues are uppercased.
+    counts, covered = _positional_counts(df.get_sequence_matrix(seqID, query), upper=True)
     # Get the table to fill
     table, extra = _get_sequential_table( seqType )
     # Fill the table with the frequencies
-    sserie = sserie.apply(lambda x: pd.Series(list(x)))
-    sserie = sserie.apply(lambda x: pd.Series(count_instances(x.str.cat(), table))).T
+    table = list(table)
+    sserie = pd.DataFrame(counts[:, _symbol_codes("".join(table))] / covered[:, None].astype(float),
+                          columns=table)
 
     # Create the SequenceFrame
     dfo = SequenceFrame(sserie)
@@ -359,6 +349,7 @@ def positional_sequence_similarity( df, seqID=None, ref_seq=None,
     """
     from rstoolbox.components import DesignFrame, FragmentFrame
     from rstoolbox.components import get_selection
+    from rstoolbox.components.designFrame import _positional_counts, _SEQUENCE_SYMBOLS, _SEQUENCE_PAD
 
     data = {"identity_perc": [], "positive_perc": []}
     # Get matrix data
@@ -373,20 +364,27 @@ def positional_sequence_similarity( df, seqID=None, ref_seq=None,
             raise KeyError("Sequence {} not found in decoys.".format(seqID))
 
         ref_seq = ref_seq if ref_seq is not None else df.get_reference_sequence(seqID)
-        seqdata = df.get_sequence(seqID)
-        seqdata = seqdata.apply(lambda x: pd.Series(list(x)))
-        for _, i in enumerate(seqdata.columns.values):
-            qseq = "".join(seqdata[i].tolist())
-            _, idn, pos, _ = _positional_similarity( qseq, ref_seq[_], mat )
-            data["identity_perc"].append(float(idn) / float(len(qseq)))
-            data["positive_perc"].append(float(pos) / float(len(qseq)))
+        # Each residue type found in a position is scored only once.
+        counts, covered = _positional_counts(df.get_sequence_matrix(seqID))
+        scores = {}
+        for i in range(counts.shape[0]):
+            idn, pos = 0, 0
+            for code in np.flatnonzero(counts[i, :_SEQUENCE_PAD]):
+                qseqi = _SEQUENCE_SYMBOLS[code]
+                if (qseqi, ref_seq[i]) not in scores:
+                    scores[(qseqi, ref_seq[i])] = mat.get_value(qseqi, ref_seq[i])
+                idn += counts[i, code] if qseqi == ref_seq[i] else 0
+                pos += counts[i, code] if scores[(qseqi, ref_seq[i])] > 0 else 0
+            data["identity_perc"].append(float(idn) / float(covered[i]))
+            data["positive_perc"].append(float(pos) / float(covered[i]))
 
     elif isinstance(df, FragmentFrame):
         if ref_seq is None:
             raise AttributeError("ref_seq needs to be provided")
 
+        residues = df._position_values("aa")
         for i in df["position"].drop_duplicates().values:
-            qseq = "".join(df[df["position"] == i]["aa"].values)
+            qseq = "".join(residues[i])
             _, idn, pos, _ = _positional_similarity( qseq, ref_seq[i - 1], mat )
             data["identity_perc"].append(float(idn) / float(len(qseq)))
             data["positive_perc"].append(float(pos) / float(len(qseq)))
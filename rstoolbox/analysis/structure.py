@@ -15,6 +15,7 @@
 import collections
 
 # External Libraries
+import numpy as np
 import pandas as pd
 
 # This Library
@@ -62,6 +63,7 @@ def positional_structural_count( df, seqID=None, key_residues=None ):
     """
     from rstoolbox.components import DesignFrame, FragmentFrame
     from rstoolbox.components import get_selection
+    from rstoolbox.components.designFrame import _positional_counts, _symbol_codes
     data = {"H": [], "E": [], "L": []}
 
     if isinstance(df, DesignFrame):
@@ -69,18 +71,14 @@ def positional_structural_count( df, seqID=None, key_residues=None ):
             raise AttributeError("seqID needs to be provided")
         if not "structure_{}".format(seqID) in df:
             raise KeyError("Structure {} not found in decoys.".format(seqID))
-        seqdata = df.get_sequential_data('structure', seqID)
-        seqdata = seqdata.apply(lambda x: pd.Series(list(x)))
-        for _, i in enumerate(seqdata.columns.values):
-            qseq = "".join(seqdata[i].tolist())
-            sse = collections.Counter(qseq)
-            data["H"].append(float(sse["H"]) / float(len(qseq)))
-            data["E"].append(float(sse["E"]) / float(len(qseq)))
-            data["L"].append(float(sse["L"]) / float(len(qseq)))
+        counts, covered = _positional_counts(df.get_sequence_matrix(seqID, 'structure'))
+        for sse, code in zip("HEL", _symbol_codes("HEL")):
+            data[sse] = list(counts[:, code] / covered.astype(float))
 
     elif isinstance(df, FragmentFrame):
+        sses = df._position_values("sse")
         for i in df["position"].drop_duplicates().values:
-            qseq = "".join(df[df["position"] == i]["sse"].values).upper()
+            qseq = "".join(sses[i]).upper()
             sse = collections.Counter(qseq)
             data["H"].append(float(sse["H"]) / float(len(qseq)))
             data["E"].append(float(sse["E"]) / float(len(qseq)))
@@ -143,6 +141,8 @@ def positional_structural_identity( df, seqID=None, ref_sse=None, key_residues=N
     """
     from rstoolbox.components import DesignFrame, FragmentFrame
     from rstoolbox.components import get_selection
+    from rstoolbox.components.designFrame import _positional_counts, _symbol_codes
+    from rstoolbox.components.designFrame import _SEQUENCE_SYMBOLS, _SEQUENCE_PAD
     data = {"sse": [], "max_sse": [], "identity_perc": []}
 
     if isinstance(df, DesignFrame):
@@ -153,21 +153,25 @@ def positional_structural_identity( df, seqID=None, ref_sse=None, key_residues=N
         if not "structure_{}".format(seqID) in df:
             raise KeyError("Structure {} not found in decoys.".format(seqID))
         ref_sse = ref_sse if ref_sse is not None else df.get_reference_structure(seqID)
-        seqdata = df.get_structure(seqID)
-        seqdata = seqdata.apply(lambda x: pd.Series(list(x)))
-        for _, i in enumerate(seqdata.columns.values):
-            qseq = "".join(seqdata[i].tolist())
-            sse = collections.Counter(qseq)
+        matrix = df.get_sequence_matrix(seqID, 'structure')
+        counts, covered = _positional_counts(matrix)
+        for i in range(counts.shape[0]):
+            # Ties go to the first structure type found, as in Counter.most_common
+            top = np.flatnonzero(counts[i, :_SEQUENCE_PAD] == counts[i, :_SEQUENCE_PAD].max())
+            if len(top) > 1:
+                top = [top[np.argmin([np.argmax(matrix[:, i] == x) for x in top])]]
             data["sse"].append(ref_sse[i])
-            data["max_sse"].append(sse.most_common(1)[0][0])
-            data["identity_perc"].append(float(sse[ref_sse[i - 1]]) / float(len(qseq)))
+            data["max_sse"].append(_SEQUENCE_SYMBOLS[top[0]])
+            code = _symbol_codes(ref_sse[i - 1])[0]
+            data["identity_perc"].append(float(counts[i, code]) / float(covered[i]))
 
     elif isinstance(df, FragmentFrame):
         if ref_sse is None:
             raise AttributeError("ref_sse needs to be provided")
 
+        sses = df._position_values("sse")
         for i in df["position"].drop_duplicates().values:
-            qseq = "".join(df[df["position"] == i]["sse"].values).upper()
+            qseq = "".join(sses[i]).upper()
             sse = collections.Counter(qseq)
             data["sse"].append(ref_sse[i - 1])
             data["max_sse"].append(sse.most_common(1)[0][0])
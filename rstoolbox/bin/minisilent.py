@@ -16,11 +16,18 @@ It is very convenient to store mid-step data in git repositories.
 import argparse
 import gzip
 import os
+import re
+import sys
+import time
+import shutil
+import tempfile
+import multiprocessing
 
 # External Libraries
 
 # This Library
-from rstoolbox.io import open_rosetta_file
+import rstoolbox.core as core
+from rstoolbox.io.rosetta import _gather_file_list, _filter_rosetta_lines
 
 
 def make_parser( *args, **kwds ):
@@ -36,6 +43,17 @@ def make_parser( *args, **kwds ):
     parser.add_argument('-out:file', dest='ofile', action='store',
                         help='Output name for minisilent (can be gzipped).',
                         default=None)
+    parser.add_argument('-out:dir', dest='odir', action='store',
+                        help='Write one minisilent per input file in this directory '
+                        '(keeps the compression of the input). Incompatible with ``-out:file``.',
+                        default=None)
+    parser.add_argument('-unique', dest='unique', action='store_true',
+                        help='Keep only the first decoy with each description.', default=False)
+    parser.add_argument('-remarks', dest='remarks', action='store', nargs='+',
+                        help='Keep only these REMARK types (i.e. DSSP PHI PSI).', default=None)
+    parser.add_argument('-workers', dest='workers', action='store', type=int,
+                        help='Number of files processed at the same time. '
+                        'Defaults to the system.cpu option.', default=None)
     parser.add_argument('-overwrite', dest='force', action='store_true',
                         help='Allows overwriting existing file.', default=False)
     return parser
@@ -49,20 +67,134 @@ def get_options( parser ):
         raise AttributeError("A filename or a prefix for multiple filename have to be provided.")
     if options.ifile is not None and options.ifiles is not None:
         raise AttributeError("Provide only ONE file or a prefix for multiple files, not both.")
-    if options.ofile is None:
-        raise AttributeError("Output filename must be provided")
-    if os.path.isfile( options.ofile ) and not options.force:
+    if options.ofile is None and options.odir is None:
+        raise AttributeError("Output filename or directory must be provided")
+    if options.ofile is not None and options.odir is not None:
+        raise AttributeError("Provide only ONE output filename or directory, not both.")
+    if options.ofile is not None and os.path.isfile( options.ofile ) and not options.force:
         raise IOError("File {0} exists and will not be overwritten.".format( options.ofile ) )
     return options
 
 
+def filter_decoys( lines, counts, seen=None, remarks=None ):
+    """Drop the REMARK lines of unwanted types and, if a ``seen`` set of descriptions
+    is provided, the decoys whose description has already been seen.
+
+    Written and skipped decoys are counted in ``counts``.
+    """
+    skip = False
+    for line in lines:
+        fields = line.split()
+        if remarks is not None and fields[0] == "REMARK" and fields[1] not in remarks:
+            continue
+        if fields[0] == "SCORE:" and fields[-1] != "description":
+            skip = seen is not None and fields[-1] in seen
+            counts['skipped' if skip else 'decoys'] += 1
+            if seen is not None:
+                seen.add(fields[-1])
+        if skip:
+            continue
+        yield line
+
+
+def compact_file( args ):
+    """Write the parsable content of a silent file.
+
+    :return: :func:`tuple` with input file, output file and decoy counts.
+    """
+    ifile, ofile, unique, remarks = args
+    counts = {'decoys': 0, 'skipped': 0}
+    ifd = gzip.open( ifile, "rb" ) if ifile.endswith(".gz") else open( ifile, "rb" )
+    ofd = gzip.open( ofile, "wb" ) if ofile.endswith(".gz") else open( ofile, "wb" )
+    try:
+        lines = (line.decode('utf-8') for line in ifd)
+        lines = (x[0] for x in _filter_rosetta_lines( lines, check_symmetry=False ))
+        for line in filter_decoys( lines, counts, set() if unique else None, remarks ):
+            ofd.write( line.encode('utf-8') )
+    finally:
+        ifd.close()
+        ofd.close()
+    return ifile, ofile, counts
+
+
+def output_names( files, odir ):
+    """One minisilent per input file, keeping its compression.
+    """
+    names = []
+    for f in files:
+        name = re.sub(r'\.gz$', '', os.path.basename(f))
+        name = os.path.splitext(name)[0] + '.minisilent' + ('.gz' if f.endswith('.gz') else '')
+        names.append(os.path.join(odir, name))
+    if len(set(names)) != len(names):
+        raise ValueError("Input files with the same name would write the same output.")
+    return names
+
+
 def main( options ):
-    ofile = options.ofile
-    is_gz = ofile.endswith(".gz")
-    fd = gzip.open( ofile, "wb" ) if is_gz else open( ofile, "w" )
+    start = time.time()
     infile = options.ifile if options.ifile is not None else options.ifiles
-    for line, _, _, _ in open_rosetta_file( infile, options.ifile is None, check_symmetry=False ):
-        fd.write( line.encode('utf-8') if is_gz else line )
+    files = _gather_file_list( infile, options.ifile is None )
+    odir = getattr(options, 'odir', None)
+    unique = getattr(options, 'unique', False)
+    remarks = getattr(options, 'remarks', None)
+    remarks = set(remarks) if remarks is not None else None
+    workers = getattr(options, 'workers', None)
+    workers = workers if workers is not None else core.get_option("system", "cpu")
+    workers = min(max(int(workers), 1), len(files))
+
+    # Merged output is assembled from temporary per-file outputs.
+    tmpdir = None
+    if odir is None:
+        tmpdir = tempfile.mkdtemp(prefix="rstoolbox_minisilent_")
+        ofiles = [os.path.join(tmpdir, '{}.minisilent'.format(i)) for i in range(len(files))]
+    else:
+        if not os.path.isdir( odir ):
+            os.makedirs( odir )
+        ofiles = output_names( files, odir )
+        for f in ofiles:
+            if os.path.isfile( f ) and not options.force:
+                raise IOError("File {0} exists and will not be overwritten.".format( f ) )
+
+    try:
+        args = [(f, o, unique, remarks) for f, o in zip(files, ofiles)]
+        if workers == 1:
+            results = [compact_file(x) for x in args]
+        else:
+            pool = multiprocessing.Pool(workers)
+            try:
+                results = pool.map(compact_file, args)
+            finally:
+                pool.close()
+                pool.join()
+
+        counts = {'decoys': sum([x[2]['decoys'] for x in results]),
+                  'skipped': sum([x[2]['skipped'] for x in results])}
+        if odir is None:
+            counts['decoys'] = 0
+            seen = set() if unique else None
+            is_gz = options.ofile.endswith(".gz")
+            fd = gzip.open( options.ofile, "wb" ) if is_gz else open( options.ofile, "wb" )
+            try:
+                for f in ofiles:
+                    with open(f, "rb") as ifd:
+                        lines = (line.decode('utf-8') for line in ifd)
+                        for line in filter_decoys( lines, counts, seen ):
+                            fd.write( line.encode('utf-8') )
+            finally:
+                fd.close()
+            ofiles = [options.ofile]
+        size_in = sum([os.path.getsize(f) for f in files]) / (1024.0 * 1024.0)
+        size_out = sum([os.path.getsize(f) for f in ofiles]) / (1024.0 * 1024.0)
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    elapsed = time.time() - start
+    sys.stdout.write("{0} files: {1} decoys written, {2} repeated skipped; {3:.2f} MB -> {4:.2f} MB "
+                     "in {5:.2f}s ({6:.2f} MB/s, {7} workers)\n".format(
+                         len(files), counts['decoys'], counts['skipped'], size_in, size_out,
+                         elapsed, size_in / max(elapsed, 1e-6), workers))
+    return counts
 
 
 if __name__ == '__main__':
@@ -18,7 +18,6 @@ import os
 # External Libraries
 
 # This Library
-from rstoolbox.io import parse_rosetta_file
 
 
 def make_parser( *args, **kwds ):
@@ -56,29 +55,39 @@ def new_names( count, prefix ):
     return "{0}_{1:05d}".format(prefix, count)
 
 
+def rename_silent( ifile, ofile, prefix, blocksize=10000 ):
+    """Stream the silent file, swapping the description (last token) of each line.
+
+    Decoys are numbered in the order in which their ``SCORE`` line appears, so only
+    the name map is kept in memory.
+
+    :return: :class:`int` - number of renamed decoys.
+    """
+    names = {}
+    ifd = gzip.open( ifile, "rb" ) if ifile.endswith(".gz") else open( ifile, "rb" )
+    ofd = gzip.open( ofile, "wb" ) if ofile.endswith(".gz") else open( ofile, "wb" )
+    try:
+        block = []
+        for line in ifd:
+            body = line.rstrip(b"\r\n")
+            head, sep, tag = body.rpartition(b" ")
+            if line.startswith(b"SCORE:") and tag not in names and tag != b"description":
+                names[tag] = new_names(len(names) + 1, prefix).encode("utf-8")
+            if tag in names:
+                line = head + sep + names[tag] + line[len(body):]
+            block.append(line)
+            if len(block) >= blocksize:
+                ofd.write(b"".join(block))
+                block = []
+        ofd.write(b"".join(block))
+    finally:
+        ifd.close()
+        ofd.close()
+    return len(names)
+
+
 def main( options ):
-    # Get names and make new ones
-    names = parse_rosetta_file( options.ifile, {"scores": ["description"]} )
-    names["count"] = names.index + 1
-    names["new"]   = names.apply( lambda row: new_names(row["count"], options.prefix), axis=1 )
-
-    # Load the silentfile and change names
-    is_gz = options.ifile.endswith(".gz")
-    fd   = gzip.open( options.ifile ) if is_gz else open( options.ifile )
-    if not is_gz:
-        data = "".join(fd.readlines())
-    else:
-        data = "".join([_.decode('utf8') for _ in fd.readlines()])
-    fd.close()
-
-    for _, row in names.iterrows():
-        data = data.replace(row["description"], row["new"])
-
-    # Save and write
-    is_gz = options.ofile.endswith(".gz")
-    fd = gzip.open( options.ofile, "w" ) if is_gz else open( options.ofile, "w" )
-    fd.write(data.encode('utf-8') if is_gz else data)
-    fd.close()
+    rename_silent( options.ifile, options.ofile, options.prefix )
 
 
 if __name__ == '__main__':
@@ -37,6 +37,8 @@ definition term           description
 :ref:`graft_ranges`       When using the MotifGraftMover, multi-columns will
                           be created when more than one segment is grafted.
                           Provide here the number of segments.
+:ref:`filters`            Conditions that a decoy needs to fulfil to be
+                          loaded.
 ========================= ===================================================
 
 .. tip::
@@ -283,10 +285,28 @@ segments inserted needs to be provided in order to properly be processed::
     and, thus, with the ``key_residues`` attribute present in some functions, one can call
     string replace:
     ``df['graft_out_scaffold_ranges'] = df['graft_out_scaffold_ranges'].str.replace(',', '-')``.
+
+.. _filters:
+
+filters
+-------
+
+Only decoys fulfilling all the provided conditions are loaded. Conditions are checked
+directly on the ``SCORE`` line, so the rest of the data of the rejected decoys (sequences,
+structures, dihedrals...) is never processed. Each condition is a list with the name of
+the score (as it appears in the file), an operator and a value::
+
+    {'filters': [['score', '<', -10], ['description', 'startswith', 'nubinitio']]}
+
+Available operators are ``<``, ``<=``, ``>``, ``>=``, ``==`` and ``!=``, which compare
+numerically unless the value is a string, and ``startswith``, ``endswith`` and ``contains``,
+which work on the text of the score.
 """
 # Standard Libraries
 import re
+import operator
 import itertools
+from collections import OrderedDict
 
 # External Libraries
 import six
@@ -296,13 +316,19 @@ import numpy as np
 
 __all__ = ["Description"]
 
+_OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+              '==': operator.eq, '!=': operator.ne,
+              'startswith': lambda a, b: a.startswith(b),
+              'endswith': lambda a, b: a.endswith(b),
+              'contains': lambda a, b: b in a}
+
 
 class Description( object ):
 
     _PARAMS = [
         "scores", "scores_ignore", "scores_rename", "scores_by_residue",
         "scores_missing", "naming", "sequence", "structure", "psipred",
-        "dihedrals", "labels", "graft_ranges"
+        "dihedrals", "labels", "graft_ranges", "filters"
     ]
 
     def __init__( self, **params ):
@@ -326,10 +352,12 @@ class Description( object ):
         self.dihedrals         = params.get("dihedrals",         None)
         self.labels            = params.get("labels",            None)
         self.graft_ranges      = params.get("graft_ranges",      None)
+        self.filters           = params.get("filters",           None)
 
         # Others
         self._per_residues = ["residue_ddg_"]
         self._scores       = {}
+        self._plans        = {}
 
         # Check that the "per_residue" scores requested are known.
         if self.scores_by_residue is not None:
@@ -354,6 +382,12 @@ class Description( object ):
             if not isinstance(self.graft_ranges, int):
                 raise AttributeError("Unknown graft_ranges value: {}".format(self.graft_ranges))
 
+        # filters are (score, operator, value)
+        if self.filters is not None:
+            for f in self.filters:
+                if len(f) != 3 or f[1] not in _OPERATORS:
+                    raise AttributeError("Unknown filter: {}".format(f))
+
     def wanted_score( self, score_name ):
         # skip per-residue values when nod asked for
         for k in self._per_residues:
@@ -406,6 +440,70 @@ class Description( object ):
                     headers[i] = [head]
             return list(itertools.chain(*headers))
 
+    def get_column_plan( self, header ):
+        """Compile which score columns of a header are kept and how they are named.
+
+        The plan is computed once per different header, so that each decoy
+        only needs index lookups.
+
+        :param header: Score names as they appear in the header (without **description**).
+        :type header: :func:`list` of :class:`str`
+
+        :return: :func:`tuple` with a :func:`list` of (column index, score name),
+            a :func:`list` of (score name, column indexes sorted by residue) for
+            per-residue scores, the name of the **description** column (:data:`None`
+            if it is not wanted) and the :ref:`filters` as (column index, operator, value),
+            where the **description** has index -1.
+
+        :raises:
+            :AttributeError: if a filter targets a score that is not in the header.
+        """
+        key = tuple(header)
+        if key not in self._plans:
+            scores, per_res = [], OrderedDict()
+            for i, h in enumerate(header):
+                if self.wanted_per_residue_score( h ):
+                    resnum = int(re.findall(r'\d+$', h)[0])
+                    per_res.setdefault(re.sub(r'\d+$', "", h), []).append((resnum, i))
+                elif self.wanted_score( h ):
+                    scores.append((i, self.score_name( h )))
+            per_res = [(k, [i for _, i in sorted(v)]) for k, v in per_res.items()]
+            description = self.score_name('description') if self.wanted_score('description') else None
+            filters = []
+            for name, op, value in self.filters or []:
+                if name != 'description' and name not in header:
+                    raise AttributeError("Unknown score {} to filter by".format(name))
+                filters.append((-1 if name == 'description' else header.index(name),
+                                _OPERATORS[op], value))
+            self.check_naming( header )
+            self._plans[key] = (scores, per_res, description, filters)
+        return self._plans[key]
+
+    def keep_decoy( self, filters, values, description ):
+        """Evaluate the :ref:`filters` over the values of a decoy.
+
+        :param filters: Filters as compiled by :meth:`.get_column_plan`.
+        :param values: Values of the scores as read.
+        :type values: :func:`list` of :class:`str`
+        :param str description: Identifier of the decoy.
+
+        :return: :class:`bool`
+        """
+        for cv, op, value in filters:
+            text = description if cv < 0 else values[cv] if cv < len(values) else None
+            if text is None:
+                return False
+            if isinstance(value, six.string_types):
+                if not op(str(text), value):
+                    return False
+                continue
+            try:
+                if not op(float(text), value):
+                    return False
+            except ValueError:
+                return False
+        return True
+
     def check_naming( self, header ):
         if self.naming is None:
             return
@@ -13,14 +13,17 @@
 import os
 from distutils.version import LooseVersion
 import itertools
+import multiprocessing
 
 # External Libraries
+import six
 import pandas as pd
 import numpy as np
 
 # This Library
 from .rsbase import RSBaseDesign
 import rstoolbox.analysis as ra
+import rstoolbox.core as core
 
 
 __all__ = ["DesignSeries", "DesignFrame"]
@@ -40,9 +43,199 @@ def _metadata_defaults(name):
         return set()
     if name == "_reference":
         return {}
+    if name == "_sequence_matrix":
+        return {}
     return None
 
 
+#: Symbols of the encoded sequence matrices; code ``i`` is ``_SEQUENCE_ALPHABET[i]``.
+_SEQUENCE_ALPHABET = tuple("ACDEFGHIKLMNPQRSTVWYBJOUXZ-*." + "acdefghiklmnpqrstvwybjouxz")
+#: Code filling the positions after the end of shorter sequences.
+_SEQUENCE_PAD = 255
+#: Code of all the symbols that are not in the alphabet.
+_SEQUENCE_UNKNOWN = 254
+#: Symbol of each code; unknown symbols read back as ``X`` and padding as an empty string.
+_SEQUENCE_SYMBOLS = np.array(list(_SEQUENCE_ALPHABET) + [""] * (256 - len(_SEQUENCE_ALPHABET)), dtype=object)
+_SEQUENCE_SYMBOLS[_SEQUENCE_UNKNOWN] = "X"
+_SEQUENCE_SYMBOLS.flags.writeable = False
+_SEQUENCE_LOOKUP = dict([(x, i) for i, x in enumerate(_SEQUENCE_ALPHABET)])
+_SEQUENCE_CODES = np.full(256, _SEQUENCE_UNKNOWN, dtype=np.uint8)
+_SEQUENCE_CODES[[ord(x) for x in _SEQUENCE_ALPHABET]] = np.arange(len(_SEQUENCE_ALPHABET))
+#: Code of the uppercase version of each symbol.
+_SEQUENCE_UPPER = np.arange(256).astype(np.uint8)
+_SEQUENCE_UPPER[:len(_SEQUENCE_ALPHABET)] = _SEQUENCE_CODES[[ord(x.upper()) for x in _SEQUENCE_ALPHABET]]
+_SEQUENCE_CODES.flags.writeable = False
+_SEQUENCE_UPPER.flags.writeable = False
+_SEQUENCE_COLUMNS = {'sequence': 'sequence_', 'structure': 'structure_',
+                     'structure_prediction': 'psipred_'}
+
+
+def _is_rule_list( item ):
+    """Tell if ``item`` is a list of ``(position, residues)`` rules rather than a single rule.
+
+    A single rule can be given both as a :class:`tuple` and as a :func:`list`
+    (``(2, 'C')`` or ``[2, 'C']``); a list of rules has rules as its items.
+    """
+    if not isinstance(item, (list, tuple)):
+        return False
+    return len(item) == 0 or isinstance(item[0], (list, tuple))
+
+
+def _encode_sequences( values ):
+    """Encode sequences into a ``uint8`` matrix through :data:`_SEQUENCE_ALPHABET`.
+
+    Shorter (or missing) sequences are filled with :data:`_SEQUENCE_PAD` and symbols
+    that are not in the alphabet with :data:`_SEQUENCE_UNKNOWN`.
+    """
+    values = [x if isinstance(x, six.string_types) else "" for x in values]
+    lengths = np.array([len(x) for x in values], dtype=np.int64)
+    matrix = np.full((len(values), lengths.max() if len(values) > 0 else 0),
+                     _SEQUENCE_PAD, dtype=np.uint8)
+    codes = _symbol_codes("".join(values))
+    starts = np.cumsum(lengths) - lengths
+    rows = np.repeat(np.arange(len(values)), lengths)
+    matrix[rows, np.arange(len(codes)) - np.repeat(starts, lengths)] = codes
+    return matrix
+
+
+def _decode_sequences( matrix ):
+    """Symbols of an encoded sequence matrix through :data:`_SEQUENCE_SYMBOLS`.
+
+    :return: :class:`~numpy.ndarray` of :class:`str`
+    """
+    return _SEQUENCE_SYMBOLS[matrix]
+
+
+def _symbol_codes( symbols ):
+    """Codes of each symbol in a :class:`str`; :data:`_SEQUENCE_UNKNOWN` for those
+    that are not in the alphabet.
+    """
+    try:
+        return _SEQUENCE_CODES[np.frombuffer(symbols.encode('ascii'), dtype=np.uint8)]
+    except UnicodeEncodeError:
+        return np.array([_SEQUENCE_LOOKUP.get(x, _SEQUENCE_UNKNOWN) for x in symbols], dtype=np.uint8)
+
+
+def _same_values( old, new ):
+    """Check if two arrays of objects hold the same values.
+
+    Unchanged values are the same objects, so this is cheap for immutable strings.
+    """
+    if old.shape != new.shape:
+        return False
+    diff = old != new
+    return not diff.any() or bool((pd.isnull(old[diff]) & pd.isnull(new[diff])).all())
+
+
+def _positional_counts( matrix, upper=False ):
+    """Count each symbol per sequence position.
+
+    :return: :class:`~numpy.ndarray` (positions x 256) with the counts and
+        :class:`~numpy.ndarray` with the number of sequences covering each position.
+    """
+    if upper:
+        matrix = _SEQUENCE_UPPER[matrix]
+    length = matrix.shape[1]
+    flat = (np.arange(length, dtype=np.int64) * 256 + matrix).ravel()
+    counts = np.bincount(flat, minlength=length * 256).reshape(length, 256)
+    return counts, matrix.shape[0] - counts[:, _SEQUENCE_PAD]
+
+
+#: Data shared by the workers of :meth:`.DesignFrame.sequence_distance`.
+_DISTANCE_DATA = {}
+
+
+def _distance_weights( symbols, matrix=None ):
+    """Which pairs of symbols count as a match: identities and, if a substitution
+    matrix is provided, pairs with a positive score.
+
+    :return: :class:`~numpy.ndarray` (symbols x symbols) of ``float32``.
+    """
+    weights = np.eye(len(symbols), dtype=np.float32)
+    if matrix is None:
+        return weights
+    for i, j in itertools.permutations(range(len(symbols)), 2):
+        if _SEQUENCE_PAD in (symbols[i], symbols[j]):
+            continue
+        try:
+            score = matrix.get_value(_SEQUENCE_SYMBOLS[symbols[i]], _SEQUENCE_SYMBOLS[symbols[j]])
+        except KeyError:
+            continue
+        weights[i, j] = 1 if score > 0 else 0
+    return weights
+
+
+def _distance_init( query, target, weights, output, top, blocksize, own ):
+    """Set the data of the distance workers; once per process.
+    """
+    _DISTANCE_DATA.update(query=query, target=target, weights=weights, output=output,
+                          top=top, blocksize=blocksize, own=own)
+
+
+def _distance_rows( rows ):
+    """Distances of a tile of ``query`` sequences against all the ``target`` sequences.
+
+    Sequences are compared as one-hot matrices, so the matches between a query tile
+    and a target tile are a single matrix product. Targets are processed ``blocksize``
+    at a time; memory depends on the tile size and not on the number of sequences.
+
+    :param slice rows: Query sequences to evaluate.
+
+    :return: depending on the ``output``, the distance rows (``square``), the start and
+        values of the piece of the condensed distances (``condensed``) or the indices
+        and distances of the ``top`` closest targets (``top``).
+    """
+    data = _DISTANCE_DATA
+    query, target, weights = data['query'], data['target'], data['weights']
+    size, length, total = weights.shape[0], query.shape[1], target.shape[0]
+    ridx = np.arange(rows.start, rows.stop)
+    onehot = np.eye(size, dtype=np.float32)[query[rows]].reshape(len(ridx), -1)
+
+    first = rows.start + 1 if data['output'] == 'condensed' else 0
+    offsets = ridx * total - ridx * (ridx + 1) // 2
+    if data['output'] == 'condensed':
+        end = rows.stop * total - rows.stop * (rows.stop + 1) // 2
+        piece = np.zeros(end - offsets[0], dtype=np.min_scalar_type(length))
+    # Closest targets are kept as distance * total + index; ties go to the first target.
+    pieces, best = [], np.zeros((len(ridx), 0), dtype=np.int64)
+    for start in range(first, total, data['blocksize']):
+        cols = np.arange(start, min(start + data['blocksize'], total))
+        match = onehot.dot(weights.T[target[cols]].reshape(len(cols), -1).T)
+        dist = length - np.rint(match).astype(np.int64)
+        if data['output'] == 'square':
+            pieces.append(dist)
+        elif data['output'] == 'condensed':
+            keep = cols[None, :] > ridx[:, None]
+            where = offsets[:, None] - offsets[0] + cols[None, :] - ridx[:, None] - 1
+            piece[where[keep]] = dist[keep]
+        else:
+            if data['own']:
+                inside = (ridx >= cols[0]) & (ridx <= cols[-1])
+                dist[np.flatnonzero(inside), ridx[inside] - cols[0]] = length + 1
+            best = np.hstack([best, dist * total + cols])
+            if best.shape[1] > data['top']:
+                best = np.partition(best, data['top'] - 1, axis=1)[:, :data['top']]
+
+    if data['output'] == 'square':
+        return np.hstack(pieces)
+    if data['output'] == 'condensed':
+        return offsets[0], piece
+    best = np.sort(best, axis=1)
+    return best % total, best // total
+
+
+def _dihedral_block( values ):
+    """Stack per-decoy dihedral arrays into a single ``float32`` matrix.
+
+    :return: :class:`~numpy.ndarray` or :data:`None` if the values cannot be stacked.
+    """
+    if len(values) == 0 or not all([isinstance(x, (np.ndarray, list)) for x in values]):
+        return None
+    if len(set([len(x) for x in values])) > 1:
+        return None
+    return np.ascontiguousarray(np.vstack(values), dtype=np.float32)
+
+
 class DesignSeries( pd.Series, RSBaseDesign ):
     """
     The :class:`.DesignSeries` extends the :class:`~pandas.Series`
@@ -135,7 +328,7 @@ class DesignFrame( pd.DataFrame, RSBaseDesign ):
         :func:`.parse_rosetta_file`
 
     """
-    _metadata = ['_reference', '_source_files']
+    _metadata = ['_reference', '_source_files', '_sequence_matrix']
     _subtyp = 'design_frame'
 
     def __init__( self, *args, **kwargs ):
@@ -151,6 +344,49 @@ class DesignFrame( pd.DataFrame, RSBaseDesign ):
         super(DesignFrame, self).__init__(*args, **kwargs)
         self._reference = reference
         self._source_files = source
+        self._sequence_matrix = {}
+
+    def get_sequence_matrix( self, seqID, query="sequence" ):
+        """Sequences of ``seqID`` as a matrix of ``uint8`` codes (decoys x positions).
+
+        Each symbol is encoded with its position in a fixed alphabet
+        (``ACDEFGHIKLMNPQRSTVWYBJOUXZ-*.`` followed by the lowercase letters);
+        positions after the end of shorter sequences are filled with ``255``.
+
+        All the symbols that are not in the alphabet share the code ``254``, so codes
+        do not depend on the data that was read before.
+
+        The matrix is built the first time it is requested and kept with the
+        :class:`.DesignFrame`; it is rebuilt when the content of the column changes.
+        The returned matrix is read-only.
+
+        :param str seqID: |seqID_param|.
+        :param str query: Query type: ``sequence``, ``structure``, ``structure_prediction``.
+
+        :return: :class:`~numpy.ndarray`
+
+        :raises:
+            :KeyError: |seqID_error|.
+            :KeyError: If ``query`` has a non-accepted value.
+
+        .. seealso::
+            :meth:`.DesignFrame.get_sequential_data`
+        """
+        if query.lower() not in _SEQUENCE_COLUMNS:
+            raise KeyError("Available queries are: {}".format(",".join(sorted(_SEQUENCE_COLUMNS))))
+        column = _SEQUENCE_COLUMNS[query.lower()] + seqID
+        values = np.array(self.get_sequential_data(query, seqID).values, dtype=object)
+        cache = getattr(self, '_sequence_matrix', None) or {}
+        # The cached matrix keeps the values it was built from.
+        if column in cache and _same_values(cache[column][0], values):
+            return cache[column][1]
+        matrix = _encode_sequences(values)
+        matrix.setflags(write=False)
+        # A new dictionary, as the cache might be shared with the frames it comes from.
+        cache = dict(cache)
+        cache[column] = (values, matrix)
+        self._sequence_matrix = cache
+        return matrix
 
     def clean_rosetta_suffix( self ):
         """Remove the numerical suffix that **Rosetta** adds to the output identifiers.
@@ -166,12 +402,52 @@ class DesignFrame( pd.DataFrame, RSBaseDesign ):
         df['description'] = df['description'].str.replace(r'\_\d+$', '', regex=True)
         return df
 
-    def retrieve_sequences_from_pdbs( self, prefix=None, dropna=True  ):
+    def compact( self ):
+        """Reduce the memory used by the data.
+
+        #. Integer scores are downcasted to the smallest integer type that holds them.
+        #. Float scores are stored as ``float32`` when the difference with the original \
+        values is below the precision with which **Rosetta** writes them (3 decimals).
+        #. ``description`` becomes a :class:`~pandas.Categorical`.
+        #. ``phi_<seqID>`` and ``psi_<seqID>`` values are stored in a single ``float32`` \
+        block per ``seqID``; each row keeps a view of it, so getters such as \
+        :meth:`.DesignFrame.get_phi` keep working.
+
+        Dihedral columns with missing values or decoys of different length are left as they are.
+
+        :return: :class:`.DesignFrame`
+
+        .. seealso::
+            :func:`.parse_rosetta_file`
+        """
+        df = self.copy()
+        for c in df.columns:
+            values = df[c].values
+            if c == 'description':
+                df[c] = df[c].astype('category')
+            elif c.startswith('phi_') or c.startswith('psi_'):
+                block = _dihedral_block(values)
+                if block is not None:
+                    df[c] = pd.Series(list(block), index=df.index, dtype=object)
+            elif values.dtype.kind in ['i', 'u']:
+                df[c] = pd.to_numeric(df[c], downcast='integer')
+            elif values.dtype == np.float64:
+                low = values.astype(np.float32)
+                diff = np.abs(low.astype(np.float64) - values)
+                same = np.isnan(values) == np.isnan(low)
+                if same.all() and (np.isnan(diff) | (diff < 5e-4)).all():
+                    df[c] = low
+        return df
+
+    def retrieve_sequences_from_pdbs( self, prefix=None, dropna=True, workers=None ):
         """Obtain sequence data related to the decoys through their Rosetta-generated PDB files.
 
         This is a method that might be necessary when reading from score files, as they do not
         contain sequence information.
 
+        .. note::
+            Depends on :ref:`system.cpu <options>`.
+
         :param str prefix: ``description`` might not point to the path of the PDB if we have read
             the score file from a different directory. Apply a prefix to properly find them.
             Consider that one will need to add the path to the score file if the path to the PDB
@@ -180,20 +456,18 @@ class DesignFrame( pd.DataFrame, RSBaseDesign ):
             the sequence. Otherwise, it appears as ``X``. Consider that modifications of
             residues that are known by Rosetta such as ``LYS:CtermProteinFull`` or ``HIS_D``
             are considered standard in this context.
+        :param int workers: Number of processes reading the PDB files, as in
+            :func:`.parse_rosetta_pdbs`.
 
         :return: :class:`.DataFrame` with the new sequence data.
         """
-        from rstoolbox.io import parse_rosetta_pdb
-
-        def get_seq_from_pdb(fname, prefix, dropna):
-            if prefix is not None:
-                ifile = os.path.join(prefix, fname + '.pdb')
-            else:
-                ifile = fname + '.pdb'
-            return parse_rosetta_pdb(ifile, dropna=dropna)
+        from rstoolbox.io import parse_rosetta_pdbs
 
+        files = [fname + '.pdb' for fname in self['description']]
+        if prefix is not None:
+            files = [os.path.join(prefix, fname) for fname in files]
+        seq = parse_rosetta_pdbs(files, dropna=dropna, workers=workers)
         cols = ['description', ]
-        seq = pd.concat(list(self['description'].apply(get_seq_from_pdb, args=(prefix, dropna)))).reset_index(drop=True)
         cols.extend(list([x for x in seq.columns if x.startswith('sequence_')]))
         seq = seq[cols]
         return self.merge(seq, on=['description'])
@@ -204,17 +478,26 @@ class DesignFrame( pd.DataFrame, RSBaseDesign ):
         Basically, is meant to find, for example, all the decoys in which
         position 25 is A and position 46 is T.
 
+        Each rule is a :class:`tuple` with a position and the accepted residue types;
+        ``(25, 'AV')`` matches decoys with either A or V at position 25. Multiple patterns
+        can be searched at once by providing a :func:`list` of rule lists; decoys fulfilling
+        any of them are selected.
+
         :param str seqID: |seqID_param|.
         :param selection: List of tuples with position and residue
-            type (in 1 letter code).
-        :type selection: :func:`list` of :class:`tuple`
+            type (in 1 letter code), or a list of those lists.
+        :type selection: Union[:func:`list` of :class:`tuple`, :func:`list` of :func:`list`]
         :param float confidence: Percentage of the number of the selection
             rules that we expect the matches to fulfill. Default is 1 (all).
-        :param bool invert: When :data:`False`, return the sequences that do NOT
+        :param bool invert: When :data:`True`, return the sequences that do NOT
             fulfill the search conditions.
 
         :return: :class:`.DesignFrame` - filtered by the requested sequence
 
+        :raises:
+            :KeyError: |seqID_error|.
+            :ValueError: If a pattern has no rules.
+
         .. rubric:: Example
 
         .. ipython::
@@ -226,47 +509,79 @@ class DesignFrame( pd.DataFrame, RSBaseDesign ):
                ...: df = parse_rosetta_file("../rstoolbox/tests/data/input_2seq.minisilent.gz",
                ...:                         {'scores': ['score'], 'sequence': 'B'})
                ...: df.get_sequence_with('B', [(1, 'T')])
+
+            In [2]: df.get_sequence_with('B', [[(1, 'T'), (2, 'Y')], [(1, 'S')]])
         """
         from .selection import get_selection
 
-        def match_residues( value, seqID, confidence, shift ):
-            t = 0
-            full = len(value)
-            for s in selection:
-                # -1 as we access string position directly
-                t += 1 if value[get_selection(s[0], seqID, shift, full)[0] - 1] == s[1] else 0
-            return t / float(len(selection)) >= float(confidence)
-
+        matrix = self.get_sequence_matrix(seqID)
         shift = self.get_reference_shift(seqID)
-        df = self.loc[ self.apply(
-            lambda row: match_residues(row.get_sequence(seqID), selection, confidence, shift ),
-            axis=1
-        )]
-        if invert:
-            return self[~self['description'].isin(df['description'])]
-        return df
-
-    def sequence_distance( self, seqID, other=None ):
+        patterns = selection if _is_rule_list(selection[0] if len(selection) > 0 else None) \
+            else [selection, ]
+        if any(len(pattern) == 0 for pattern in patterns):
+            raise ValueError("Sequence patterns need at least one rule.")
+
+        selected = np.zeros(self.shape[0], dtype=bool)
+        for pattern in patterns:
+            hits = np.zeros(self.shape[0], dtype=np.int64)
+            for position, residues in pattern:
+                # -1 as we access matrix columns directly
+                column = get_selection(position, seqID, shift, matrix.shape[1])[0] - 1
+                hits += np.isin(matrix[:, column], _symbol_codes(residues))
+            selected |= hits / float(len(pattern)) >= float(confidence)
+        return self.loc[~selected] if invert else self.loc[selected]
+
+    def sequence_distance( self, seqID, other=None, matrix=None, output="square", top=5,
+                           blocksize=1000, workers=None, filename=None ):
         """Make identity sequence distance between the selected decoys.
 
         Generate a matrix counting the distance between each pair of sequences in the
-        :class:`.DesignFrame`. This is a time-consuming operation; better to execute it over a
-        specific set of selected decoys that over all your designs.
-
-        If ``other`` is provided as a second :class:`.DesignFrame`, distances are calculated between
-        the sequences of the current :class:`.DesignFrame` against the sequence of the other.
+        :class:`.DesignFrame`. If ``other`` is provided as a second :class:`.DesignFrame`,
+        distances are calculated between the sequences of the current :class:`.DesignFrame`
+        against the sequence of the other.
+
+        The distance is the number of positions in which two sequences differ. If a substitution
+        ``matrix`` is provided, substitutions with a positive score do not count as differences.
+
+        Sequences are compared in tiles of ``blocksize`` x ``blocksize`` sequences, which can be
+        distributed between multiple processes. For big sets of decoys, the full distance matrix
+        might not fit in memory; instead, the ``output`` can be:
+
+        =============  ========================================================================
+        output         Result
+        =============  ========================================================================
+        **square**     :class:`~pandas.DataFrame` with all the distances (default).
+        **condensed**  :class:`~numpy.ndarray` with the upper triangle of the matrix, in the
+                       order used by :func:`scipy.spatial.distance.squareform`. Only without
+                       ``other``. If ``filename`` is provided, it is written as a ``.npy``
+                       file and returned memory-mapped.
+        **top**        :class:`~pandas.DataFrame` with the ``top`` closest sequences (columns
+                       ``description``, ``neighbor`` and ``distance``) for each decoy.
+        =============  ========================================================================
+
+        .. note::
+            Depends on :ref:`system.cpu <options>` and :ref:`system.overwrite <options>`.
 
         :param str seqID: |seqID_param|.
         :param other: Secondary data container. Optional.
         :type other: :class:`.DesignFrame`
+        :param str matrix: Identifier of the substitution matrix. Optional.
+        :param str output: Type of output: ``square``, ``condensed`` or ``top``.
+        :param int top: Number of closest sequences for the ``top`` output. Decoys are never
+            their own neighbor.
+        :param int blocksize: Number of sequences compared at once.
+        :param int workers: Number of processes. Default is :ref:`system.cpu <options>`.
+        :param str filename: File to store the ``condensed`` output.
 
-        return: :class:`~pandas.DataFrame` - table with the sequence distances.
+        return: Union[:class:`~pandas.DataFrame`, :class:`~numpy.ndarray`] - the sequence distances.
 
         :raises:
             :KeyError: |seqID_error|.
             :KeyError: if ``description`` column cannot be found.
             :ValueError: if sequence of ``self`` and ``other`` are of different length.
             :ValueError: if data container only has one sequence and no ``other`` is provided.
+            :ValueError: if ``output`` is not valid or ``condensed`` is requested with ``other``.
+            :IOError: if ``filename`` exists and :ref:`system.overwrite <options>` is :data:`False`.
 
         .. rubric:: Example
 
@@ -279,40 +594,200 @@ class DesignFrame( pd.DataFrame, RSBaseDesign ):
                ...: df = parse_rosetta_file("../rstoolbox/tests/data/input_2seq.minisilent.gz",
                ...:                         {'scores': ['score', 'description'], 'sequence': 'B'})
                ...: df.sequence_distance('B')
+
+            In [2]: df.sequence_distance('B', output='top', top=2).head()
         """
-        # https://stackoverflow.com/questions/49235538/pandas-series-compare-values-all-vs-all
-        def own_distance( self, seqID ):
-            if self.shape[0] == 1:
-                raise ValueError("More than one sequence is needed to compare.")
-            a = np.array(list(map(list, self.get_sequence(seqID).values)))
-            ids = self.get_id().values
-            n = len(a)
-            d = {(i, j): np.sum(a[i] != a[j]) for i in range(n) for j in range(n) if j > i}
-            res = np.zeros((n, n))
-            keys = list(zip(*d.keys()))
-            res[keys[0], keys[1]] = list(d.values())
-            res += res.T
-            return pd.DataFrame(res, columns=ids, index=ids, dtype=int)
-
-        def vs_distance( self, seqID, other ):
-            a = np.array(list(map(list, self.get_sequence(seqID).values)))
-            b = np.array(list(map(list, other.get_sequence(seqID).values)))
-            aids = self.get_id().values
-            bids = other.get_id().values
-            na = len(a)
-            nb = len(b)
-            if len(a[0]) != len(b[0]):
-                raise ValueError('Comparable sequence have to be of the same size')
-            d = {(i, j): np.sum(a[i] != b[j]) for i in range(na) for j in range(nb)}
-            res = np.zeros((na, nb))
-            keys = list(zip(*d.keys()))
-            res[keys[0], keys[1]] = list(d.values())
-            return pd.DataFrame(res, columns=bids, index=aids, dtype=int)
-
-        if other is None:
-            return own_distance(self, seqID)
+        from rstoolbox.analysis.SimilarityMatrix import SimilarityMatrix
+
+        if output not in ["square", "condensed", "top"]:
+            raise ValueError("Available outputs are: square, condensed, top")
+        own = other is None
+        if own and self.shape[0] == 1:
+            raise ValueError("More than one sequence is needed to compare.")
+        if output == "condensed" and not own:
+            raise ValueError("Condensed distances are only available within a data container.")
+        if filename is not None and os.path.isfile(filename) and not core.get_option("system", "overwrite"):
+            raise IOError("File {} already exists".format(filename))
+
+        query = self.get_sequence_matrix(seqID)
+        target = query if own else other.get_sequence_matrix(seqID)
+        aids = self.get_id().values
+        bids = aids if own else other.get_id().values
+        if query.shape[1] != target.shape[1]:
+            raise ValueError('Comparable sequence have to be of the same size')
+        if matrix is not None:
+            matrix = SimilarityMatrix.get_matrix(matrix)
+            query, target = _SEQUENCE_UPPER[query], _SEQUENCE_UPPER[target]
+
+        # Only the symbols present are one-hot encoded.
+        symbols = np.union1d(np.unique(query), np.unique(target))
+        table = np.zeros(256, dtype=np.uint8)
+        table[symbols] = np.arange(len(symbols))
+        query, target = table[query], table[target]
+        top = min(max(int(top), 1), len(target) - int(own))
+
+        tiles = [slice(i, min(i + blocksize, len(query))) for i in range(0, len(query), blocksize)]
+        initargs = (query, target, _distance_weights(symbols, matrix), output, top, blocksize, own)
+        workers = workers if workers is not None else core.get_option("system", "cpu")
+        workers = min(max(int(workers), 1), len(tiles))
+
+        if output == "condensed":
+            shape = (len(query) * (len(query) - 1) // 2, )
+            dtype = np.min_scalar_type(query.shape[1])
+            if filename is not None:
+                result = np.lib.format.open_memmap(filename, mode='w+', dtype=dtype, shape=shape)
+            else:
+                result = np.zeros(shape, dtype=dtype)
         else:
-            return vs_distance(self, seqID, other)
+            result = []
+
+        if workers > 1:
+            pool = multiprocessing.Pool(workers, _distance_init, initargs)
+        else:
+            _distance_init(*initargs)
+        try:
+            pieces = pool.imap(_distance_rows, tiles) if workers > 1 else map(_distance_rows, tiles)
+            for piece in pieces:
+                if output == "condensed":
+                    result[piece[0]:piece[0] + len(piece[1])] = piece[1]
+                else:
+                    result.append(piece)
+        finally:
+            if workers > 1:
+                pool.close()
+                pool.join()
+            else:
+                _DISTANCE_DATA.clear()
+
+        if output == "square":
+            return pd.DataFrame(np.vstack(result), columns=bids, index=aids, dtype=int)
+        if output == "condensed":
+            if filename is not None:
+                result.flush()
+            return result
+        best = np.vstack([x[0] for x in result])
+        return pd.DataFrame({'description': np.repeat(aids, best.shape[1]),
+                             'neighbor': bids[best.ravel()],
+                             'distance': np.vstack([x[1] for x in result]).ravel()},
+                            columns=['description', 'neighbor', 'distance'])
+
+    def cluster_sequences( self, seqID, identity=0.9, key_residues=None, score="score",
+                           ascending=True ):
+        """Greedy clustering of the decoys by sequence identity.
+
+        Decoys are visited from best to worst ``score``. Each decoy joins the cluster of the
+        first representative with which it shares at least ``identity``; otherwise, it becomes
+        the representative of a new cluster. Identical sequences are evaluated only once.
+
+        Two sequences of length ``L`` that differ in at most ``d`` positions must be identical
+        in at least one of ``d + 1`` consecutive segments of the sequence; thus, only
+        representatives sharing a segment with the decoy are compared to it.
+
+        Adds to the container two new columns:
+
+        ==============================  ==================================================
+        Column                          Data Content
+        ==============================  ==================================================
+        **cluster_<seqID>**             Cluster number; ``1`` is the cluster of the best decoy.
+        **representative_<seqID>**      :data:`True` for the representative of each cluster.
+        ==============================  ==================================================
+
+        :param str seqID: |seqID_param|.
+        :param float identity: Minimum sequence identity (``0`` to ``1``) with the
+            representative of a cluster.
+        :param key_residues: |keyres_param|. Identity is evaluated only over these positions.
+        :type key_residues: |keyres_types|
+        :param str score: Score column to sort the decoys. If :data:`None`, the current
+            order of the decoys is used.
+        :param bool ascending: Lower ``score`` values are better.
+
+        :return: :class:`.DesignFrame` - a copy of the data container with the new columns.
+
+        :raises:
+            :KeyError: |seqID_error|.
+            :KeyError: if ``score`` cannot be found.
+            :ValueError: if ``identity`` is not between ``0`` and ``1``.
+
+        .. rubric:: Example
+
+        .. ipython::
+
+            In [1]: from rstoolbox.io import parse_rosetta_file
+               ...: import pandas as pd
+               ...: pd.set_option('display.width', 1000)
+               ...: pd.set_option('display.max_columns', 500)
+               ...: df = parse_rosetta_file("../rstoolbox/tests/data/input_2seq.minisilent.gz",
+               ...:                         {'scores': ['score', 'description'], 'sequence': 'B'})
+               ...: df = df.cluster_sequences('B', identity=0.1)
+               ...: df[['description', 'score', 'cluster_B', 'representative_B']]
+        """
+        from rstoolbox.components import get_selection
+
+        if not 0 <= identity <= 1:
+            raise ValueError("identity has to be between 0 and 1")
+        if score is not None and score not in self.columns:
+            raise KeyError("Score {} not found in decoys.".format(score))
+
+        matrix = self.get_sequence_matrix(seqID)
+        kr = get_selection(key_residues, seqID, self.get_reference_shift(seqID), matrix.shape[1])
+        matrix = np.ascontiguousarray(matrix[:, kr - 1])
+        if score is not None:
+            values = self[score].reset_index(drop=True)
+            order = values.sort_values(ascending=ascending, kind='mergesort', na_position='last').index.values
+        else:
+            order = np.arange(self.shape[0])
+
+        # Unique sequences, numbered by their best decoy.
+        if matrix.shape[1] > 0:
+            rows = np.ascontiguousarray(matrix[order]).view(np.dtype((np.void, matrix.shape[1]))).ravel()
+        else:
+            rows = np.zeros(len(order), dtype=np.int64)
+        _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        rank = np.argsort(first, kind='mergesort')
+        unique = matrix[order][first[rank]]
+        inverse = np.argsort(rank)[inverse.ravel()]
+
+        # Segment identifiers for the pigeonhole prefilter.
+        maxdiff = int(np.floor((1 - identity) * matrix.shape[1] + 1e-9))
+        segments = []
+        for cols in np.array_split(np.arange(matrix.shape[1]), maxdiff + 1):
+            if len(cols) == 0:
+                segments.append(np.zeros(len(unique), dtype=np.int64))
+                continue
+            block = np.ascontiguousarray(unique[:, cols]).view(np.dtype((np.void, len(cols)))).ravel()
+            segments.append(np.unique(block, return_inverse=True)[1].ravel())
+        segments = np.column_stack(segments)
+
+        index = [{} for _ in range(segments.shape[1])]
+        cluster = np.zeros(len(unique), dtype=np.int64)
+        reps = np.zeros(len(unique), dtype=np.int64)
+        nreps = 0
+        for i, keys in enumerate(segments.tolist()):
+            found = [index[s][key] for s, key in enumerate(keys) if key in index[s]]
+            if len(found) > 0:
+                # With too many candidates, all representatives are compared.
+                if sum([len(x) for x in found]) < nreps:
+                    candidates = np.unique(np.concatenate(found))
+                else:
+                    candidates = np.arange(nreps)
+                close = np.count_nonzero(unique[reps[candidates]] != unique[i], axis=1) <= maxdiff
+                if close.any():
+                    cluster[i] = candidates[np.argmax(close)] + 1
+                    continue
+            reps[nreps] = i
+            nreps += 1
+            cluster[i] = nreps
+            for s, key in enumerate(keys):
+                index[s].setdefault(key, []).append(nreps - 1)
+
+        df = self.copy()
+        clusters = np.zeros(self.shape[0], dtype=np.int64)
+        clusters[order] = cluster[inverse]
+        representatives = np.zeros(self.shape[0], dtype=bool)
+        representatives[order[first[rank][reps[:nreps]]]] = True
+        df["cluster_{}".format(seqID)] = clusters
+        df["representative_{}".format(seqID)] = representatives
+        return df
 
     def sequence_frequencies( self, seqID, seqType="protein", cleanExtra=True, cleanUnused=-1 ):
         """Create a frequency-based :class:`.SequenceFrame`.
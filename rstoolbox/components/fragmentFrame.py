@@ -11,6 +11,7 @@
 # Standard Libraries
 import os
 import math
+import hashlib
 import sys
 from collections import Counter
 import itertools
@@ -99,6 +100,54 @@ class FragmentFrame( pd.DataFrame ):
         """
         return self._source_file is not None
 
+    def _position_index( self ):
+        """*Internal*; rows of each ``position``, as offsets over the rows sorted by position.
+
+        The index is built once and kept until the ``position`` column changes.
+
+        :return: :class:`tuple` - positions, offsets and row order; the rows of
+            ``positions[i]`` are ``order[offsets[i]:offsets[i + 1]]``.
+        """
+        values = np.ascontiguousarray(self['position'].values)
+        key = (values.dtype.str, len(values), hashlib.sha1(values.tobytes()).hexdigest())
+        crunched = getattr(self, '_crunched', None) or {}
+        if crunched.get('position_key') != key:
+            order = np.argsort(values, kind='mergesort')
+            positions, offsets = np.unique(values[order], return_index=True)
+            crunched = {'position_key': key,
+                        'position_index': (positions, np.append(offsets, len(values)), order)}
+            self._crunched = crunched
+        return crunched['position_index']
+
+    def _position_values( self, column ):
+        """*Internal*; values of ``column`` for each position, in row order.
+
+        :param str column: Column to retrieve.
+
+        :return: :class:`dict` - position to :class:`~numpy.ndarray` of values.
+        """
+        positions, offsets, order = self._position_index()
+        values = self[column].values[order]
+        return dict(zip(positions.tolist(), np.split(values, offsets[1:-1])))
+
+    def _position_counts( self, column ):
+        """*Internal*; count of each value of ``column`` per position.
+
+        :param str column: Column to count.
+
+        :return: :class:`tuple` - positions, sorted values and the :class:`~numpy.ndarray`
+            (positions x values) of counts.
+        """
+        positions, offsets, order = self._position_index()
+        codes, symbols = pd.factorize(self[column].values)
+        codes = codes[order]
+        sort = np.argsort(symbols)
+        rank = np.empty(len(sort), dtype=np.int64)
+        rank[sort] = np.arange(len(sort))
+        rows = np.repeat(np.arange(len(positions)), np.diff(offsets))
+        counts = np.bincount(rows * len(symbols) + rank[codes], minlength=len(positions) * len(symbols))
+        return positions, symbols[sort], counts.reshape(len(positions), len(symbols))
+
     def slice_region( self, ini, end ):
         """Retrieve only fragments within certain positions.
 
@@ -350,13 +399,14 @@ class FragmentFrame( pd.DataFrame ):
             baseline[k] = float(baseline[k]) / total
 
         matrix = {}
-        for i in range(1, max(self["position"].values) + 1):
-            qseq = Counter(self[self["position"] == i]["aa"].values)
-            qttl = sum(qseq.values(), 0.0)
-            for k in qseq:
-                qseq[k] /= qttl
+        positions, symbols, counts = self._position_counts("aa")
+        counts = dict(zip(positions.tolist(), counts.tolist()))
+        symbols = dict(zip(symbols.tolist(), range(len(symbols))))
+        for i in range(1, positions[-1] + 1):
+            qcnt = counts.get(i, [0] * len(symbols))
+            qttl = float(sum(qcnt))
             for aa in baseline:
-                q = qseq[aa]
+                q = qcnt[symbols[aa]] / qttl if aa in symbols and qcnt[symbols[aa]] > 0 else 0
                 if not frequency:
                     if q > 0:
                         logodds = math.log(q / baseline[aa], 2)
@@ -484,12 +534,10 @@ class FragmentFrame( pd.DataFrame ):
 
         :return: :class:`str` - consensus sequence
         """
-        consensus = []
-        for i in range(1, max(self["position"].values) + 1):
-            values = self[self["position"] == i]["aa"].values
-            qseq = sorted(Counter(values).most_common(), key=lambda x: (-x[1], x[0]))[0]
-            consensus.append(qseq[0])
-        return "".join(consensus)
+        # Ties go to the first value in alphabetical order.
+        positions, symbols, counts = self._position_counts("aa")
+        consensus = dict(zip(positions.tolist(), symbols[counts.argmax(1)]))
+        return "".join([consensus[i] for i in range(1, positions[-1] + 1)])
 
     def quick_consensus_secondary_structure( self ):
         """Consensus secondary structure with the highest representative per position.
@@ -499,12 +547,10 @@ class FragmentFrame( pd.DataFrame ):
 
         :return: :class:`str` - consensus secondary structure
         """
-        consensus = []
-        for i in range(1, max(self["position"].values) + 1):
-            values = self[self["position"] == i]["sse"].values
-            qseq = sorted(Counter(values).most_common(), key=lambda x: (-x[1], x[0]))[0]
-            consensus.append(qseq[0])
-        return "".join(consensus)
+        # Ties go to the first value in alphabetical order.
+        positions, symbols, counts = self._position_counts("sse")
+        consensus = dict(zip(positions.tolist(), symbols[counts.argmax(1)]))
+        return "".join([consensus[i] for i in range(1, positions[-1] + 1)])
 
     #
     # Implement pandas methods
@@ -26,6 +26,14 @@ with core.ifndef():
     core.register_option('system', 'cpu', multiprocessing.cpu_count() - 1, 'int',
                          'Available CPU for multiprocessing')
 
+    # Register cache options
+    core.register_option('cache', 'active', False, 'bool',
+                         'Keep a disk copy of the parsed silent/score files')
+    core.register_option('cache', 'path', os.path.join(os.path.expanduser('~'), '.rstoolbox_cache'),
+                         'path_out', 'Folder where parsed silent/score files are cached')
+    core.register_option('cache', 'size', 1024, 'int',
+                         'Maximum size (in MB) of the parsed files cache')
+
     # Register Rosetta-related options
     core.register_option('rosetta', 'path',  os.path.expanduser('~'), 'path_in',
                          'Path to the rosetta binaries')
@@ -3,3 +3,6 @@ from .sequence import *
 from .structure import *
 from .experimental import *
 from .pymol import *
+from .cache import *
+from .silent import *
+from .binary import *
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+.. codeauthor:: Jaume Bonet <jaume.bonet@gmail.com>
+
+.. affiliation::
+    Laboratory of Protein Design and Immunoengineering <lpdi.epfl.ch>
+    Bruno Correia <bruno.correia@epfl.ch>
+
+.. func:: write_binary_minisilent
+.. func:: read_binary_minisilent
+"""
+# Standard Libraries
+import os
+import gzip
+import json
+import struct
+
+# External Libraries
+import six
+import numpy as np
+import pandas as pd
+
+# This Library
+import rstoolbox.core as core
+import rstoolbox.components as rc
+
+__all__ = ['write_binary_minisilent', 'read_binary_minisilent']
+
+_MAGIC = b'RSTBMINI'
+_VERSION = 1
+_ALIGN = 64
+
+
+def is_binary_minisilent( filename ):
+    """Check if a file is a binary minisilent (plain or gzipped).
+
+    :param str filename: File to check.
+
+    :return: :class:`bool`
+    """
+    opener = gzip.open if filename.endswith('.gz') else open
+    try:
+        with opener(filename, 'rb') as fd:
+            return fd.read(len(_MAGIC)) == _MAGIC
+    except (IOError, OSError):
+        return False
+
+
+def _column_kind( name, values ):
+    """Storage type of a column.
+    """
+    if name.startswith('lbl_'):
+        return 'label'
+    if values.dtype.kind in 'biuf':
+        return 'numeric'
+    present = [x for x in values if not _is_missing(x)]
+    if all([isinstance(x, six.string_types) for x in present]):
+        return 'text'
+    if all([isinstance(x, (list, np.ndarray)) for x in present]):
+        return 'array'
+    raise ValueError("Column {} cannot be stored in a binary minisilent.".format(name))
+
+
+def _is_missing( value ):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _encode_text( values ):
+    """Strings as a fixed-width byte matrix and a missing mask.
+    """
+    missing = np.array([_is_missing(x) for x in values], dtype=bool)
+    text = np.array([x.encode('utf-8') if not m else b'' for x, m in zip(values, missing)])
+    if text.dtype.itemsize == 0 or text.dtype.kind != 'S':
+        text = text.astype('S1')
+    return {'text': text, 'missing': missing}
+
+
+def _encode_array( values, dtype ):
+    """Variable length numeric lists as a padded block and their lengths.
+    """
+    lengths = np.array([-1 if _is_missing(x) else len(x) for x in values], dtype=np.int32)
+    block = np.zeros((len(values), max(lengths.max(), 0) if len(values) > 0 else 0), dtype=dtype)
+    for i, x in enumerate(values):
+        if lengths[i] > 0:
+            block[i, :lengths[i]] = x
+    return {'block': block, 'lengths': lengths}
+
+
+def _encode_label( values ):
+    """:class:`.SelectionContainer` as selected ranges.
+
+    Each (row, seqID) selection is an entry pointing to its ranges.
+    """
+    rows, keys, flags, offsets, ranges, seqIDs = [], [], [], [0], [], []
+    present = np.zeros(len(values), dtype=bool)
+    for i, x in enumerate(values):
+        if not isinstance(x, rc.SelectionContainer):
+            continue
+        present[i] = True
+        for key in sorted(x):
+            sele = x[key]
+            if key not in seqIDs:
+                seqIDs.append(key)
+            shifted = sele.seqID()
+            if shifted is not None and shifted not in seqIDs:
+                seqIDs.append(shifted)
+            rows.append(i)
+            keys.append([seqIDs.index(key), seqIDs.index(shifted) if shifted is not None else -1])
+            flags.append(int(sele._revrs))
+            nums = np.asarray(list(sele), dtype=np.int32)
+            if len(nums) > 0:
+                cut = np.flatnonzero(np.diff(nums) != 1) + 1
+                starts = nums[np.r_[0, cut]]
+                ends = nums[np.r_[cut - 1, len(nums) - 1]]
+                ranges.extend(zip(starts, ends))
+            offsets.append(len(ranges))
+    data = {'present': present,
+            'rows': np.array(rows, dtype=np.int32),
+            'keys': np.array(keys, dtype=np.int32).reshape(-1, 2),
+            'flags': np.array(flags, dtype=np.uint8),
+            'offsets': np.array(offsets, dtype=np.int64),
+            'ranges': np.array(ranges, dtype=np.int32).reshape(-1, 2)}
+    return data, seqIDs
+
+
+def _encode_column( name, values ):
+    """Arrays storing a column, without pickling any object.
+
+    :return: :class:`dict` describing the column and :class:`dict` of
+        :class:`~numpy.ndarray` with its content.
+
+    :raises:
+        :ValueError: if the column contains data that cannot be stored.
+    """
+    if values.dtype.name == 'category':
+        values = values.astype(object)
+    kind = _column_kind(name, values)
+    info = {'name': name, 'kind': kind}
+    if kind == 'numeric':
+        arrays = {'values': np.ascontiguousarray(values.values)}
+    elif kind == 'text':
+        arrays = _encode_text(values.values)
+    elif kind == 'array':
+        dtype = np.float32 if name.startswith(('phi_', 'psi_')) else np.float64
+        arrays = _encode_array(values.values, dtype)
+    else:
+        arrays, info['seqIDs'] = _encode_label(values.values)
+    return info, arrays
+
+
+def write_binary_minisilent( df, filename ):
+    """Store a :class:`.DesignFrame` in a binary minisilent file.
+
+    The binary minisilent is an alternative to the text minisilent that does not need
+    to be tokenized when read. Scores are kept as typed columns, sequences and secondary
+    structures as fixed-width byte matrices, dihedrals as ``float32`` blocks and labels as
+    ranges of selected residues. Uncompressed files are memory-mapped when read.
+
+    The file is read back with :func:`.read_binary_minisilent` or directly with
+    :func:`.parse_rosetta_file`.
+
+    .. note::
+        Depends on :ref:`system.overwrite <options>`.
+
+    :param df: Data to store.
+    :type df: :class:`.DesignFrame`
+    :param str filename: Output file name. If it ends in ``.gz``, it is compressed.
+
+    :raises:
+        :IOError: if ``filename`` exists and :ref:`system.overwrite <options>` is :data:`False`.
+        :ValueError: if a column contains data that cannot be stored.
+    """
+    if os.path.isfile(filename) and not core.get_option('system', 'overwrite'):
+        raise IOError("File {} already exists".format(filename))
+
+    columns, blocks, offset = [], [], 0
+    for name in df.columns:
+        info, arrays = _encode_column(name, df[name])
+        info['arrays'] = {}
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            info['arrays'][key] = [offset, array.dtype.str, list(array.shape)]
+            blocks.append(array)
+            offset += array.nbytes
+            offset += -offset % _ALIGN
+        columns.append(info)
+
+    header = json.dumps({'version': _VERSION, 'rows': int(df.shape[0]), 'columns': columns,
+                         'reference': getattr(df, '_reference', {}),
+                         'source': sorted(getattr(df, '_source_files', set()))},
+                        default=str).encode('utf-8')
+    start = len(_MAGIC) + 8 + len(header)
+    start += -start % _ALIGN
+
+    fd = gzip.open(filename, 'wb') if filename.endswith('.gz') else open(filename, 'wb')
+    try:
+        fd.write(_MAGIC + struct.pack('<Q', start) + header)
+        fd.write(b'\0' * (start - len(_MAGIC) - 8 - len(header)))
+        for array in blocks:
+            fd.write(array.tobytes())
+            fd.write(b'\0' * (-array.nbytes % _ALIGN))
+    finally:
+        fd.close()
+
+
+def _decode_label( arrays, seqIDs, rows ):
+    values = np.array([np.nan, ] * rows, dtype=object)
+    for i in np.flatnonzero(arrays['present']):
+        values[i] = rc.SelectionContainer()
+    offsets, ranges = arrays['offsets'], arrays['ranges']
+    for n, (i, (key, shifted), flag) in enumerate(zip(arrays['rows'], arrays['keys'], arrays['flags'])):
+        nums = []
+        for start, end in ranges[offsets[n]:offsets[n + 1]]:
+            nums.extend(range(int(start), int(end) + 1))
+        sele = rc.Selection(nums)
+        if shifted >= 0:
+            sele = rc.Selection(",".join(["{0}{1}".format(x, seqIDs[shifted]) for x in nums]))
+        if flag:
+            sele = ~sele
+        values[i][seqIDs[key]] = sele
+    return values
+
+
+def _decode_column( info, arrays, rows ):
+    """Values of a column stored by :func:`._encode_column`.
+
+    :return: :class:`~numpy.ndarray`
+    """
+    if info['kind'] == 'numeric':
+        return arrays['values']
+    if info['kind'] == 'text':
+        values = np.char.decode(arrays['text'], 'utf-8').astype(object)
+        values[arrays['missing']] = np.nan
+        return values
+    if info['kind'] == 'array':
+        block, lengths = arrays['block'], arrays['lengths']
+        values = np.array([np.nan, ] * rows, dtype=object)
+        for i, n in enumerate(lengths):
+            if n >= 0:
+                values[i] = block[i, :n]
+        return values
+    return _decode_label(arrays, info['seqIDs'], rows)
+
+
+def read_binary_minisilent( filename ):
+    """Load a binary minisilent file written by :func:`.write_binary_minisilent`.
+
+    Uncompressed files are memory-mapped, so columns are built from the file content
+    without parsing any text. Numerical columns are copied into the returned
+    :class:`.DesignFrame`, while dihedral arrays are read-only views over the mapped
+    file. The source files of the stored data are kept.
+
+    :param str filename: Input file name.
+
+    :return: :class:`.DesignFrame`
+
+    :raises:
+        :IOError: if ``filename`` cannot be found.
+        :ValueError: if ``filename`` is not a binary minisilent.
+    """
+    if not os.path.isfile(filename):
+        raise IOError("{0}: file not found.".format(filename))
+    if filename.endswith('.gz'):
+        with gzip.open(filename, 'rb') as fd:
+            data = np.frombuffer(fd.read(), dtype=np.uint8)
+    else:
+        data = np.memmap(filename, dtype=np.uint8, mode='r')
+    if data[:len(_MAGIC)].tobytes() != _MAGIC:
+        raise ValueError("{0} is not a binary minisilent file.".format(filename))
+    start = struct.unpack('<Q', data[len(_MAGIC):len(_MAGIC) + 8].tobytes())[0]
+    header = json.loads(data[len(_MAGIC) + 8:start].tobytes().rstrip(b'\0').decode('utf-8'))
+
+    content = []
+    for info in header['columns']:
+        arrays = {}
+        for key, (offset, dtype, shape) in info['arrays'].items():
+            dtype = np.dtype(dtype)
+            size = int(np.prod(shape)) * dtype.itemsize
+            arrays[key] = data[start + offset:start + offset + size].view(dtype).reshape(shape)
+        content.append((info['name'], _decode_column(info, arrays, header['rows'])))
+
+    df = pd.DataFrame(dict(content), columns=[x[0] for x in content])
+    return rc.DesignFrame(df, reference=header['reference'], source=set(header['source']))
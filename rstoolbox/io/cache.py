@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+.. codeauthor:: Jaume Bonet <jaume.bonet@gmail.com>
+
+.. affiliation::
+    Laboratory of Protein Design and Immunoengineering <lpdi.epfl.ch>
+    Bruno Correia <bruno.correia@epfl.ch>
+
+.. func:: clear_rosetta_cache
+"""
+# Standard Libraries
+import os
+import json
+import hashlib
+
+# External Libraries
+import six
+import numpy as np
+import pandas as pd
+
+# This Library
+import rstoolbox.core as core
+import rstoolbox.components as rc
+from .binary import _encode_column, _decode_column
+
+__all__ = ['clear_rosetta_cache']
+
+_CACHE_VERSION = 2
+
+
+def _cache_dir():
+    """Folder holding the cached files.
+
+    .. note::
+        Depends on :ref:`cache.path <options>`.
+    """
+    path = os.path.expanduser(core.get_option('cache', 'path'))
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    return path
+
+
+def cache_key( files, description ):
+    """Identifier of the parsed data.
+
+    Built from the path, size and modification time of each input file
+    together with the parsing rules.
+
+    :param files: Files that are parsed.
+    :type files: :func:`list` of :class:`str`
+    :param dict description: Parsing rules.
+
+    :return: :class:`str`
+    """
+    stats = []
+    for f in files:
+        st = os.stat(f)
+        stats.append([os.path.abspath(f), st.st_size, st.st_mtime])
+    key = json.dumps({'version': _CACHE_VERSION, 'files': stats,
+                      'description': rc.Description(**description).to_json()},
+                     sort_keys=True, default=str)
+    return hashlib.sha1(key.encode('utf8')).hexdigest()
+
+
+def _is_columnar( df ):
+    """Check if all the columns can be stored in a columnar format
+    (numbers, booleans or plain strings).
+    """
+    for c in df.columns:
+        if df[c].dtype == object:
+            if not df[c].map(lambda x: isinstance(x, six.string_types) or x is None).all():
+                return False
+    return True
+
+
+def _write_frame( df, path ):
+    """Store the data of a :class:`.DesignFrame`. Uses ``feather`` when
+    :mod:`pyarrow` is available and the data allows it; ``npz`` otherwise.
+
+    Objects are never pickled: the ``npz`` file keeps each column as the plain
+    arrays used by :func:`.write_binary_minisilent`.
+
+    :return: :class:`dict` - format used and how to read each column back.
+
+    :raises:
+        :ValueError: if a column contains data that cannot be stored.
+    """
+    try:
+        import pyarrow  # noqa: F401
+        if _is_columnar(df):
+            pd.DataFrame(df).reset_index(drop=True).to_feather(path + '.feather')
+            return {'format': 'feather'}
+    except ImportError:
+        pass
+    data, columns = {}, []
+    for i, c in enumerate(df.columns):
+        info, arrays = _encode_column(c, df[c])
+        info['arrays'] = sorted(arrays)
+        data.update({'c{}_{}'.format(i, k): v for k, v in arrays.items()})
+        columns.append(info)
+    with open(path + '.npz', 'wb') as fd:
+        np.savez(fd, **data)
+    return {'format': 'npz', 'encoding': columns}
+
+
+def _read_frame( path, meta ):
+    """Load the data stored by :func:`._write_frame`.
+
+    :return: :class:`~pandas.DataFrame`
+    """
+    if meta['format'] == 'feather':
+        return pd.read_feather(path + '.feather')
+    data = np.load(path + '.npz', allow_pickle=False)
+    columns = []
+    for i, info in enumerate(meta['encoding']):
+        arrays = {k: data['c{}_{}'.format(i, k)] for k in info['arrays']}
+        columns.append((info['name'], _decode_column(info, arrays, meta['rows'])))
+    return pd.DataFrame(dict(columns), columns=meta['columns'])
+
+
+def _entry_files( path, key ):
+    files = [os.path.join(path, key + ext) for ext in ['.json', '.npz', '.feather']]
+    return [f for f in files if os.path.isfile(f)]
+
+
+def _cache_entries( path ):
+    """List the cached entries as (last access, size, key), oldest first.
+    """
+    entries = []
+    for f in os.listdir(path):
+        if f.endswith('.json'):
+            key = f[:-5]
+            entries.append((os.path.getmtime(os.path.join(path, f)),
+                            sum(os.path.getsize(x) for x in _entry_files(path, key)), key))
+    return sorted(entries)
+
+
+def _evict_cache( path ):
+    """Remove the least recently used entries until the cache fits in
+    the allowed size.
+
+    .. note::
+        Depends on :ref:`cache.size <options>`.
+    """
+    limit = core.get_option('cache', 'size') * 1024 * 1024
+    entries = _cache_entries(path)
+    total = sum(x[1] for x in entries)
+    for _, size, key in entries:
+        if total <= limit:
+            break
+        _remove_entry(path, key)
+        total -= size
+
+
+def _remove_entry( path, key ):
+    for f in _entry_files(path, key):
+        os.unlink(f)
+
+
+def load_cached_rosetta_file( key ):
+    """Retrieve previously parsed data from the cache.
+
+    .. note::
+        Depends on :ref:`cache.path <options>`.
+
+    :param str key: Identifier of the data as given by :func:`.cache_key`.
+
+    :return: :class:`.DesignFrame` or :data:`None` if the data is not cached.
+    """
+    path = _cache_dir()
+    metafile = os.path.join(path, key + '.json')
+    if not os.path.isfile(metafile):
+        return None
+    try:
+        with open(metafile) as fd:
+            meta = json.load(fd)
+        df = _read_frame(os.path.join(path, key), meta)
+    except (IOError, OSError, ValueError, KeyError):
+        _remove_entry(path, key)
+        return None
+    os.utime(metafile, None)
+    return rc.DesignFrame(df, reference=meta['reference'], source=set(meta['source']))
+
+
+def save_cached_rosetta_file( df, key ):
+    """Store parsed data into the cache.
+
+    Data with columns that cannot be stored without pickling (such as columns
+    mixing numbers and text) is not cached.
+
+    .. note::
+        Depends on :ref:`cache.path <options>` and :ref:`cache.size <options>`.
+
+    :param df: Parsed data.
+    :type df: :class:`.DesignFrame`
+    :param str key: Identifier of the data as given by :func:`.cache_key`.
+    """
+    path = _cache_dir()
+    meta = {'columns': list(df.columns), 'rows': int(df.shape[0]), 'reference': df._reference,
+            'source': sorted(df._source_files)}
+    try:
+        meta.update(_write_frame(df, os.path.join(path, key)))
+    except ValueError:
+        return
+    with open(os.path.join(path, key + '.json'), 'w') as fd:
+        json.dump(meta, fd)
+    _evict_cache(path)
+
+
+def clear_rosetta_cache():
+    """Remove all the data cached by :func:`.parse_rosetta_file`.
+
+    .. note::
+        Depends on :ref:`cache.path <options>`.
+    """
+    path = _cache_dir()
+    for _, _, key in _cache_entries(path):
+        _remove_entry(path, key)
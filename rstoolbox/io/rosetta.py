@@ -8,23 +8,34 @@
 
 .. func:: open_rosetta_file
 .. func:: parse_rosetta_file
+.. func:: iter_rosetta_file
 .. func:: parse_rosetta_json
+.. func:: parse_rosetta_pdb
+.. func:: parse_rosetta_pdbs
 .. func:: parse_rosetta_contacts
 .. func:: parse_rosetta_fragments
 .. func:: write_rosetta_fragments
 .. func:: write_fragment_sequence_profiles
 .. func:: get_sequence_and_structure
+.. func:: get_sequences_and_structures
 .. func:: make_structures
 """
 # Standard Libraries
+import io
 import os
 import sys
 import re
 import glob
 import gzip
 import json
+import copy
 import string
 import shutil
+import operator
+import tempfile
+import itertools
+import multiprocessing
+import multiprocessing.pool
 from collections import OrderedDict
 
 # External Libraries
@@ -37,23 +48,35 @@ import yaml
 import rstoolbox.core as core
 import rstoolbox.components as rc
 from rstoolbox.utils import baseline, make_rosetta_app_path, execute_process
+from .cache import cache_key, load_cached_rosetta_file, save_cached_rosetta_file
+from .binary import is_binary_minisilent, read_binary_minisilent, _MAGIC as _BINARY_MAGIC
 
-__all__ = ['open_rosetta_file', 'parse_rosetta_file', 'parse_rosetta_contacts',
-           'parse_rosetta_fragments', 'write_rosetta_fragments',
+__all__ = ['open_rosetta_file', 'parse_rosetta_file', 'iter_rosetta_file',
+           'parse_rosetta_contacts', 'parse_rosetta_fragments', 'write_rosetta_fragments',
            'write_fragment_sequence_profiles', 'get_sequence_and_structure',
-           'make_structures', 'parse_rosetta_json', 'parse_rosetta_pdb']
+           'get_sequences_and_structures',
+           'make_structures', 'parse_rosetta_json', 'parse_rosetta_pdb',
+           'parse_rosetta_pdbs']
 
-_headers = ["SCORE", "REMARK", "RES_NUM", "FOLD_TREE", "RT",
+_AA3TO1 = {'CYS': 'C', 'ASP': 'D', 'SER': 'S', 'GLN': 'Q', 'LYS': 'K',
+           'ILE': 'I', 'PRO': 'P', 'THR': 'T', 'PHE': 'F', 'ASN': 'N',
+           'GLY': 'G', 'HIS': 'H', 'LEU': 'L', 'ARG': 'R', 'TRP': 'W',
+           'ALA': 'A', 'VAL': 'V', 'GLU': 'E', 'TYR': 'Y', 'MET': 'M'}
+
+_headers = {"SCORE", "REMARK", "RES_NUM", "FOLD_TREE", "RT",
             "ANNOTATED_SEQUENCE", "NONCANONICAL_CONNECTION",
-            "SYMMETRY_INFO", "CHAIN_ENDINGS"]
+            "SYMMETRY_INFO", "CHAIN_ENDINGS"}
 
 
 def _file_vs_json( data ):
     """
     Transform file into json if needed.
+    Dictionaries are copied, as the parsing rules are updated while reading.
     """
     if data is None:
         return {}
+    if isinstance( data, dict ):
+        return copy.deepcopy( data )
     if isinstance( data, str ):
         if not os.path.isfile( data ):
             raise IOError("{0}: file not found.".format(data))
@@ -74,16 +97,39 @@ def _check_type( value ):
     the correct type.
     """
     try:
-        int(value)
+        number = float(value)
+    except ValueError:
+        return value
+    try:
+        return int(value)
     except ValueError:
+        return number
+
+
+def _cast_column( values ):
+    """
+    Assigns the correct type to a whole column of read values at once.
+    Gives the same result as calling :func:`._check_type` on each value:
+    integers if all values are integers, floats if all are numbers and,
+    otherwise, each value is typed on its own.
+    """
+    if len(values) == 0:
+        return values
+    try:
+        tokens = np.array(values, dtype=bytes)
         try:
-            float(value)
+            return tokens.astype(np.int64)
         except ValueError:
-            return value
-        else:
-            return float(value)
-    else:
-        return int(value)
+            return tokens.astype(np.float64)
+    except (ValueError, OverflowError, UnicodeEncodeError):
+        return [_check_type( x ) for x in values]
+
+
+def _cast_columns( data, columns ):
+    """
+    Types the columns of data that hold values as read from the file.
+    """
+    return OrderedDict([(k, _cast_column(v) if k in columns else v) for k, v in data.items()])
 
 
 def _gather_file_list( filename, multi=False ):
@@ -184,6 +230,174 @@ def _fix_unloaded( data ):
     return data
 
 
+def _fix_new_columns( data, known, rows ):
+    """Pad with :data:`~numpy.nan` the columns that appeared in the last read decoy,
+    so that their values stay aligned with it and not with the first decoys.
+
+    This happens when files with different headers are read together.
+
+    :param data: Data read so far.
+    :param known: Columns that existed before the last decoy was read.
+    :param int rows: Number of decoys read before the last one.
+
+    :return: data
+    """
+    if rows > 0:
+        for k in data:
+            if k not in known:
+                data[k] = [np.nan, ] * rows + data[k]
+    return data
+
+
+def _iter_rosetta_data( lines, manager, chunksize=None ):
+    """Build the decoy data out of the lines yielded by :func:`.open_rosetta_file`.
+
+    Data is yielded as a :class:`~collections.OrderedDict` of :func:`list` every time
+    ``chunksize`` decoys have been completely read. If ``chunksize`` is :data:`None`,
+    all the data is yielded at once when the input is exhausted.
+
+    :param lines: Output of :func:`.open_rosetta_file`.
+    :param manager: Parsing rules.
+    :type manager: :class:`.Description`
+    :param int chunksize: Number of decoys per yielded chunk.
+
+    :yields: :class:`~collections.OrderedDict`
+    """
+    header  = []
+    data    = OrderedDict()
+    chains  = {"id": [], "seq": "", "dssp": "", "psipred": "", "phi": [], "psi": []}
+    count   = 0
+    plan    = None
+    skip    = False
+    # Columns stored as read; they get their type once the chunk is complete.
+    raw     = set()
+    # Columns present before the current decoy started.
+    known   = set()
+
+    for line, is_header, _, symm in lines:
+        if is_header:
+            header = manager.check_graft_columns(line.strip().split()[1:])
+            plan   = None
+            skip   = False
+            continue
+
+        if skip and not line.startswith("SCORE"):
+            continue
+
+        if line.startswith("SCORE"):
+            if plan is None:
+                plan = manager.get_column_plan( header[:-1] )
+                raw.update([name for _, name in plan[0]] + [plan[2]] +
+                           [x for x in manager.naming or [] if x != ""])
+            scores, per_res, description, filters = plan
+            fields = line.split()
+            values = manager.manage_missing( header[:-1], fields[1:-1] )
+
+            # Rejected decoys skip all their lines.
+            skip = not manager.keep_decoy( filters, values, fields[-1] )
+            if skip:
+                continue
+
+            # The previous decoy is complete; flush if the chunk is full.
+            if count > 0:
+                _fix_new_columns( data, known, count - 1 )
+            if chunksize is not None and count == chunksize:
+                yield _cast_columns( _fix_unloaded( data ), raw )
+                data  = OrderedDict()
+                count = 0
+            count += 1
+            known = set(data)
+
+            chains  = {"id": [], "seq": "", "dssp": "", "psipred": "", "phi": [], "psi": []}
+
+            _fix_unloaded( data )
+
+            # General scores
+            for cv, name in scores:
+                if cv < len(values):
+                    data.setdefault( name, [] ).append( values[cv] )
+
+            # Namings from the description
+            # Also, description is added separately from the rest... in case there are weird
+            # changes in the number of score terms without the previously expected header line.
+            dscptn = fields[-1]
+            if description is not None:
+                data.setdefault( description, []).append( dscptn )
+            for namingID, namingVL in manager.get_naming_pairs(dscptn):
+                data.setdefault( namingID, [] ).append( namingVL )
+
+            # Per-residue scores as a single array
+            for name, columns in per_res:
+                data.setdefault( name, [] ).append( [_check_type( values[cv] ) for cv in columns
+                                                     if cv < len(values)] )
+
+            # Setup labels
+            data = manager.setup_labels( data )
+            continue
+
+        if line.startswith("RES_NUM"):  # In multichains and not starting in A1.
+            for x in line.split()[1:-1]:
+                chain, numbers = x.split(":")
+                nums = numbers.split("-")
+                if len(nums) == 1 or nums[0] == "":
+                    nums = 1
+                else:
+                    nums = (int(nums[1]) - int(nums[0])) + 1
+                chains["id"].extend([chain, ] * nums)
+            continue
+
+        if line.startswith("SYMMETRY_INFO"):  # When working with symmetry, RES_NUM is not there...
+            chain = "".join(string.ascii_uppercase[:int(line.split()[2])])
+            for c in chain:
+                chains["id"].extend([c, ] * int(line.split()[4]))
+
+            data = _add_sequences( manager, data, chains )
+            continue
+
+        if line.startswith("ANNOTATED_SEQUENCE"):
+            chains["seq"] = list(re.sub( r'\[[^]]*\]', '', line.strip().split()[1] ))
+            if not symm:
+                # When info is chain A starting in 1, it is not printed in the silent file
+                if len(chains["id"]) == 0:
+                    chains["id"].extend(["A", ] * len(chains["seq"]))
+
+                data = _add_sequences( manager, data, chains )
+            else:
+                chains["seq"] = list("".join(chains["seq"]).rstrip("X"))
+
+            continue
+
+        if line.startswith("REMARK DSSP"):
+            chains["dssp"] = list(line.split()[2].strip())
+            continue
+        if line.startswith("REMARK PSIPRED"):
+            chains["psipred"] = list(line.split()[2].strip())
+            continue
+        if line.startswith("REMARK LABELS"):
+            for label in line.split()[2].split(";"):
+                labinfo = label.split(":")
+                if "lbl_" + labinfo[0].upper() in data:
+                    data["lbl_" + labinfo[0].upper()][-1] = labinfo[1]
+            continue
+        if line.startswith("REMARK PHI"):
+            try:
+                chains["phi"] = [float(x) for x in line.split()[2].strip().split(",")]
+            except IndexError:
+                chains["phi"] = []
+            continue
+        if line.startswith("REMARK PSI"):
+            try:
+                chains["psi"] = [float(x) for x in line.split()[2].strip().split(",")]
+            except IndexError:
+                chains["psi"] = []
+            continue
+
+    if count > 0:
+        _fix_new_columns( data, known, count - 1 )
+    if count > 0 or chunksize is None:
+        yield _cast_columns( _fix_unloaded( data ), raw )
+
+
 def open_rosetta_file( filename, multi=False, check_symmetry=True ):
     """
     *Internal function*; reads through a Rosetta silent file and yields only
@@ -200,6 +414,10 @@ def open_rosetta_file( filename, multi=False, check_symmetry=True ):
         4 :class:`bool` does the file contain symmetry info?
     ===== ============= ====================================
 
+    Each file is decompressed and read only once. When ``check_symmetry`` is :data:`True`,
+    the lines of the first decoy of each file are held until the next decoy starts, so that
+    the symmetry flag is already known when they are yielded.
+
     :param filename: file name, file pattern to search or list of files.
     :type filename: Union[:class:`str`, :func:`list`]
     :param multi: Tell if a file name (single file) or pattern (multifile) is provided.
@@ -212,34 +430,79 @@ def open_rosetta_file( filename, multi=False, check_symmetry=True ):
     :raises:
         :IOError: if ``filename`` cannot be found.
         :IOError: if ``filename`` pattern (``multi=True``) generates no files.
+        :ValueError: if any of the files is a binary minisilent file.
 
     .. seealso:
         :func:`parse_rosetta_file`
     """
-    symm = False
     files = _gather_file_list( filename, multi )
     for file_count, f in enumerate( files ):
-        if check_symmetry:
-            counter = 0
-            fd = gzip.open( f ) if f.endswith(".gz") else open( f )
-            for line in fd:
-                line = line.decode('utf8') if f.endswith(".gz") else line
-                if line.startswith('SYMMETRY_INFO'):
-                    symm = True
-                if line.startswith('SCORE') and not line.strip().split()[-1] == "description":
-                    counter += 1
-                if counter == 2:
-                    break
-            fd.close()
-        fd = gzip.open( f ) if f.endswith(".gz") else open( f )
-        for line in fd:
-            line = line.decode('utf8') if f.endswith(".gz") else line
-            if line.strip().split()[0].strip(":") in _headers:
-                yield line, line.strip().split()[-1] == "description", file_count, symm
+        fd, lines = _open_text_file( f )
+        if fd is None:
+            raise ValueError("{0}: binary minisilent files have no text lines; "
+                             "read them with parse_rosetta_file.".format(f))
+        for data in _filter_rosetta_lines( lines, file_count, check_symmetry ):
+            yield data
+        fd.close()
+
+
+def _open_text_file( filename ):
+    """Open a silent/score file, plain or gzipped, to read its lines.
+
+    Binary minisilent files are recognized by their first bytes, without
+    reading any further.
+
+    :param str filename: Name of the file.
+
+    :return: file object and its lines as :class:`str`; (:data:`None`, :data:`None`)
+        if the file is a binary minisilent file.
+    """
+    is_gz = filename.endswith(".gz")
+    fd = gzip.open( filename ) if is_gz else open( filename, 'rb' )
+    if fd.peek(len(_BINARY_MAGIC))[:len(_BINARY_MAGIC)] == _BINARY_MAGIC:
         fd.close()
+        return None, None
+    lines = (line.decode('utf8') for line in fd) if is_gz else io.TextIOWrapper(fd)
+    return fd, lines
+
 
+def _filter_rosetta_lines( lines, file_count=0, check_symmetry=True ):
+    """Keep the lines of a single silent file that the library knows how to parse.
 
-def parse_rosetta_file( filename, description=None, multi=False ):
+    :param lines: Lines of the file.
+    :param int file_count: Identifier of the file.
+    :param bool check_symmetry: Check if the silent file contains symmetry info.
+
+    :yields: Union[:class:`str`, :class:`bool`, :class:`int`, :class:`bool`] as
+        :func:`.open_rosetta_file`.
+    """
+    symm  = False
+    # With check_symmetry, the lines of the first decoy are held back until
+    # the next decoy starts, as SYMMETRY_INFO is found after its SCORE line.
+    held  = [] if check_symmetry else None
+    count = 0
+    for line in lines:
+        fields = line.split()
+        if len(fields) == 0 or fields[0].strip(":") not in _headers:
+            continue
+        is_header = fields[-1] == "description"
+        if held is not None:
+            if fields[0] == "SYMMETRY_INFO":
+                symm = True
+            if fields[0] == "SCORE:" and not is_header:
+                count += 1
+            if count < 2:
+                held.append((line, is_header))
+                continue
+            for hline, hheader in held:
+                yield hline, hheader, file_count, symm
+            held = None
+        yield line, is_header, file_count, symm
+    for hline, hheader in held or []:
+        yield hline, hheader, file_count, symm
+
+
+def parse_rosetta_file( filename, description=None, multi=False, workers=None, compact=False ):
     """Read a Rosetta score or silent file and returns the design population
     in a :class:`.DesignFrame`.
 
@@ -269,6 +532,23 @@ def parse_rosetta_file( filename, description=None, multi=False ):
         description = {'scores': ['RMSD'], 'scores_rename': {'total_score': 'score'}}
         df = rstoolbox.io.parse_rosetta_file("silentfile", description)
 
+    When reading from multiple files, each file is parsed in a different process (up to
+    ``workers`` at the same time) and the results are concatenated keeping the order of
+    the input files. Files that do not start with their own header are parsed together
+    with the file before them, as they depend on its header.
+
+    Binary minisilent files (see :func:`.write_binary_minisilent`) are recognized
+    automatically and loaded as they were stored, without tokenizing; ``description``
+    only applies to text files.
+
+    If :ref:`cache.active <options>` is :data:`True`, the parsed data is stored on disk
+    and later calls over the same, unmodified, files with the same ``description`` load
+    it from there without parsing the text again.
+
+    .. note::
+        Depends on :ref:`system.cpu <options>`, :ref:`cache.active <options>`,
+        :ref:`cache.path <options>` and :ref:`cache.size <options>`.
+
     :param filename: file name, file pattern to search or list of files.
     :type filename: Union[:class:`str`, :func:`list`]
     :param description: Parsing rules. It can be a dictionary describing
@@ -276,6 +556,11 @@ def parse_rosetta_file( filename, description=None, multi=False ):
         dictionary definition is explained in :ref:`tutorial: reading Rosetta <readrosetta>`.
     :type description: Union[:class:`str`, :class:`dict`]
     :param bool multi: When :data:`True`, indicates that data is readed from multiple files.
+    :param int workers: Number of processes used to read multiple files. If not provided,
+        it is loaded from the :ref:`system.cpu <options>` global option. Use 1 to read
+        all the files serially.
+    :param bool compact: When :data:`True`, the data is stored with a reduced memory
+        footprint, as done by :meth:`.DesignFrame.compact`.
 
     :return: :class:`.DesignFrame`.
 
@@ -295,127 +580,247 @@ def parse_rosetta_file( filename, description=None, multi=False ):
            ...: df.head(2)
     """
 
-    manager = rc.Description( **_file_vs_json( description ) )
-    header  = []
-    data    = OrderedDict()
+    description = _file_vs_json( description )
+    files       = _gather_file_list( filename, multi )
+    cachekey    = None
+    if core.get_option("cache", "active"):
+        cachekey = cache_key( files, description )
+        df = load_cached_rosetta_file( cachekey )
+        if df is not None:
+            return df.compact() if compact else df
+
+    workers = workers if workers is not None else core.get_option("system", "cpu")
+    workers = min(max(int(workers), 1), len(files))
+
+    if workers > 1:
+        kinds   = [_sniff_rosetta_file( f ) for f in files]
+        binary  = [f for f, k in zip(files, kinds) if k is None]
+        groups  = _group_rosetta_files( files, kinds )
+        workers = min(workers, len(groups))
+        args    = [(g, description) for g in groups]
+        if workers > 1:
+            pool = multiprocessing.Pool(workers)
+            try:
+                dfs = pool.map(_parse_rosetta_file_group, args)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            dfs = [_parse_rosetta_file_group(x) for x in args]
+    else:
+        binary = []
+        dfs = list(_iter_rosetta_frames( files, rc.Description( **description ), binary=binary ))
 
-    for line, is_header, _, symm in open_rosetta_file( filename, multi ):
-        if is_header:
-            header = manager.check_graft_columns(line.strip().split()[1:])
-            continue
+    if len(dfs) == 1 and len(binary) == 0:
+        df = dfs[0]
+    else:
+        df = _concat_rosetta_frames( dfs )
+    # Binary minisilent files keep the source files of the data they store.
+    df.add_source_files( [f for f in files if f not in binary] )
+    if cachekey is not None:
+        save_cached_rosetta_file( df, cachekey )
+    return df.compact() if compact else df
 
-        if line.startswith("SCORE"):
-            per_res = {}
-            chains  = {"id": [], "seq": "", "dssp": "", "psipred": "", "phi": [], "psi": []}
 
-            _fix_unloaded( data )
+def _sniff_rosetta_file( filename ):
+    """Check the kind of a silent/score file, opening it only once.
 
-            # General scores
-            for cv, value in enumerate( manager.manage_missing(header[:-1], line.strip().split()[1:-1])):
-                hcv = header[cv]
-                if manager.wanted_per_residue_score( hcv ):
-                    hcvn = re.sub(r'\d+$', "", hcv)
-                    per_res.setdefault( hcvn, {} )
-                    per_res[hcvn][int(re.findall(r'\d+$', hcv)[0])] = _check_type( value )
-                    continue
-                if manager.wanted_score( hcv ):
-                    data.setdefault( manager.score_name(hcv), []).append( _check_type( value ) )
+    :param str filename: Name of the file.
 
-            # Namings from the description
-            # Also, description is added separately from the rest... in case there are weird
-            # changes in the number of score terms without the previously expected header line.
-            dscptn = line.strip().split()[-1]
-            if manager.wanted_score( 'description' ):
-                data.setdefault( manager.score_name('description'), []).append(_check_type(dscptn))
-            manager.check_naming( header )
-            for namingID, namingVL in manager.get_naming_pairs(dscptn):
-                data.setdefault( namingID, [] ).append( _check_type( namingVL ) )
+    :return: :data:`None` for binary minisilent files; otherwise, :data:`True` if
+        the first ``SCORE`` line of the file is a header.
+    """
+    fd, lines = _open_text_file( filename )
+    if fd is None:
+        return None
+    try:
+        scores = (x for x in _filter_rosetta_lines( lines, check_symmetry=False )
+                  if x[0].startswith("SCORE"))
+        return next(scores, ("", True))[1]
+    finally:
+        fd.close()
 
-            # Fix per-residue
-            for k in per_res:
-                data.setdefault( k, [] ).append( OrderedDict(sorted(per_res[k].items())).values() )
 
-            # Setup labels
-            data = manager.setup_labels( data )
-            continue
+def _group_rosetta_files( files, kinds ):
+    """Split the files in groups that can be parsed independently.
 
-        if line.startswith("RES_NUM"):  # In multichains and not starting in A1.
-            for x in line.split()[1:-1]:
-                chain, numbers = x.split(":")
-                nums = numbers.split("-")
-                if len(nums) == 1 or nums[0] == "":
-                    nums = 1
-                else:
-                    nums = (int(nums[1]) - int(nums[0])) + 1
-                chains["id"].extend([chain, ] * nums)
-            continue
+    A text file that does not start with its own header uses the header of the
+    previous file, so it is kept in the same group. Binary minisilent files
+    are always a group on their own.
 
-        if line.startswith("SYMMETRY_INFO"):  # When working with symmetry, RES_NUM is not there...
-            chain = "".join(string.ascii_uppercase[:int(line.split()[2])])
-            for c in chain:
-                chains["id"].extend([c, ] * int(line.split()[4]))
+    :param files: Files to read, in order.
+    :type files: :func:`list` of :class:`str`
+    :param kinds: Kind of each file, as given by :func:`._sniff_rosetta_file`.
+    :type kinds: :func:`list`
 
-            data = _add_sequences( manager, data, chains )
-            continue
+    :return: :func:`list` of :func:`list` of :class:`str`
+    """
+    groups, previous = [], None
+    for f, kind in zip(files, kinds):
+        if kind is False and previous is not None:
+            groups[-1].append(f)
+        else:
+            groups.append([f, ])
+        previous = kind
+    return groups
 
-        if line.startswith("ANNOTATED_SEQUENCE"):
-            chains["seq"] = list(re.sub( r'\[[^]]*\]', '', line.strip().split()[1] ))
-            if not symm:
-                # When info is chain A starting in 1, it is not printed in the silent file
-                if len(chains["id"]) == 0:
-                    chains["id"].extend(["A", ] * len(chains["seq"]))
 
-                data = _add_sequences( manager, data, chains )
-            else:
-                chains["seq"] = list("".join(chains["seq"]).rstrip("X"))
+def _parse_rosetta_file_group( args ):
+    """Read a group of silent/score files; process worker of :func:`.parse_rosetta_file`.
 
-            continue
+    :param tuple args: List of file names and description dictionary.
 
-        if line.startswith("REMARK DSSP"):
-            chains["dssp"] = list(line.split()[2].strip())
-            continue
-        if line.startswith("REMARK PSIPRED"):
-            chains["psipred"] = list(line.split()[2].strip())
-            continue
-        if line.startswith("REMARK LABELS"):
-            for label in line.split()[2].split(";"):
-                labinfo = label.split(":")
-                if "lbl_" + labinfo[0].upper() in data:
-                    data["lbl_" + labinfo[0].upper()][-1] = labinfo[1]
-            continue
-        if line.startswith("REMARK PHI"):
-            try:
-                chains["phi"] = [float(x) for x in line.split()[2].strip().split(",")]
-            except IndexError:
-                chains["phi"] = []
-            continue
-        if line.startswith("REMARK PSI"):
-            try:
-                chains["psi"] = [float(x) for x in line.split()[2].strip().split(",")]
-            except IndexError:
-                chains["psi"] = []
-            continue
+    :return: :class:`.DesignFrame`.
+    """
+    files, description = args
+    dfs = list(_iter_rosetta_frames( files, rc.Description( **description ) ))
+    return dfs[0] if len(dfs) == 1 else _concat_rosetta_frames( dfs )
 
-    df = rc.DesignFrame( _fix_unloaded( data ) )
-    df.add_source_files( _gather_file_list( filename, multi ) )
-    return df
 
+def _iter_rosetta_frames( files, manager, binary=None ):
+    """Read silent/score files in order, opening each of them only once.
+
+    Consecutive text files are parsed together, as they can share headers, while
+    binary minisilent files are loaded as they were stored.
+
+    :param files: Files to read, in order.
+    :type files: :func:`list` of :class:`str`
+    :param manager: Parsing rules.
+    :type manager: :class:`.Description`
+    :param binary: If provided, binary minisilent files are appended to it as
+        they are found.
+    :type binary: :func:`list`
+
+    :yields: :class:`.DesignFrame`.
+    """
+    files, found, empty = iter(files), [], True
+
+    def text_lines():
+        for file_count, f in enumerate(files):
+            fd, lines = _open_text_file( f )
+            if fd is None:
+                found.append(f)
+                return
+            for data in _filter_rosetta_lines( lines, file_count ):
+                yield data
+            fd.close()
+
+    while True:
+        del found[:]
+        data = next(_iter_rosetta_data( text_lines(), manager ))
+        if len(data) > 0:
+            empty = False
+            yield rc.DesignFrame( data )
+        if len(found) == 0:
+            break
+        if binary is not None:
+            binary.append(found[0])
+        empty = False
+        yield read_binary_minisilent( found[0] )
+    if empty:
+        yield rc.DesignFrame()
+
+
+def _concat_rosetta_frames( dfs ):
+    """Join the :class:`.DesignFrame` read from different files, keeping their
+    source files and reference data.
+
+    :param dfs: Data to join, in order.
+    :type dfs: :func:`list` of :class:`.DesignFrame`
+
+    :return: :class:`.DesignFrame`.
+    """
+    source, reference = set(), {}
+    for x in dfs:
+        source.update(x._source_files)
+        reference.update(x._reference)
+    return rc.DesignFrame(pd.concat(dfs, sort=False).reset_index(drop=True),
+                          reference=reference, source=source)
+
+
+def iter_rosetta_file( filename, description=None, multi=False, chunksize=10000 ):
+    """Read a Rosetta score or silent file in chunks of decoys, yielding a
+    :class:`.DesignFrame` for each of them.
+
+    Parsing rules are the same as in :func:`.parse_rosetta_file`, but data is never
+    accumulated for more than ``chunksize`` decoys, which keeps memory bounded when
+    working with very large silent files::
+
+        for df in rstoolbox.io.iter_rosetta_file("silentfile", {'sequence': 'A'}, chunksize=5000):
+            df = df[df['score'] < -100]
+
+    Concatenating all the yielded chunks is equivalent to the :class:`.DesignFrame`
+    returned by :func:`.parse_rosetta_file`. Binary minisilent files (see
+    :func:`.write_binary_minisilent`) are loaded at once and yielded in chunks of
+    the same size; ``description`` only applies to text files.
+
+    :param filename: file name, file pattern to search or list of files.
+    :type filename: Union[:class:`str`, :func:`list`]
+    :param description: Parsing rules. It can be a dictionary describing
+        the rules or the name of a file containing such dictionary. The
+        dictionary definition is explained in :ref:`tutorial: reading Rosetta <readrosetta>`.
+    :type description: Union[:class:`str`, :class:`dict`]
+    :param bool multi: When :data:`True`, indicates that data is readed from multiple files.
+    :param int chunksize: Maximum number of decoys in each yielded :class:`.DesignFrame`.
+
+    :yields: :class:`.DesignFrame`.
+
+    :raises:
+        :IOError: if ``filename`` cannot be found.
+        :IOError: if ``filename`` pattern (``multi=True``) generates no files.
+        :ValueError: if ``chunksize`` is not a positive number.
+
+    .. seealso::
+        :func:`.parse_rosetta_file`
+    """
+    if chunksize is None or int(chunksize) < 1:
+        raise ValueError("chunksize must be a positive number of decoys.")
+
+    chunksize = int(chunksize)
+    manager   = rc.Description( **_file_vs_json( description ) )
+    files     = _gather_file_list( filename, multi )
+    binary    = [f for f in files if is_binary_minisilent( f )]
+    text      = [f for f in files if f not in binary]
+    # Consecutive text files are read together, as they can share headers.
+    for is_binary, group in itertools.groupby(files, lambda f: f in binary):
+        if is_binary:
+            for f in group:
+                df = read_binary_minisilent( f )
+                for i in range(0, df.shape[0], chunksize):
+                    yield df.iloc[i:i + chunksize].reset_index(drop=True)
+            continue
+        for data in _iter_rosetta_data( open_rosetta_file( list(group) ), manager, chunksize ):
+            df = rc.DesignFrame( data )
+            df.add_source_files( text )
+            yield df
 
-def parse_rosetta_json( filename ):
+
+def parse_rosetta_json( filename, multi=False, columns=None, dtype=None, chunksize=10000 ):
     """Read a json formated rosetta score file.
 
     Only reads back scores, as those are the only content present in a ``JSON`` file.
+    Files are read in chunks of ``chunksize`` lines, each of them decoded at once.
 
-    :param str filename: File containing the Rosetta score file.
+    :param filename: file name, file pattern to search or list of files.
+    :type filename: Union[:class:`str`, :func:`list`]
+    :param bool multi: When :data:`True`, indicates that data is readed from multiple files.
+    :param columns: Scores to keep. ``description`` is always kept. By default, all
+        scores are loaded.
+    :type columns: :func:`list` of :class:`str`
+    :param dtype: Type to which scores are cast. Either a single type applied to all the
+        numeric scores or a :class:`dict` with the type of each score.
+    :type dtype: Union[:class:`str`, :class:`type`, :class:`dict`]
+    :param int chunksize: Number of lines decoded at once.
 
     :return: :class:`.DesignFrame`.
 
     .. note::
         To be coherent with the silent files, the decoy id column name ``decoy`` is
-        changed to ``description``.
+        changed to ``description``, which is placed as the last column.
 
     :raises:
         :IOError: if ``filename`` cannot be found.
+        :IOError: if ``filename`` pattern (``multi=True``) generates no files.
 
     .. rubric:: Example
 
@@ -428,19 +833,34 @@ def parse_rosetta_json( filename ):
            ...: df = parse_rosetta_json("../rstoolbox/tests/data/score.json.gz")
            ...: df.head(2)
     """
-    is_gz = filename.endswith(".gz")
-    fd = gzip.open( filename ) if is_gz else open( filename )
-    data = {}
-    for line in fd:
-        if is_gz:
-            dt = json.loads(line.decode('utf8').strip())
-        else:
-            dt = json.loads(line.strip())
-        for k in dt:
-            data.setdefault(k, []).append(dt[k])
-    df = rc.DesignFrame( data )
-    df.rename(columns={'decoy': 'description'})
-    df.add_source_file( filename )
+    files = _gather_file_list( filename, multi )
+    keep = None if columns is None else set(columns).union(['decoy', 'description'])
+    data = []
+    for f in files:
+        fd = gzip.open( f ) if f.endswith(".gz") else open( f, 'rb' )
+        while True:
+            lines = [x.strip() for x in itertools.islice(fd, chunksize)]
+            if len(lines) == 0:
+                break
+            # A chunk of lines becomes a single json array decoded in one call.
+            chunk = pd.DataFrame(json.loads(b'[' + b','.join([x for x in lines if x]) + b']'))
+            if keep is not None:
+                chunk = chunk[[c for c in chunk.columns if c in keep]]
+            data.append(chunk)
+        fd.close()
+    if len(data) == 0:
+        return rc.DesignFrame()
+
+    df = pd.concat(data, sort=False).reset_index(drop=True)
+    df = df.rename(columns={'decoy': 'description'})
+    if 'description' in df:
+        df = df[[c for c in df.columns if c != 'description'] + ['description']]
+    if dtype is not None:
+        if not isinstance(dtype, dict):
+            dtype = {c: dtype for c in df.columns if df[c].dtype.kind in ['i', 'u', 'f']}
+        df = df.astype({c: dtype[c] for c in dtype if c in df})
+    df = rc.DesignFrame( df )
+    df.add_source_files( files )
     return df
 
 
@@ -451,7 +871,7 @@ def parse_rosetta_pdb( filename, keep_weights=False, per_residue=False, dropna=T
     the executed score function. It will not add other score terms added through
     filters.
 
-    :param str filename: Name of the PDB file.
+    :param str filename: Name of the PDB file. It can be gzipped.
     :param bool keep_weights: If :data:`True`, keep the weights row.
     :param bool per_residue: If :data:`True`, keep a row of data for each residue.
         Otherwise, compress the sequence into ``sequence_{}`` columns.
@@ -462,23 +882,7 @@ def parse_rosetta_pdb( filename, keep_weights=False, per_residue=False, dropna=T
 
     :return: :class:`.DesignFrame`
     """
-    def chain_ids(infile):
-        with open(infile) as fp:
-            for result in re.findall(r'ATOM.{17}(\w)', fp.read(), re.S):
-                yield result
-
-    def data_between(infile):
-        with open(infile) as fp:
-            for result in re.findall(r'(#BEGIN_POSE_ENERGIES_TABLE.*?#END_POSE_ENERGIES_TABLE)',
-                                     fp.read(), re.S):
-                return result
-    d = {'CYS': 'C', 'ASP': 'D', 'SER': 'S', 'GLN': 'Q', 'LYS': 'K',
-         'ILE': 'I', 'PRO': 'P', 'THR': 'T', 'PHE': 'F', 'ASN': 'N',
-         'GLY': 'G', 'HIS': 'H', 'LEU': 'L', 'ARG': 'R', 'TRP': 'W',
-         'ALA': 'A', 'VAL': 'V', 'GLU': 'E', 'TYR': 'Y', 'MET': 'M'}
-
-    chains = list(pd.Series(chain_ids(filename)).unique())
-    idata = data_between(filename)
+    chains, idata = _read_pdb_energies( filename )
     name = idata.split('\n')[0].strip().split()[-1].replace('.pdb', '')
     df = pd.read_csv(six.StringIO(idata), comment='#', sep=r'\s+')
     df = df.assign(description=[name, ] * df.shape[0])[~df['label'].str.startswith('VRT_')]
@@ -502,7 +906,7 @@ def parse_rosetta_pdb( filename, keep_weights=False, per_residue=False, dropna=T
         sdata = {'description': [name, ]}
         for g, gdf in df[df['chain'] != ''].groupby('chain'):
             sdata.setdefault('sequence_{}'.format(g),
-                             [''.join(gdf['label'].str.split('[:_]').str[0].map(d).fillna('X'))])
+                             [''.join(gdf['label'].str.split('[:_]').str[0].map(_AA3TO1).fillna('X'))])
             if dropna:
                 sdata['sequence_{}'.format(g)][-1] = sdata['sequence_{}'.format(g)][-1].replace('X', '')
         df = df[df['label'].isin(pick)].merge(pd.DataFrame(sdata), on='description')
@@ -513,6 +917,89 @@ def parse_rosetta_pdb( filename, keep_weights=False, per_residue=False, dropna=T
     return rc.DesignFrame( df )
 
 
+def _read_pdb_energies( filename ):
+    """Read, in a single pass, the chain identifiers and the ``POSE_ENERGIES_TABLE``
+    of a PDB file.
+
+    :param str filename: Name of the PDB file. It can be gzipped.
+
+    :return: Union[:func:`list` of :class:`str`, :class:`str`] - chains in order of
+        appearance and text of the table.
+
+    :raises:
+        :ValueError: if the file has no ``POSE_ENERGIES_TABLE``.
+    """
+    chains, table, inside = [], [], False
+    fd = gzip.open( filename, 'rt' ) if filename.endswith('.gz') else open( filename )
+    for line in fd:
+        if inside:
+            table.append(line)
+            if line.startswith('#END_POSE_ENERGIES_TABLE'):
+                break
+        elif line.startswith('ATOM'):
+            if len(line) > 21 and (line[21].isalnum() or line[21] == '_') and line[21] not in chains:
+                chains.append(line[21])
+        elif line.startswith('#BEGIN_POSE_ENERGIES_TABLE'):
+            inside = True
+            table.append(line)
+    fd.close()
+    if len(table) == 0:
+        raise ValueError('{}: no POSE_ENERGIES_TABLE found.'.format(filename))
+    return chains, ''.join(table)
+
+
+def parse_rosetta_pdbs( files, keep_weights=False, per_residue=False, dropna=True, workers=None ):
+    """Read the ``POSE_ENERGIES_TABLE`` from multiple Rosetta output PDB files.
+
+    Each file is read once, as in :func:`.parse_rosetta_pdb`, and files are split
+    between ``workers`` processes. Data is returned in the order of ``files``.
+
+    .. note::
+        Depends on :ref:`system.cpu <options>`.
+
+    :param files: Names of the PDB files. They can be gzipped.
+    :type files: :func:`list` of :class:`str`
+    :param bool keep_weights: If :data:`True`, keep the weights row.
+    :param bool per_residue: If :data:`True`, keep a row of data for each residue.
+        Otherwise, compress the sequence into ``sequence_{}`` columns.
+    :param bool dropna: If :data:`True`, non-standard residues are dropped when making
+        the sequence. Otherwise, it appears as ``X``.
+    :param int workers: Number of processes used. If not provided, it is loaded from the
+        :ref:`system.cpu <options>` global option.
+
+    :return: :class:`.DesignFrame`
+
+    :raises:
+        :IOError: if no ``files`` are provided.
+    """
+    files   = _gather_file_list( files, True )
+    args    = [(f, keep_weights, per_residue, dropna) for f in files]
+    workers = workers if workers is not None else core.get_option("system", "cpu")
+    workers = min(max(int(workers), 1), len(files))
+
+    if workers > 1:
+        pool = multiprocessing.Pool(workers)
+        try:
+            dfs = pool.map(_parse_single_rosetta_pdb, args,
+                           chunksize=max(1, len(args) // (workers * 4)))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        dfs = [_parse_single_rosetta_pdb(x) for x in args]
+    return rc.DesignFrame(pd.concat(dfs, sort=False).reset_index(drop=True))
+
+
+def _parse_single_rosetta_pdb( args ):
+    """Read a single PDB file; process worker of :func:`.parse_rosetta_pdbs`.
+
+    :param tuple args: Arguments of :func:`.parse_rosetta_pdb`.
+
+    :return: :class:`.DesignFrame`.
+    """
+    return parse_rosetta_pdb( *args )
+
+
 def parse_rosetta_contacts( filename ):
     """Read a residue contact file as generated by **ContactMapMover**.
 
@@ -554,13 +1041,85 @@ def parse_rosetta_contacts( filename ):
     return df, rows, cols
 
 
+def _fragment_fields( fformat ):
+    """Token index of each fragment column for the new (1) and old (0) formats.
+    """
+    if fformat == 1:
+        return OrderedDict([("position", 0), ("pdb", 2), ("aa", 4), ("sse", 5),
+                            ("phi", 6), ("psi", 7), ("omega", 8)])
+    return OrderedDict([("pdb", 0), ("aa", 3), ("sse", 4), ("phi", 5), ("psi", 6), ("omega", 7)])
+
+
+def _decode_strings( column ):
+    """Decode a column of fixed-width byte strings, converting each different value once.
+
+    :param column: Fixed-width values.
+    :type column: :class:`~numpy.ndarray` of :class:`~numpy.bytes_`
+
+    :return: :class:`~numpy.ndarray` of :class:`str`
+    """
+    width = column.dtype.itemsize
+    if width <= 8:
+        # Short values are hashed as integers.
+        keys = np.zeros((len(column), 8), dtype=np.uint8)
+        keys[:, :width] = column.view(np.uint8).reshape(-1, width)
+        codes, uniques = pd.factorize(keys.view(np.uint64).ravel())
+        uniques = uniques.view('S8')
+    else:
+        codes, uniques = pd.factorize(column)
+    uniques = np.array([x.decode('utf8').strip() for x in uniques], dtype=object)
+    return uniques[codes]
+
+
+def _parse_fragment_body( lines, fformat ):
+    """Parse, in bulk, the lines describing the fragment residues.
+
+    When all the lines share the same fixed-width layout, the columns are sliced
+    directly from the character matrix; otherwise they are read as whitespace-separated
+    values.
+
+    :param lines: Fragment residue lines.
+    :type lines: :func:`list` of :class:`bytes`
+    :param int fformat: Fragment file format; 1 for new, 0 for old.
+
+    :return: :class:`dict` of :class:`~numpy.ndarray`
+    """
+    fields = _fragment_fields( fformat )
+    types  = {"position": np.int64, "phi": np.float64, "psi": np.float64, "omega": np.float64}
+    spans  = [m.span() for m in re.finditer(br'\S+', lines[0])]
+    width  = len(lines[0])
+    if len(spans) > max(fields.values()) and len(set(map(len, lines))) == 1:
+        body = np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(-1, width)
+        # Fields are right-aligned: all lines must end their tokens at the same columns.
+        ends = [e for _, e in spans]
+        if (body[:, [e for e in ends if e < width]] == ord(' ')).all() and \
+           (body[:, [e - 1 for e in ends]] != ord(' ')).all():
+            data = {}
+            try:
+                for name, i in fields.items():
+                    column = np.ascontiguousarray(body[:, spans[i - 1][1] if i > 0 else 0:ends[i]])
+                    column = column.view('S{}'.format(column.shape[1])).ravel()
+                    if name in types:
+                        data[name] = column.astype(types[name])
+                    else:
+                        data[name] = _decode_strings(column)
+                return data
+            except ValueError:
+                pass
+    df = pd.read_csv(six.BytesIO(b"\n".join(lines)), delim_whitespace=True, header=None,
+                     names=range(len(spans)), usecols=list(fields.values()),
+                     dtype={i: types.get(name, str) for name, i in fields.items()})
+    return {name: df[i].values for name, i in fields.items()}
+
+
 def parse_rosetta_fragments( filename, source=None ):
     """Read a Rosetta fragment-file and return the appropiate :class:`.FragmentFrame`.
 
-    It supports both old and new fragment formats.
-    Does not support varying size fragment sets. When working with both *small* and
-    *large* fragments sets, one would need to call the function twice and save the
-    data of each in a different variable.
+    It supports both old and new fragment formats, as well as varying size fragment
+    sets; the ``size`` of each fragment is that of its own block of residues.
+
+    The residue lines are parsed in bulk; when they share the fixed-width layout written
+    by **Rosetta**, the columns are read directly from their fixed positions.
 
     :param str filename: File containing the Rosetta fragments.
     :param str source: If provided, add a column ``source`` with a source identifier.
@@ -574,83 +1133,190 @@ def parse_rosetta_fragments( filename, source=None ):
         :func:`.plot_fragments`
         :func:`.plot_fragment_profiles`
     """
-    fformat = 1  # formats are identified as 1 and 0
-    data = OrderedDict({"pdb": [], "frame": [], "neighbors": [], "neighbor": [], "position": [],
-                        "size": [], "aa": [], "sse": [], "phi": [], "psi": [], "omega": []})
-
+    columns = ["pdb", "frame", "neighbors", "neighbor", "position", "size",
+               "aa", "sse", "phi", "psi", "omega"]
     if not os.path.isfile(filename):
         raise IOError("{} not found!".format(filename))
 
-    fframe, fne, fpos, fsize = None, None, None, None
-    fsaved_size = 0
-    nei = 0
-    was_space = False
-    fd = gzip.open( filename ) if filename.endswith(".gz") else open( filename )
-    for line in fd:
-        line = line.decode('utf8') if filename.endswith(".gz") else line
-        line = line.strip()
-        if line == "":
-            fpos = int(fframe)
-            if fsize != 0:
-                fsaved_size = fsize
-            fsize = 0
-            if not was_space:
-                nei += 1
-            was_space = True
-            continue
-        line = line.split()
-        if line[0] == "FRAME":
-            fformat = 1
-            fframe = line[1]
-            fpos = int(fframe)
-            fsize = 0
-            nei = 0
-        elif line[0] == "position:":
-            fformat = 0
-            fframe = line[1]
-            fne = line[-1]
-            nei = -1
-        else:
-            if fformat == 1:
-                data["pdb"].append(str(line[2]))
-            else:
-                data["pdb"].append(str(line[0]))
-            data["frame"].append(int(fframe))
-            data["neighbors"].append(fne)
-            data["neighbor"].append(nei + 1)
-            data["position"].append(int(line[0] if bool(fformat) else fpos))
-            data["aa"].append(line[3 + fformat])
-            data["sse"].append(line[4 + fformat])
-            data["phi"].append(float(line[5 + fformat]))
-            data["psi"].append(float(line[6 + fformat]))
-            data["omega"].append(float(line[7 + fformat]))
-
-            fpos += 1
-            fsize += 1
-        was_space = False
+    fd = gzip.open( filename ) if filename.endswith(".gz") else open( filename, 'rb' )
+    text = fd.read().replace(b'\r', b'')
     fd.close()
-    data["size"] = [fsaved_size, ] * len(data["frame"])
-
-    df = rc.FragmentFrame(data, file=filename)
-    if bool(fformat):
-        df2 = df.groupby(["frame", "size"]).size().reset_index(name="neighbors")
-        df2["neighbors"] = (df2["neighbors"] / df2["size"]).astype(int)
-        df = df.merge(df2, on=["frame", "size"])
-        df = df.drop(["neighbors_x"], axis=1)
-        df = df.rename({"neighbors_y": "neighbors"}, axis=1)
-    df = df.reindex(["pdb", "frame", "neighbors", "neighbor", "position", "size",
-                     "aa", "sse", "phi", "psi", "omega"], axis=1)
+    lines = text.split(b'\n')
+
+    # Classify the lines: blank (0), frame header (1) or fragment residue (2).
+    length = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines))
+    kind = np.where(np.fromiter(map(bytes.isspace, lines), dtype=bool, count=len(lines)) | (length == 0),
+                    0, 2).astype(np.int8)
+    offsets = np.cumsum(length + 1)
+    hdrs = []
+    for key in [b'FRAME', b'position:']:
+        i = text.find(key)
+        while i >= 0:
+            hdrs.append(np.searchsorted(offsets, i, side='right'))
+            i = text.find(key, i + 1)
+    hdrs = np.array(sorted([i for i in hdrs if lines[i].split()[0] in (b'FRAME', b'position:')]),
+                    dtype=np.int64)
+    if len(hdrs) == 0:
+        return rc.FragmentFrame(columns=columns)
+    kind[hdrs] = 1
+    kind[:hdrs[0]] = 0
+    hvals = [lines[i].split() for i in hdrs]
+    fformat = 1 if hvals[0][0] == b'FRAME' else 0
+    isdata = kind == 2
+    rows = np.flatnonzero(isdata)
+    if len(rows) == 0:
+        return rc.FragmentFrame(columns=columns)
+
+    # Each row belongs to the last header and to a block of consecutive residue lines.
+    owner = np.maximum.accumulate(np.where(kind == 1, np.arange(len(kind)), 0))[rows]
+    owner = np.searchsorted(hdrs, owner)
+    bstart = isdata & ~np.concatenate([[False], isdata[:-1]])
+    blocks = np.cumsum(bstart)
+    block = blocks[rows] - 1
+    first = np.flatnonzero(bstart)
+    sizes = np.bincount(block)
+
+    data = _parse_fragment_body( list(operator.itemgetter(*rows)(lines)) if len(rows) > 1
+                                 else [lines[i] for i in rows], fformat )
+    data["frame"] = np.array([int(x[1]) for x in hvals], dtype=np.int64)[owner]
+    data["neighbor"] = blocks[rows] - blocks[hdrs][owner]
+    data["size"] = sizes[block]
+    if fformat == 1:
+        bframe = data["frame"][np.concatenate([[0], np.cumsum(sizes)[:-1]])]
+        counts = pd.Series(1, index=pd.MultiIndex.from_arrays([bframe, sizes]))
+        counts = counts.groupby(level=[0, 1]).transform('size').values
+        data["neighbors"] = counts[block]
+    else:
+        data["neighbors"] = np.array([int(x[-1]) for x in hvals], dtype=np.int64)[owner]
+        data["position"] = data["frame"] + (rows - first[block])
 
+    df = rc.FragmentFrame(OrderedDict([(c, data[c]) for c in columns]), file=filename)
     if source is not None:
         df = df.assign(source=source)
     return df
 
 
-def write_rosetta_fragments( df, frag_size=None, n_frags=200, prefix='rosetta_frags', strict=False ):
+def _fixed_width_column( values, width, decimals=None ):
+    """Right-aligned text of a numeric column, as ``'{:>{width}.{decimals}f}'`` or
+    ``'{:>{width}d}'`` would write it, built for the whole column at once.
+
+    :param values: Numbers to write.
+    :type values: :class:`~numpy.ndarray`
+    :param int width: Width of the column.
+    :param int decimals: Number of decimals; :data:`None` for integers.
+
+    :return: :class:`~numpy.ndarray` of :class:`~numpy.uint8` with shape ``(len(values), width)``
+        or :data:`None` if some value does not fit in ``width`` characters.
+    """
+    values = np.asarray(values)
+    if decimals is None:
+        if values.dtype.kind not in ['i', 'u']:
+            return None
+        mag, sign, point = np.abs(values).astype(np.int64), values < 0, 0
+    else:
+        values = values.astype(np.float64)
+        if not np.isfinite(values).all():
+            return None
+        scaled = values * 10 ** decimals
+        mag, sign, point = np.abs(np.rint(scaled)).astype(np.int64), np.signbit(values), decimals + 1
+    ipart = mag // 10 ** decimals if decimals else mag
+    ndigits = np.ones(len(mag), dtype=np.int64)
+    for j in range(1, 19):
+        ndigits += ipart >= 10 ** j
+    length = ndigits + point + sign
+    if len(length) > 0 and length.max() > width:
+        return None
+
+    text = np.full((len(mag), width), ord(' '), dtype=np.uint8)
+    for j in range(decimals or 0):
+        text[:, width - 1 - j] = ord('0') + (mag // 10 ** j) % 10
+    if decimals:
+        text[:, width - point] = ord('.')
+    for j in range(ndigits.max() if len(mag) > 0 else 0):
+        rows = np.flatnonzero(ndigits > j)
+        text[rows, width - point - 1 - j] = ord('0') + (ipart[rows] // 10 ** j) % 10
+    rows = np.flatnonzero(sign)
+    text[rows, width - length[rows]] = ord('-')
+    if decimals:
+        # Values close to a rounding tie are written by python itself.
+        for i in np.flatnonzero(np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-4):
+            value = '{:>{}.{}f}'.format(values[i], width, decimals).encode()
+            if len(value) > width:
+                return None
+            text[i] = np.frombuffer(value, dtype=np.uint8)
+    return text
+
+
+def _fixed_width_strings( values, width=0 ):
+    """Left-aligned text of a string column, as ``'{:{width}s}'`` would write it.
+
+    :param values: Strings to write.
+    :type values: :class:`~numpy.ndarray`
+    :param int width: Minimum width of the column; shorter values are padded with spaces.
+
+    :return: :class:`~numpy.ndarray` of :class:`~numpy.uint8` with shape ``(len(values), width)``
+        or :data:`None` if the values do not share the same length (when over ``width``).
+    """
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    if (codes < 0).any() or not all([isinstance(x, six.string_types) for x in uniques]):
+        return None
+    try:
+        # Each different value is encoded once.
+        values = np.array([x.encode('ascii') for x in uniques], dtype=bytes)[codes]
+    except UnicodeEncodeError:
+        return None
+    size = values.dtype.itemsize
+    text = values.view(np.uint8).reshape(len(values), size)
+    empty = text == 0
+    if size > width and empty.any():
+        return None
+    text = np.where(empty, ord(' '), text).astype(np.uint8)
+    if size < width:
+        text = np.hstack([text, np.full((len(values), width - size), ord(' '), dtype=np.uint8)])
+    return text
+
+
+def _join_columns( pieces, count ):
+    """Join fixed-width columns and literal text into one line per row.
+
+    :param pieces: Columns (as given by :func:`._fixed_width_column` or
+        :func:`._fixed_width_strings`) and :class:`bytes` literals.
+    :type pieces: :func:`list`
+    :param int count: Number of rows.
+
+    :return: :class:`~numpy.ndarray` of :class:`bytes` (object) or :data:`None` if any
+        column could not be built.
+    """
+    if any([x is None for x in pieces]):
+        return None
+    blocks = [x if isinstance(x, np.ndarray) else
+              np.tile(np.frombuffer(x, dtype=np.uint8), (count, 1)) for x in pieces]
+    text = np.ascontiguousarray(np.hstack(blocks))
+    return np.array(text.view('S{}'.format(text.shape[1])).ravel().tolist() if count > 0 else [],
+                    dtype=object)
+
+
+def _write_text_blocks( ofile, lines, compress, blocksize=100000 ):
+    """Write the text lines into a file in large blocks.
+
+    :return: :class:`str` - name of the file.
+    """
+    if compress:
+        ofile += '.gz'
+    with (gzip.open( ofile, 'wb' ) if compress else open( ofile, 'wb' )) as f:
+        for i in range(0, len(lines), blocksize):
+            f.write(b"".join(lines[i:i + blocksize]))
+    return ofile
+
+
+def write_rosetta_fragments( df, frag_size=None, n_frags=200, prefix='rosetta_frags', strict=False,
+                             compress=False ):
     """Writes a Rosetta fragment-file (new format) from an appropiate :class:`.FragmentFrame`.
 
     Supports varying size fragment sets.
 
+    Lines are formatted for whole columns at once and written in large blocks.
+
     :param df: Selected set of fragments that have to be written.
     :type df: :class:`.DesignFrame`
     :param int frag_size: Size of the fragments.
@@ -661,6 +1327,7 @@ def write_rosetta_fragments( df, frag_size=None, n_frags=200, prefix='rosetta_fr
         starts in 1 and contains the same ``n_frags`` at each position. Otherwise, it adapts to
         the actual content of the :class:`.FragmentFrame`. Also, ``strict==True`` will print new
         fragments format while ``strict==False`` will print the old fragments format.
+    :param bool compress: If :data:`True`, the file is gzipped and a ``.gz`` extension is added.
 
     :return: :class:`str` - name of the newly generated file.
 
@@ -671,12 +1338,12 @@ def write_rosetta_fragments( df, frag_size=None, n_frags=200, prefix='rosetta_fr
     if not strict:
         if frag_size is None:
             raise AttributeError('Specify a frag_size!')
-        return _nonstrict_write_rosetta_fragments(df, frag_size, n_frags, prefix)
+        return _nonstrict_write_rosetta_fragments(df, frag_size, n_frags, prefix, compress)
     else:
-        return _strict_write_rosetta_fragments(df, prefix)
+        return _strict_write_rosetta_fragments(df, prefix, compress)
 
 
-def _nonstrict_write_rosetta_fragments( df, frag_size, n_frags=200, prefix='rosetta_frags' ):
+def _nonstrict_write_rosetta_fragments( df, frag_size, n_frags=200, prefix='rosetta_frags', compress=False ):
     """:func:`.write_rosetta_fragments` with ``strict`` as :data:`False`.
 
     :return: :class:`str` - name of the newly generated file.
@@ -684,50 +1351,80 @@ def _nonstrict_write_rosetta_fragments( df, frag_size, n_frags=200, prefix='rose
     _STRING = " {:4s} {:1s} {:5d} {:1s} {:1s} {:8.3f} {:8.3f} {:8.3f}\n"
     _HEADER = "position:            {} neighbors:          {}\n\n"
     ofile = "{}.{}mers".format(prefix, frag_size)
-    with open(ofile, "w") as f:
-        frame_count = 0
-        for i in range(len(df)):
-            if i % ((frag_size * n_frags)) == 0:
-                frame_count += 1
-                f.write(_HEADER.format(frame_count, n_frags))
-            f.write(_STRING.format( df.iloc[i]["pdb"],
-                                    "X", int(0),
-                                    df.iloc[i]["aa"],
-                                    df.iloc[i]["sse"],
-                                    df.iloc[i]["phi"],
-                                    df.iloc[i]["psi"],
-                                    df.iloc[i]["omega"]) )
-            if i != 0 and (i + 1) % frag_size == 0:
-                f.write("\n")
-    return ofile
-
 
-def _strict_write_rosetta_fragments( df, prefix ):
+    count = len(df)
+    lines = _join_columns([b' ', _fixed_width_strings(df['pdb'].values, 4), b' X     0 ',
+                           _fixed_width_strings(df['aa'].values, 1), b' ',
+                           _fixed_width_strings(df['sse'].values, 1), b' ',
+                           _fixed_width_column(df['phi'].values, 8, 3), b' ',
+                           _fixed_width_column(df['psi'].values, 8, 3), b' ',
+                           _fixed_width_column(df['omega'].values, 8, 3), b'\n'], count)
+    if lines is None:
+        lines = np.array([x.encode('utf8') for x in map(_STRING.format, df['pdb'], itertools.repeat('X'),
+                                                        itertools.repeat(0), df['aa'], df['sse'],
+                                                        df['phi'], df['psi'], df['omega'])], dtype=object)
+
+    rows = np.arange(count)
+    for frame_count, i in enumerate(np.flatnonzero(rows % (frag_size * n_frags) == 0)):
+        lines[i] = _HEADER.format(frame_count + 1, n_frags).encode('utf8') + lines[i]
+    ends = np.flatnonzero((rows != 0) & ((rows + 1) % frag_size == 0))
+    lines[ends] = lines[ends] + b'\n'
+    return _write_text_blocks(ofile, lines, compress)
+
+
+def _strict_write_rosetta_fragments( df, prefix, compress=False ):
     """:func:`.write_rosetta_fragments` with ``strict`` as :data:`True`.
 
     :return: :class:`str` - name of the newly generated file.
     """
 
-    _STRING = '{position:>10d}{pdbpos:>6d} {pdb} BBTorsion {aa} {sse}{phi:>11.3f}{psi:>10.3f}{omega:>10.3f}\n'
+    _STRING = '{:>10d}{:>6d} {} BBTorsion {} {}{:>11.3f}{:>10.3f}{:>10.3f}\n'
     _HEADER = 'FRAME{:>5d}{:>4d}\n'
 
     df = df.copy().order()
     n_frags = df.groupby(['frame']).head(1)['neighbors'].mode().max()
     frag_size = df['size'].unique()[0]
-
     ofile = "{}.{}.{}mers".format(prefix, n_frags, frag_size)
-    with open(ofile, "w") as f:
-        for _, fdf in df.groupby(['frame']):
-            f.write(_HEADER.format(fdf['position'].min(), fdf['position'].min() + frag_size - 1))
-            i = 1
-            for _, ndf in fdf.groupby(['neighbor']):
-                if ndf.shape[0] > frag_size:
-                    continue
-                ndf = ndf.assign(pdbpos=range(i, i + ndf.shape[0]))
-                ndf.apply(lambda row: f.write(_STRING.format(**row)), axis=1)
-                f.write('\n\n')
-                i += 1
-    return ofile
+
+    # Rows are grouped by frame and by neighbor in the same order groupby would give.
+    df = df.iloc[np.lexsort((df['neighbor'].values, df['frame'].values))]
+    frame, neighbor = df['frame'].values, df['neighbor'].values
+    new_frame = np.concatenate([[True], frame[1:] != frame[:-1]])
+    new_group = new_frame | np.concatenate([[True], neighbor[1:] != neighbor[:-1]])
+    group = np.cumsum(new_group) - 1
+    frame_id = np.cumsum(new_frame) - 1
+    gstart = np.flatnonzero(new_group)
+
+    # Neighbors longer than the fragment size are skipped and do not count for pdbpos.
+    keep = np.bincount(group) <= frag_size
+    ranks = np.cumsum(keep)
+    ranks = ranks - (ranks - keep)[np.flatnonzero(new_frame[gstart])][frame_id[gstart]]
+    rows = np.flatnonzero(keep[group])
+    pdbpos = ranks[group] + np.arange(len(df)) - gstart[group]
+    kdf = df.iloc[rows]
+
+    lines = _join_columns([_fixed_width_column(kdf['position'].values, 10),
+                           _fixed_width_column(pdbpos[rows], 6), b' ',
+                           _fixed_width_strings(kdf['pdb'].values), b' BBTorsion ',
+                           _fixed_width_strings(kdf['aa'].values), b' ',
+                           _fixed_width_strings(kdf['sse'].values),
+                           _fixed_width_column(kdf['phi'].values, 11, 3),
+                           _fixed_width_column(kdf['psi'].values, 10, 3),
+                           _fixed_width_column(kdf['omega'].values, 10, 3), b'\n'], len(rows))
+    if lines is None:
+        lines = np.array([x.encode('utf8') for x in map(_STRING.format, kdf['position'], pdbpos[rows],
+                                                        kdf['pdb'], kdf['aa'], kdf['sse'],
+                                                        kdf['phi'], kdf['psi'], kdf['omega'])], dtype=object)
+    ends = np.flatnonzero(np.concatenate([group[rows][1:] != group[rows][:-1], [True]])) if len(rows) else []
+    lines[ends] = lines[ends] + b'\n\n'
+
+    # Each frame header goes before its first written row.
+    lines = np.concatenate([lines, [b'']])
+    first = np.searchsorted(frame_id[rows], np.arange(frame_id[-1] + 1))
+    starts = np.minimum.reduceat(df['position'].values, np.flatnonzero(new_frame))
+    for i, start in zip(first[::-1], starts[::-1]):
+        lines[i] = _HEADER.format(start, start + frag_size - 1).encode('utf8') + lines[i]
+    return _write_text_blocks(ofile, lines, compress)
 
 
 def write_fragment_sequence_profiles( df, filename=None, consensus=None ):
@@ -829,61 +1526,199 @@ def get_sequence_and_structure( pdbfile, mk_minisilent=True, ignore_unrecognized
     """
     if not os.path.isfile( pdbfile ):
         raise IOError("Structure {} cannot be found".format(pdbfile))
+    minisilent = _dssp_silent_name(pdbfile, mk_minisilent)
+    if _dssp_cached_file(minisilent) is None:
+        sys.stdout.write("Generating file {}\n".format(minisilent))
+        _run_dssp_shard(([pdbfile], mk_minisilent, ignore_unrecognized_res, minimize))
+    return parse_rosetta_file(_dssp_cached_file(minisilent),
+                              {"sequence": "*", "structure": "*", "dihedrals": "*"})
+
+
+def get_sequences_and_structures( pdbfiles, mk_minisilent=True, ignore_unrecognized_res=True,
+                                  minimize=False, workers=None, batchsize=50 ):
+    """Batch version of :func:`.get_sequence_and_structure`.
+
+    Structures that already have their ``<pdbfile>.dssp.minisilent`` (or ``.gz``) are directly
+    read. The rest are split in groups of ``batchsize`` and each group is evaluated with a
+    single **Rosetta** execution (through a ``-l`` list file), running several groups at
+    the same time. Each execution works in its own temporary folder, so that multiple runs
+    can share the same working directory. Outputs are split back into one
+    ``<pdbfile>.dssp.minisilent`` per structure, which will act as cache for later calls.
+
+    .. note::
+        Depends on :ref:`rosetta.path <options>` and :ref:`rosetta.compilation <options>`,
+        if some of the corresponding silent files do not exist.
+        Depends on :ref:`system.cpu <options>`.
+
+    .. attention::
+        This function **REQUIRES** a local installation of **Rosetta**.
+
+    :param pdbfiles: Names of the input structures.
+    :type pdbfiles: :func:`list` of :class:`str`
+    :param bool mk_minisilent: If :data:`True`, transeform output into ``minisilent`` format.
+    :param bool ignore_unrecognized_res: If :data:`True`, **Rosetta** ignores non-recognizable
+        residues.
+    :param bool minimize: If :data:`True`, apply minimization before evaluating the structure.
+    :param int workers: Number of simultaneous **Rosetta** executions. If not provided,
+        it will be loaded from the :ref:`system.cpu <options>` global option.
+    :param int batchsize: Maximum number of structures evaluated by each execution.
+
+    :return: :class:`.DesignFrame` with one row per structure, in the order of ``pdbfiles``.
+
+    :raises:
+        :IOError: if any ``pdbfile`` cannot be found.
+        :IOError: if Rosetta executable cannot be found.
+        :ValueError: if Rosetta execution fails
+
+    .. seealso::
+        :func:`.get_sequence_and_structure`
+    """
+    if isinstance(pdbfiles, six.string_types):
+        pdbfiles = [pdbfiles, ]
+    for pdbfile in pdbfiles:
+        if not os.path.isfile( pdbfile ):
+            raise IOError("Structure {} cannot be found".format(pdbfile))
+    silents = [_dssp_silent_name(pdbfile, mk_minisilent) for pdbfile in pdbfiles]
+
+    # Group the missing structures; a group can't hold two structures with the same name,
+    # as Rosetta would give them the same tag.
+    shards, names = [], []
+    for pdbfile, silent in zip(pdbfiles, silents):
+        if _dssp_cached_file(silent) is not None:
+            continue
+        name = os.path.basename(silent)
+        if len(shards) == 0 or len(shards[-1]) >= max(int(batchsize), 1) or name in names[-1]:
+            shards.append([])
+            names.append(set())
+        if pdbfile not in shards[-1]:
+            shards[-1].append(pdbfile)
+            names[-1].add(name)
+
+    if len(shards) > 0:
+        sys.stdout.write("Generating {} files\n".format(sum([len(x) for x in shards])))
+        workers = workers if workers is not None else core.get_option("system", "cpu")
+        workers = min(max(int(workers), 1), len(shards))
+        args = [(shard, mk_minisilent, ignore_unrecognized_res, minimize) for shard in shards]
+        if workers == 1:
+            for arg in args:
+                _run_dssp_shard(arg)
+        else:
+            pool = multiprocessing.Pool(workers)
+            try:
+                pool.map(_run_dssp_shard, args)
+            finally:
+                pool.close()
+                pool.join()
+
+    return parse_rosetta_file([_dssp_cached_file(silent) for silent in silents],
+                              {"sequence": "*", "structure": "*", "dihedrals": "*"})
+
+
+def _dssp_silent_name( pdbfile, mk_minisilent ):
+    """Name of the file storing the output of :func:`.get_sequence_and_structure`.
+    """
     if mk_minisilent:
-        minisilent = re.sub(r'\.pdb|\.cif$', "", re.sub(r'\.gz$', "", pdbfile)) + ".dssp.minisilent"
-    else:
-        minisilent = re.sub(r'\.pdb|\.cif$', "", re.sub(r'\.gz$', "", pdbfile)) + ".dssp.silent"
+        return re.sub(r'\.pdb|\.cif$', "", re.sub(r'\.gz$', "", pdbfile)) + ".dssp.minisilent"
+    return re.sub(r'\.pdb|\.cif$', "", re.sub(r'\.gz$', "", pdbfile)) + ".dssp.silent"
 
-    if os.path.isfile(minisilent):
-        return parse_rosetta_file(minisilent,
-                                  {"sequence": "*", "structure": "*", "dihedrals": "*"})
-    elif os.path.isfile(minisilent + ".gz"):
-        return parse_rosetta_file(minisilent + ".gz",
-                                  {"sequence": "*", "structure": "*", "dihedrals": "*"})
 
-    sys.stdout.write("Generating file {}\n".format(minisilent))
+def _dssp_cached_file( silent ):
+    """Existing version (plain or compressed) of a dssp silent file.
 
-    with open("dssp.xml", "w") as fd:
-        fd.write(baseline(minimize))
+    :return: :class:`str` or :data:`None` if none exists.
+    """
+    for filename in [silent, silent + ".gz"]:
+        if os.path.isfile(filename):
+            return filename
+    return None
+
+
+def _run_dssp_shard( args ):
+    """Run a single **Rosetta** execution over a group of structures and
+    store the output of each one in its own dssp silent file.
+
+    Works inside a temporary folder that is removed afterwards.
+    """
+    pdbfiles, mk_minisilent, ignore_unrecognized_res, minimize = args
+    silents = {}
+    for pdbfile in pdbfiles:
+        silent = _dssp_silent_name(pdbfile, mk_minisilent)
+        silents[re.sub(r'\.dssp\.(mini)?silent$', '', os.path.basename(silent))] = silent
 
     # Check rosetta executable & run
     exe = make_rosetta_app_path('rosetta_scripts')
-    command = ['{0}', '-parser:protocol {1}', '-s {2}', '-out:file:silent {3}',
-               '-ignore_zero_occupancy off']
-    if ignore_unrecognized_res:
-        command.append('-ignore_unrecognized_res')
-    command = ' '.join(command)
-    command = command.format( exe, "dssp.xml", pdbfile, str(os.getpid()) + "_" )
-    sys.stdout.write("Running Rosetta\n")
-    sys.stdout.write(command + "\n")
-    error = execute_process( command )
-    os.unlink("dssp.xml")
-    if not bool(error):
-        if os.path.isfile(str(os.getpid()) + "_"):
-            sys.stdout.write("Execution has finished\n")
+    tmpdir = tempfile.mkdtemp(prefix="rstoolbox_dssp_")
+    try:
+        protocol = os.path.join(tmpdir, "dssp.xml")
+        with open(protocol, "w") as fd:
+            fd.write(baseline(minimize))
+        listfile = os.path.join(tmpdir, "structures.list")
+        with open(listfile, "w") as fd:
+            fd.write("\n".join([os.path.abspath(x) for x in pdbfiles]) + "\n")
+        outfile = os.path.join(tmpdir, "dssp.silent")
+
+        command = ['{0}', '-parser:protocol {1}', '-l {2}', '-out:file:silent {3}',
+                   '-ignore_zero_occupancy off']
+        if ignore_unrecognized_res:
+            command.append('-ignore_unrecognized_res')
+        command = ' '.join(command)
+        command = command.format( exe, protocol, listfile, outfile )
+        sys.stdout.write("Running Rosetta\n")
+        sys.stdout.write(command + "\n")
+        error = execute_process( command )
+        if bool(error) or not os.path.isfile(outfile):
+            raise ValueError("Execution has failed\n")
+        sys.stdout.write("Execution has finished\n")
+
+        # Split the output by decoy; tags are named after the input file.
+        header, decoys, tag = [], OrderedDict(), None
+        with open(outfile) as fd:
+            for line in fd:
+                if line.startswith("SCORE:") and not line.rstrip().endswith(" description"):
+                    tag = line.split()[-1]
+                    decoys.setdefault(tag, [])
+                if tag is None:
+                    header.append(line)
+                else:
+                    decoys[tag].append(line)
+        for tag, lines in decoys.items():
+            name = re.sub(r'_\d+$', '', tag)
+            if name not in silents:
+                continue
+            single = os.path.join(tmpdir, tag + ".silent")
+            with open(single, "w") as fd:
+                fd.write("".join(header + lines))
             if mk_minisilent:
-                sys.stdout.write("Making minisilent\n")
-                fd = open( minisilent, "w" )
-                for line, _, _, _ in open_rosetta_file( str(os.getpid()) + "_" ):
-                    fd.write( line )
-                fd.close()
+                with open(silents[name], "w") as fd:
+                    for line, _, _, _ in open_rosetta_file( single ):
+                        fd.write( line )
             else:
-                sys.stdout.write("Keeping original silent output\n")
-                shutil.copy( str(os.getpid()) + "_", minisilent)
-            os.unlink(str(os.getpid()) + "_")
-            return get_sequence_and_structure( pdbfile, mk_minisilent )
-        else:
-            raise ValueError("Execution has failed\n")
-    else:
-        raise ValueError("Execution has failed\n")
+                shutil.copy( single, silents[name] )
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    missing = [x for x in silents.values() if _dssp_cached_file(x) is None]
+    if len(missing) > 0:
+        raise ValueError("Execution has failed for {}\n".format(",".join(missing)))
 
 
-def make_structures( df, outdir=None, tagsfilename="tags", prefix=None, keep_tagfile=True ):  # pragma: no cover
+def _run_command( args ):
+    """Execute a single command as ``(identifier, command)``.
+
+    :return: :func:`tuple` of the identifier and the exit status.
+    """
+    i, command = args
+    return i, execute_process( command )
+
+
+def make_structures( df, outdir=None, tagsfilename="tags", prefix=None, keep_tagfile=True,
+                     workers=None, shardsize=None ):
     """Extract the selected decoys (if any).
 
     .. note::
         Depends on :ref:`rosetta.path <options>` and :ref:`rosetta.compilation <options>`.
         Depends on :ref:`system.overwrite <options>` and :ref:`system.output <options>`.
+        Depends on :ref:`system.cpu <options>`.
 
     .. attention::
         This function **REQUIRES** a local installation of **Rosetta**.
@@ -894,6 +1729,10 @@ def make_structures( df, outdir=None, tagsfilename="tags", prefix=None, keep_tag
 
        extract_pdbs.linuxgccrelease -in:file:silent <pdb> -tags <selected>
 
+    Requested decoys are assigned to the silent file that contains them (through
+    :func:`.index_silent_file`) and one extraction is run for each file (or for each
+    group of ``shardsize`` decoys of a file), several at the same time.
+
     It requires the :class:`.DesignFrame` to have ``source_file`` attached identifying the
     silent files from which the data can be extracted. **minisilent files will not work here**.
     This should happen by default with the library, if one reads from actual silent files,
@@ -913,6 +1752,12 @@ def make_structures( df, outdir=None, tagsfilename="tags", prefix=None, keep_tag
         overwritten if the global option :ref:`system.overwrite <options>` is :data:`False`.
     :param str prefix: If provided, a prefix is added to the PDB files.
     :param bool keep_tagfile: If :data:`True`, do not delete the tag file after using it.
+    :param int workers: Number of simultaneous extractions. If not provided, it will be
+        loaded from the :ref:`system.cpu <options>` global option.
+    :param int shardsize: Maximum number of decoys extracted by a single execution. By
+        default, all the decoys of a silent file are extracted together.
+
+    :return: :func:`list` of :class:`str` - silent files for which the extraction failed.
 
     :raises:
         :ValueError: if the provided data does not have a **description** column.
@@ -967,15 +1812,59 @@ def make_structures( df, outdir=None, tagsfilename="tags", prefix=None, keep_tag
     if not os.path.isfile(tagsfilename):
         raise IOError("Something went wrong writing the file {0}".format(tagsfilename))
 
-    # Run process
-    sfiles = " ".join(sfiles)
-    command = "{0} -in:file:silent {1} -in:file:tagfile {2} -out:prefix {3}"
-    command = command.format( exe, sfiles, tagsfilename, outdir )
+    # Assign each decoy to the silent file containing it
+    from .silent import index_silent_file
+    tags = df[column].tolist()
+    shards, found = [], set()
+    for sfile in sorted(sfiles):
+        intags = set(index_silent_file(sfile)['tags'])
+        ftags = [t for t in tags if t in intags and t not in found]
+        found.update(ftags)
+        step = max(int(shardsize), 1) if shardsize is not None else max(len(ftags), 1)
+        for i in range(0, len(ftags), step):
+            shards.append((sfile, ftags[i:i + step]))
+    missing = len(tags) - len(found)
+    if missing > 0:
+        sys.stdout.write("{0} decoys could not be found in the source files\n".format(missing))
+    if len(shards) == 0:
+        sys.stdout.write("There are no decoys to extract\n")
+        if not keep_tagfile:
+            os.unlink( tagsfilename )
+        return []
+
+    # Run processes
     sys.stdout.write("Executing Rosetta's extract_pdbs app\n")
     sys.stdout.write("(depending on the total number of decoys and how many have "
                      "been requested this might take a while...)\n")
-    error = execute_process( command )
-    if not bool(error):
+    tmpdir = tempfile.mkdtemp(prefix="rstoolbox_extract_")
+    try:
+        commands = []
+        for i, (sfile, stags) in enumerate(shards):
+            shardfile = os.path.join(tmpdir, "tags_{0}".format(i))
+            with open(shardfile, "w") as fd:
+                fd.write("\n".join(stags) + "\n")
+            command = "{0} -in:file:silent {1} -in:file:tagfile {2} -out:prefix {3}"
+            commands.append(command.format( exe, sfile, shardfile, outdir ))
+
+        workers = workers if workers is not None else core.get_option("system", "cpu")
+        workers = min(max(int(workers), 1), len(commands))
+        # Each task only waits on its own Rosetta process.
+        pool = multiprocessing.pool.ThreadPool(workers)
+        failed = []
+        try:
+            for n, (i, error) in enumerate(pool.imap_unordered(_run_command, enumerate(commands))):
+                sfile, stags = shards[i]
+                if bool(error):
+                    failed.append(sfile)
+                    sys.stdout.write("Extraction of {0} decoys from {1} has failed\n".format(len(stags), sfile))
+                sys.stdout.write("Finished {0} of {1} extractions\n".format(n + 1, len(commands)))
+        finally:
+            pool.close()
+            pool.join()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    if len(failed) == 0:
         sys.stdout.write("Execution has finished\n")
     else:
         sys.stdout.write("Execution has failed\n")
@@ -983,3 +1872,4 @@ def make_structures( df, outdir=None, tagsfilename="tags", prefix=None, keep_tag
     # Remove extra files if requested
     if not keep_tagfile:
         os.unlink( tagsfilename )
+    return sorted(set(failed))
@@ -0,0 +1,844 @@
+# -*- coding: utf-8 -*-
+"""
+.. codeauthor:: Jaume Bonet <jaume.bonet@gmail.com>
+
+.. affiliation::
+    Laboratory of Protein Design and Immunoengineering <lpdi.epfl.ch>
+    Bruno Correia <bruno.correia@epfl.ch>
+
+.. func:: index_silent_file
+.. func:: fetch_decoys
+.. func:: read_silent_structures
+.. func:: write_silent_structures
+.. class:: SilentFileWatcher
+"""
+# Standard Libraries
+import os
+import re
+import json
+import zlib
+import bisect
+import copy
+import string
+import multiprocessing
+from collections import OrderedDict
+
+# External Libraries
+import six
+import numpy as np
+import pandas as pd
+
+# This Library
+import rstoolbox.core as core
+import rstoolbox.components as rc
+from .rosetta import _file_vs_json, _gather_file_list, _filter_rosetta_lines, _iter_rosetta_data
+
+__all__ = ['index_silent_file', 'fetch_decoys', 'read_silent_structures',
+           'write_silent_structures', 'SilentFileWatcher']
+
+_INDEX_VERSION = 1
+_CHUNKSIZE = 1 << 20
+_BOUNDARY = re.compile(b'^(SEQUENCE:|SCORE:)([^\n]*)', re.M)
+
+
+#: Uncompressed distance between the in-memory checkpoints of single-member gzip files.
+_CHECKPOINT_SPACING = 1 << 24
+#: Number of files for which checkpoints are kept.
+_CHECKPOINT_FILES = 8
+_CHECKPOINTS = OrderedDict()
+
+
+def _file_checkpoints( filename ):
+    """In-memory decompression checkpoints of a gzip file.
+
+    Each checkpoint is an (uncompressed offset, compressed offset, decompressor)
+    triplet, sorted by uncompressed offset; decompression can resume from a copy
+    of the decompressor after seeking to the compressed offset. Checkpoints are
+    dropped when the file changes.
+
+    :return: :func:`list`
+    """
+    st = os.stat(filename)
+    key = (os.path.abspath(filename), st.st_size, st.st_mtime)
+    checkpoints = _CHECKPOINTS.pop(key, [])
+    _CHECKPOINTS[key] = checkpoints
+    while len(_CHECKPOINTS) > _CHECKPOINT_FILES:
+        _CHECKPOINTS.popitem(last=False)
+    return checkpoints
+
+
+def _add_checkpoint( checkpoints, upos, cpos, dobj ):
+    """Store the state of ``dobj`` unless there is a checkpoint closer than
+    :data:`_CHECKPOINT_SPACING`.
+    """
+    i = bisect.bisect_left([c[0] for c in checkpoints], upos)
+    if i > 0 and upos - checkpoints[i - 1][0] < _CHECKPOINT_SPACING:
+        return
+    if i < len(checkpoints) and checkpoints[i][0] - upos < _CHECKPOINT_SPACING:
+        return
+    checkpoints.insert(i, (upos, cpos, dobj.copy()))
+
+
+class _GzipSpanReader( object ):
+    """Read spans of uncompressed data from a gzip file.
+
+    Decompression starts from the closest seek point before the requested span and
+    goes forward, so that consecutive spans are read in a single pass. Seek points
+    are the start of each gzip member and the in-memory checkpoints of the file.
+    """
+    def __init__( self, filename, points ):
+        self.fd = open(filename, 'rb')
+        self.points = points
+        self.upoints = [p[1] for p in points]
+        self.checkpoints = _file_checkpoints(filename)
+        self.upos = None
+        self.cpos = 0
+        self.buffer = b''
+
+    def close( self ):
+        self.fd.close()
+
+    def _seek_point( self, start ):
+        """Closest (uncompressed offset, compressed offset, decompressor) before ``start``.
+        """
+        point = self.points[bisect.bisect_right(self.upoints, start) - 1]
+        i = bisect.bisect_right([c[0] for c in self.checkpoints], start) - 1
+        if i >= 0 and self.checkpoints[i][0] > point[1]:
+            return self.checkpoints[i]
+        return (point[1], point[0], None)
+
+    def _restart( self, point ):
+        self.fd.seek(point[1])
+        self.dobj = zlib.decompressobj(31) if point[2] is None else point[2].copy()
+        self.upos = point[0]
+        self.cpos = point[1]
+        self.buffer = b''
+
+    def _more( self ):
+        data = b''
+        if self.dobj.eof:
+            data = self.dobj.unused_data
+            self.dobj = zlib.decompressobj(31)
+        if not data:
+            data = self.fd.read(_CHUNKSIZE)
+            if not data:
+                return False
+            self.cpos += len(data)
+        self.buffer += self.dobj.decompress(data)
+        if not self.dobj.eof:
+            _add_checkpoint(self.checkpoints, self.upos + len(self.buffer), self.cpos, self.dobj)
+        return True
+
+    def read( self, start, length ):
+        point = self._seek_point(start)
+        if self.upos is None or start < self.upos or point[0] > self.upos + len(self.buffer):
+            self._restart(point)
+        while self.upos + len(self.buffer) < start + length:
+            # Forget what is already behind the requested span.
+            cut = min(start - self.upos, len(self.buffer))
+            self.buffer = self.buffer[cut:]
+            self.upos += cut
+            if not self._more():
+                break
+        return self.buffer[start - self.upos:start - self.upos + length]
+
+
+def _is_gzip( filename ):
+    with open(filename, 'rb') as fd:
+        return fd.read(2) == b'\x1f\x8b'
+
+
+def _iter_uncompressed( filename, points ):
+    """Yield the uncompressed content of a file in chunks.
+
+    For gzip files, the start of each member is added to ``points``
+    as a (compressed offset, uncompressed offset) pair and in-memory
+    checkpoints are taken as the file is decompressed.
+    """
+    with open(filename, 'rb') as fd:
+        if not _is_gzip(filename):
+            points.append([0, 0])
+            for chunk in iter(lambda: fd.read(_CHUNKSIZE), b''):
+                yield chunk
+            return
+        checkpoints = _file_checkpoints(filename)
+        dobj = zlib.decompressobj(31)
+        cpos, upos = 0, 0
+        points.append([0, 0])
+        for chunk in iter(lambda: fd.read(_CHUNKSIZE), b''):
+            cpos += len(chunk)
+            while chunk:
+                data = dobj.decompress(chunk)
+                upos += len(data)
+                yield data
+                chunk = b''
+                if dobj.eof:
+                    chunk = dobj.unused_data
+                    if chunk:
+                        points.append([cpos - len(chunk), upos])
+                    dobj = zlib.decompressobj(31)
+                    if not chunk:
+                        # Next member starts on the next read.
+                        points.append([cpos, upos])
+                else:
+                    _add_checkpoint(checkpoints, upos, cpos, dobj)
+        # A member opened after the last one read does not exist.
+        if len(points) > 1 and points[-1][0] == cpos:
+            points.pop()
+
+
+def _build_index( filename ):
+    """Scan a silent file to find the limits of each decoy.
+
+    Decoys start with a ``SCORE:`` line and finish right before the next
+    ``SCORE:`` or ``SEQUENCE:`` line. Headers are made by the ``SEQUENCE:``
+    and ``SCORE:`` header lines before a decoy.
+    """
+    points, headers, tags = [], [], OrderedDict()
+    hstart, current = None, None
+    pending, pbase = b'', 0
+
+    def close_block( offset ):
+        if current is not None and current[0] not in tags:
+            tags[current[0]] = [current[1], offset - current[1], current[2]]
+
+    for data in _iter_uncompressed(filename, points):
+        text = pending + data
+        last = text.rfind(b'\n') + 1
+        for m in _BOUNDARY.finditer(text, 0, last):
+            offset = pbase + m.start()
+            fields = m.group(2).split()
+            close_block(offset)
+            current = None
+            if m.group(1) == b'SEQUENCE:' or len(fields) == 0 or fields[-1] == b'description':
+                hstart = offset if hstart is None else hstart
+                continue
+            if hstart is not None:
+                headers.append([hstart, offset - hstart])
+                hstart = None
+            current = [fields[-1].decode('utf8'), offset, len(headers) - 1]
+        pending, pbase = text[last:], pbase + last
+    # Last decoy might not end with a new line.
+    m = _BOUNDARY.match(pending)
+    if m is not None and len(m.group(2).split()) > 0:
+        close_block(pbase)
+        fields = m.group(2).split()
+        current = [fields[-1].decode('utf8'), pbase, len(headers) - 1]
+    close_block(pbase + len(pending))
+
+    st = os.stat(filename)
+    return {'version': _INDEX_VERSION, 'size': st.st_size, 'mtime': st.st_mtime,
+            'gzip': _is_gzip(filename), 'points': points, 'headers': headers, 'tags': tags}
+
+
+def _is_valid_index( index, filename ):
+    st = os.stat(filename)
+    return index.get('version') == _INDEX_VERSION and \
+        index.get('size') == st.st_size and index.get('mtime') == st.st_mtime
+
+
+def index_silent_file( filename, force=False, store=False ):
+    """Build the index of the decoys in a silent file.
+
+    The index records the position and length of each decoy in the file by its
+    **description** tag, together with the position of the headers it depends on.
+    With ``store=True``, it is saved in a sidecar ``<filename>.idx`` file; an up to
+    date sidecar file is always reused, while the silent file does not change.
+
+    For gzip files, the index also records the start of each gzip member as seek
+    points. Files compressed in several members (such as concatenated gzip files
+    or those generated with ``bgzip``) can be accessed at any decoy. For files with
+    a single member, decompression checkpoints are kept in memory while the file is
+    read, so that later accesses in the same session resume from the closest one; the
+    first access after loading a stored index decompresses from the start of the file.
+
+    :param str filename: Silent file to index.
+    :param bool force: When :data:`True`, rebuild the index even if an up to date
+        one exists.
+    :param bool store: When :data:`True`, save the index next to ``filename``.
+
+    :return: :class:`dict` - the index.
+
+    :raises:
+        :IOError: if ``filename`` cannot be found.
+    """
+    if not os.path.isfile(filename):
+        raise IOError("{0}: file not found.".format(filename))
+
+    idxfile = filename + '.idx'
+    if not force and os.path.isfile(idxfile):
+        try:
+            with open(idxfile) as fd:
+                index = json.load(fd, object_pairs_hook=OrderedDict)
+            if _is_valid_index(index, filename):
+                return index
+        except ValueError:
+            pass
+
+    index = _build_index(filename)
+    if store:
+        try:
+            with open(idxfile, 'w') as fd:
+                json.dump(index, fd)
+        except (IOError, OSError):
+            # Read-only locations still get the index, just not stored.
+            pass
+    return index
+
+
+def fetch_decoys( silent, tags, index=None ):
+    """Retrieve the requested decoys from a silent file without reading
+    the whole file.
+
+    The returned text is a valid silent file with the decoys in the order
+    in which they were requested, each preceded by its header when it differs
+    from the previous one.
+
+    :param str silent: Silent file from which to get the decoys.
+    :param tags: Identifiers of the decoys.
+    :type tags: Union[:class:`str`, :func:`list` of :class:`str`]
+    :param dict index: Index of the silent file. If not provided, it is obtained
+        through :func:`.index_silent_file`.
+
+    :return: :class:`str`
+
+    :raises:
+        :IOError: if ``silent`` cannot be found.
+        :KeyError: if any of the ``tags`` is not in the file.
+    """
+    data, header = [], None
+    for hid, htext, block in _read_blocks(silent, tags, index):
+        if hid >= 0 and hid != header:
+            header = hid
+            data.append(htext)
+        data.append(block)
+    return b''.join(data).decode('utf8')
+
+
+def _read_blocks( silent, tags, index=None ):
+    """Read the text of the requested decoys.
+
+    :return: :func:`list` of (header id, header text, decoy text) in the order of ``tags``.
+    """
+    if isinstance(tags, six.string_types):
+        tags = [tags]
+    index = index if index is not None else index_silent_file(silent)
+    missing = [t for t in tags if t not in index['tags']]
+    if len(missing) > 0:
+        raise KeyError("Decoys not found in {0}: {1}".format(silent, ",".join(missing)))
+
+    # Read spans in file order to avoid going back in compressed files.
+    blocks = [index['tags'][t] for t in tags]
+    spans = set([tuple(b[:2]) for b in blocks])
+    spans.update([tuple(index['headers'][b[2]]) for b in blocks if b[2] >= 0])
+    texts = {}
+    if index['gzip']:
+        reader = _GzipSpanReader(silent, index['points'])
+        try:
+            for span in sorted(spans):
+                texts[span] = reader.read(*span)
+        finally:
+            reader.close()
+    else:
+        with open(silent, 'rb') as fd:
+            for span in sorted(spans):
+                fd.seek(span[0])
+                texts[span] = fd.read(span[1])
+
+    return [(b[2], texts[tuple(index['headers'][b[2]])] if b[2] >= 0 else b'',
+             texts[tuple(b[:2])]) for b in blocks]
+
+
+def _heavy_atoms():
+    sidechains = {'A': ['CB'], 'C': ['CB', 'SG'], 'D': ['CB', 'CG', 'OD1', 'OD2'],
+                  'E': ['CB', 'CG', 'CD', 'OE1', 'OE2'],
+                  'F': ['CB', 'CG', 'CD1', 'CD2', 'CE1', 'CE2', 'CZ'], 'G': [],
+                  'H': ['CB', 'CG', 'ND1', 'CD2', 'CE1', 'NE2'], 'I': ['CB', 'CG1', 'CG2', 'CD1'],
+                  'K': ['CB', 'CG', 'CD', 'CE', 'NZ'], 'L': ['CB', 'CG', 'CD1', 'CD2'],
+                  'M': ['CB', 'CG', 'SD', 'CE'], 'N': ['CB', 'CG', 'OD1', 'ND2'],
+                  'P': ['CB', 'CG', 'CD'], 'Q': ['CB', 'CG', 'CD', 'OE1', 'NE2'],
+                  'R': ['CB', 'CG', 'CD', 'NE', 'CZ', 'NH1', 'NH2'], 'S': ['CB', 'OG'],
+                  'T': ['CB', 'OG1', 'CG2'], 'V': ['CB', 'CG1', 'CG2'],
+                  'W': ['CB', 'CG', 'CD1', 'CD2', 'NE1', 'CE2', 'CE3', 'CZ2', 'CZ3', 'CH2'],
+                  'Y': ['CB', 'CG', 'CD1', 'CD2', 'CE1', 'CE2', 'CZ', 'OH']}
+    return {k: ['N', 'CA', 'C', 'O'] + v for k, v in sidechains.items()}
+
+
+# Heavy atoms of each residue type, in the order in which Rosetta stores them.
+_HEAVY_ATOMS = _heavy_atoms()
+_RESNAMES = dict(zip('ACDEFGHIKLMNPQRSTVWY',
+                     ['ALA', 'CYS', 'ASP', 'GLU', 'PHE', 'GLY', 'HIS', 'ILE', 'LYS', 'LEU',
+                      'MET', 'ASN', 'PRO', 'GLN', 'ARG', 'SER', 'THR', 'VAL', 'TRP', 'TYR']))
+
+# Ideal backbone geometry (bond lengths in Angstroms, angles in degrees).
+_N_CA, _CA_C, _C_N, _C_O = 1.458, 1.523, 1.329, 1.231
+_N_CA_C, _CA_C_N, _C_N_CA, _CA_C_O = 111.2, 116.2, 121.7, 120.5
+
+_BINARY_LINE = re.compile(r'^[A-Za-z][A-Za-z0-9+/]{16,}$')
+_ANNOTATED = re.compile(r'(\w)(?:\[([^\]]*)\])?')
+
+
+def _6bit_table():
+    table = np.zeros(256, dtype=np.uint32)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+    table[np.frombuffer(letters.encode('ascii'), dtype=np.uint8)] = np.arange(64)
+    return table
+
+
+_6BIT = _6bit_table()
+
+
+def _decode_binary_lines( lines ):
+    """Decode a batch of binary silent residue lines at once.
+
+    Each group of 4 characters encodes 3 bytes (6 bits per character, least
+    significant first) and the bytes are little-endian 32-bit floats, 3 per atom.
+
+    :param lines: Encoded coordinates (without the residue character).
+    :type lines: :func:`list` of :class:`str`
+
+    :return: (:class:`~numpy.ndarray` of coordinates, :class:`~numpy.ndarray` of atoms per line)
+    """
+    natoms = np.array([len(x) // 16 for x in lines], dtype=np.int64)
+    text = "".join([x[:n * 16] for x, n in zip(lines, natoms)]).encode('ascii')
+    codes = _6BIT[np.frombuffer(text, dtype=np.uint8)].reshape(-1, 4)
+    value = codes[:, 0] | (codes[:, 1] << 6) | (codes[:, 2] << 12) | (codes[:, 3] << 18)
+    data = np.empty((value.shape[0], 3), dtype=np.uint8)
+    data[:, 0] = value & 0xff
+    data[:, 1] = (value >> 8) & 0xff
+    data[:, 2] = (value >> 16) & 0xff
+    return data.reshape(-1).view('<f4').reshape(-1, 3).astype(np.float64), natoms
+
+
+def _place( a, b, c, length, angle, torsion ):
+    """Place the atom bonded to ``c`` from the three previous ones (NeRF),
+    for a batch of chains at once.
+    """
+    bc = c - b
+    bc /= np.linalg.norm(bc, axis=-1)[:, None]
+    n = np.cross(b - a, bc)
+    n /= np.linalg.norm(n, axis=-1)[:, None]
+    m = np.stack([bc, np.cross(n, bc), n], axis=-1)
+    angle = np.radians(angle)
+    d = np.stack([-length * np.cos(angle) * np.ones_like(torsion),
+                  length * np.sin(angle) * np.cos(torsion),
+                  length * np.sin(angle) * np.sin(torsion)], axis=-1)
+    return c + np.einsum('bij,bj->bi', m, d)
+
+
+def _build_backbones( phi, psi, omega ):
+    """Build N, CA, C and O of a batch of segments from their dihedrals
+    with ideal geometry.
+
+    :return: :class:`~numpy.ndarray` with shape (segments, residues, 4, 3)
+    """
+    nseg, nres = phi.shape
+    phi, psi, omega = np.radians(phi), np.radians(psi), np.radians(omega)
+    xyz = np.zeros((nseg, nres, 4, 3))
+    xyz[:, 0, 1, 0] = _N_CA
+    angle = np.radians(_N_CA_C)
+    xyz[:, 0, 2] = xyz[:, 0, 1] + _CA_C * np.array([-np.cos(angle), np.sin(angle), 0])
+    for i in range(nres):
+        n, ca, c = xyz[:, i, 0], xyz[:, i, 1], xyz[:, i, 2]
+        xyz[:, i, 3] = _place(n, ca, c, _C_O, _CA_C_O, psi[:, i] + np.pi)
+        if i + 1 == nres:
+            break
+        xyz[:, i + 1, 0] = _place(n, ca, c, _C_N, _CA_C_N, psi[:, i])
+        xyz[:, i + 1, 1] = _place(ca, c, xyz[:, i + 1, 0], _N_CA, _C_N_CA, omega[:, i])
+        xyz[:, i + 1, 2] = _place(c, xyz[:, i + 1, 0], xyz[:, i + 1, 1],
+                                  _CA_C, _N_CA_C, phi[:, i + 1])
+    return xyz
+
+
+def _kabsch( p, q ):
+    """Optimal rotation and centroids to superimpose each set of points ``p``
+    onto ``q`` (both with shape (sets, points, 3)).
+    """
+    pc, qc = p.mean(axis=1), q.mean(axis=1)
+    h = np.einsum('bli,blj->bij', p - pc[:, None], q - qc[:, None])
+    u, _, vt = np.linalg.svd(h)
+    d = np.sign(np.linalg.det(np.einsum('bij,bjk->bik', u, vt)))
+    vt[:, 2] *= d[:, None]
+    return np.einsum('bij,bjk->bik', u, vt), pc, qc
+
+
+def _reconstruct_torsion_lines( rows, window=2 ):
+    """Backbone coordinates from protein silent lines (dihedrals and CA).
+
+    Residues are split in segments wherever consecutive stored CA are too far
+    to be bonded, so that chain ends and breaks are respected. Each segment is
+    built with ideal geometry and each residue is then placed by superimposing
+    the built CA around it onto the stored ones; this way, small differences in
+    the ideal geometry do not add up along the chain.
+
+    :param rows: Numeric columns phi, psi, omega, CA x, CA y and CA z of each residue.
+    :type rows: :class:`~numpy.ndarray`
+    :param int window: Residues at each side used to place a residue.
+
+    :return: :class:`~numpy.ndarray` with shape (residues, 4, 3)
+    """
+    gaps = np.linalg.norm(np.diff(rows[:, 3:6], axis=0), axis=1) > 4.2
+    starts = np.concatenate([[0], np.nonzero(gaps)[0] + 1])
+    ends = np.concatenate([starts[1:], [rows.shape[0]]])
+    nres = (ends - starts).max()
+    data = np.zeros((len(starts), nres, 3))
+    mask = np.zeros((len(starts), nres), dtype=bool)
+    for i, (s, e) in enumerate(zip(starts, ends)):
+        data[i, :e - s] = rows[s:e, :3]
+        mask[i, :e - s] = True
+    xyz = _build_backbones(data[:, :, 0], data[:, :, 1], data[:, :, 2])[mask]
+
+    # Window of residues around each one, without leaving its segment.
+    segment = np.repeat(np.arange(len(starts)), ends - starts)
+    pos = np.arange(rows.shape[0])[:, None] + np.arange(-window, window + 1)[None, :]
+    idx = np.clip(pos, starts[segment][:, None], ends[segment][:, None] - 1)
+    rot, pc, qc = _kabsch(xyz[idx, 1], rows[idx, 3:6])
+    return np.einsum('rai,rij->raj', xyz - pc[:, None], rot) + qc[:, None]
+
+
+def _parse_residue_info( header, lines ):
+    """Sequence, residue patches and numbering of a decoy.
+    """
+    sequence, patches, numbering, endings = None, None, None, []
+    for line in header.splitlines() + lines:
+        fields = line.split()
+        if len(fields) == 0:
+            continue
+        if fields[0] == 'SEQUENCE:' and sequence is None:
+            sequence = fields[1]
+        elif fields[0] == 'ANNOTATED_SEQUENCE:':
+            residues = _ANNOTATED.findall(fields[1])
+            sequence = "".join([r[0] for r in residues])
+            patches = [r[1] for r in residues]
+        elif fields[0] == 'RES_NUM':
+            numbering = []
+            for chunk in fields[1:-1]:
+                chain, rng = chunk.split(':')
+                ini, end = (rng.split('-') + [rng])[:2]
+                numbering.extend([(chain, i) for i in range(int(ini), int(end) + 1)])
+        elif fields[0] == 'CHAIN_ENDINGS':
+            endings = [int(x) for x in fields[1:-1]]
+    if patches is None:
+        patches = [''] * len(sequence)
+    if numbering is None or len(numbering) != len(sequence):
+        chains = np.searchsorted(np.array(endings, dtype=np.int64),
+                                 np.arange(1, len(sequence) + 1), side='left')
+        numbering = [(string.ascii_uppercase[c % 26], i + 1) for i, c in enumerate(chains)]
+    return sequence, patches, numbering
+
+
+def _decode_blocks( blocks ):
+    """Decode the structures of a batch of decoys.
+
+    Binary coordinate lines of the whole batch are decoded together.
+
+    :param blocks: (header text, decoy text) of each decoy.
+    :type blocks: :func:`list` of :func:`tuple`
+
+    :return: :func:`list` of :class:`~pandas.DataFrame`
+    """
+    decoys, encoded = [], []
+    for header, text in blocks:
+        lines = text.splitlines()
+        binary, torsion = [], []
+        for line in lines:
+            fields = line.split()
+            if len(fields) == 2 and _BINARY_LINE.match(fields[0]):
+                binary.append(fields[0])
+            elif len(fields) == 13 and fields[0].isdigit():
+                torsion.append(fields[2:8])
+        info = _parse_residue_info(header, lines)
+        decoys.append((info, len(binary), torsion))
+        encoded.extend([x[1:] for x in binary])
+
+    coords, natoms = _decode_binary_lines(encoded) if len(encoded) > 0 else (None, None)
+    offsets = np.concatenate([[0], np.cumsum(natoms)]) if natoms is not None else None
+
+    data, line = [], 0
+    for (sequence, patches, numbering), nbinary, torsion in decoys:
+        rows = []
+        if nbinary > 0:
+            for i in range(nbinary):
+                aa = sequence[i] if i < len(sequence) else 'X'
+                atoms = list(_HEAVY_ATOMS.get(aa, []))
+                if 'CtermProteinFull' in patches[i] and len(atoms) > 0:
+                    atoms.insert(4, 'OXT')
+                xyz = coords[offsets[line + i]:offsets[line + i + 1]]
+                if len(atoms) == 0:
+                    atoms = ['X{}'.format(j + 1) for j in range(xyz.shape[0])]
+                # Hydrogens come after the heavy atoms.
+                for name, (x, y, z) in zip(atoms, xyz):
+                    rows.append((numbering[i][0], numbering[i][1], _RESNAMES.get(aa, 'UNK'),
+                                 name, x, y, z))
+            line += nbinary
+        elif len(torsion) > 0:
+            xyz = _reconstruct_torsion_lines(np.array(torsion, dtype=np.float64))
+            for i, residue in enumerate(xyz):
+                aa = sequence[i] if i < len(sequence) else 'X'
+                for name, (x, y, z) in zip(['N', 'CA', 'C', 'O'], residue):
+                    rows.append((numbering[i][0], numbering[i][1], _RESNAMES.get(aa, 'UNK'),
+                                 name, x, y, z))
+        data.append(pd.DataFrame(rows, columns=_STRUCTURE_COLUMNS))
+    return data
+
+
+_STRUCTURE_COLUMNS = ['chain', 'resnum', 'resname', 'atom', 'x', 'y', 'z']
+
+
+def read_silent_structures( silent, tags=None ):
+    """Obtain the coordinates of the decoys in a silent file without **Rosetta**.
+
+    Two kinds of structural data are understood:
+
+    #. **Binary silent files**: the stored coordinates of the heavy atoms are returned.
+    #. **Protein silent files**: only the backbone is stored as dihedrals, so ``N``, ``CA``,
+       ``C`` and ``O`` are rebuilt with ideal geometry and placed on the stored ``CA``.
+
+    Decoys are accessed through :func:`.index_silent_file`, so only the requested ones are read.
+
+    :param str silent: Silent file.
+    :param tags: Identifiers of the decoys to retrieve. By default, all decoys in the file.
+    :type tags: Union[:class:`str`, :func:`list` of :class:`str`]
+
+    :return: :class:`~collections.OrderedDict` with a :class:`~pandas.DataFrame` of
+        atom coordinates for each decoy (columns ``chain``, ``resnum``, ``resname``,
+        ``atom``, ``x``, ``y`` and ``z``).
+
+    :raises:
+        :IOError: if ``silent`` cannot be found.
+        :KeyError: if any of the ``tags`` is not in the file.
+    """
+    index = index_silent_file(silent)
+    tags = list(index['tags']) if tags is None else tags
+    tags = [tags] if isinstance(tags, six.string_types) else tags
+    blocks = [(h.decode('utf8'), b.decode('utf8')) for _, h, b in _read_blocks(silent, tags, index)]
+    return OrderedDict(zip(tags, _decode_blocks(blocks)))
+
+
+def _structure_to_pdb( df ):
+    """Format the coordinates of a decoy as PDB text.
+    """
+    lines, chain = [], None
+    for i, row in enumerate(df.itertuples(index=False)):
+        if chain is not None and row.chain != chain:
+            lines.append('TER\n')
+        chain = row.chain
+        name = row.atom if len(row.atom) == 4 else ' {:<3s}'.format(row.atom)
+        lines.append('ATOM  {:5d} {:4s} {:3s} {:1s}{:4d}    {:8.3f}{:8.3f}{:8.3f}{:6.2f}{:6.2f}'
+                     '          {:>2s}\n'.format(i + 1, name, row.resname, row.chain, row.resnum,
+                                                 row.x, row.y, row.z, 1.0, 0.0, row.atom[0]))
+    lines.append('TER\nEND\n')
+    return "".join(lines)
+
+
+def _write_structures( args ):
+    """Write a batch of decoys (can be called in a separate process).
+    """
+    silent, tags, outfiles = args
+    for df, outfile in zip(read_silent_structures(silent, tags).values(), outfiles):
+        with open(outfile, 'w') as fd:
+            fd.write(_structure_to_pdb(df))
+    return outfiles
+
+
+def write_silent_structures( silent, tags=None, outdir=None, prefix=None, workers=None,
+                             batchsize=100 ):
+    """Write PDB files for the decoys of a silent file without **Rosetta**.
+
+    Coordinates are obtained as in :func:`.read_silent_structures`. Decoys are decoded
+    in batches, spread over ``workers`` processes.
+
+    .. note::
+        Depends on :ref:`system.overwrite <options>`, :ref:`system.output <options>`
+        and :ref:`system.cpu <options>`.
+
+    :param str silent: Silent file.
+    :param tags: Identifiers of the decoys to write. By default, all decoys in the file.
+    :type tags: Union[:class:`str`, :func:`list` of :class:`str`]
+    :param str outdir: Directory in which to save the PDB files. If none is provided,
+        it will be loaded from the :ref:`system.output <options>` global option.
+    :param str prefix: If provided, a prefix is added to the PDB files.
+    :param int workers: Number of processes. By default, it will be loaded from the
+        :ref:`system.cpu <options>` global option.
+    :param int batchsize: Number of decoys decoded together.
+
+    :return: :func:`list` of :class:`str` - the written files.
+
+    :raises:
+        :IOError: if ``silent`` cannot be found.
+        :KeyError: if any of the ``tags`` is not in the file.
+        :IOError: when trying to overwrite a PDB file if *system.overwrite* is
+            :py:data:`False`.
+    """
+    index = index_silent_file(silent)
+    tags = list(index['tags']) if tags is None else tags
+    tags = [tags] if isinstance(tags, six.string_types) else tags
+    missing = [t for t in tags if t not in index['tags']]
+    if len(missing) > 0:
+        raise KeyError("Decoys not found in {0}: {1}".format(silent, ",".join(missing)))
+
+    outdir = outdir if outdir is not None else core.get_option("system", "output")
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    prefix = prefix if prefix is not None else ''
+    outfiles = [os.path.join(outdir, '{0}{1}.pdb'.format(prefix, t)) for t in tags]
+    if not core.get_option("system", "overwrite"):
+        for outfile in outfiles:
+            if os.path.isfile(outfile):
+                raise IOError("Filename {0} already exists and cannot be overwrite.".format(outfile))
+
+    batches = [(silent, tags[i:i + batchsize], outfiles[i:i + batchsize])
+               for i in range(0, len(tags), batchsize)]
+    workers = workers if workers is not None else core.get_option("system", "cpu")
+    workers = min(max(int(workers), 1), len(batches))
+    if workers > 1:
+        pool = multiprocessing.Pool(workers)
+        try:
+            pool.map(_write_structures, batches)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for batch in batches:
+            _write_structures(batch)
+    return outfiles
+
+
+class SilentFileWatcher( object ):
+    """Follow silent files that are still being written.
+
+    Each call to :meth:`.poll` parses only the decoys completed since the previous
+    call and appends them to :attr:`data`. A decoy is considered complete once the
+    next one starts, as there is no other way to know that **Rosetta** has finished
+    writing it; the last decoy of each file is loaded when :meth:`.poll` is called
+    with ``complete=True``, when the jobs are over.
+
+    For each file, the position up to which it has been parsed is kept and only what
+    follows is read. For gzip files, the decompressor is kept between calls, together
+    with the data decompressed but not yet parsed, so that each call only decompresses
+    the bytes added since the previous one.
+
+    :param filename: file name, file pattern to search or list of files.
+    :type filename: Union[:class:`str`, :func:`list`]
+    :param description: Parsing rules. It can be a dictionary or the name of a
+        file containing it, as in :func:`.parse_rosetta_file`.
+    :type description: Union[:class:`str`, :class:`dict`]
+    :param bool multi: If :data:`True`, ``filename`` is a pattern and files matching it
+        that appear later on are also followed.
+    :param df: Data to which new decoys are appended.
+    :type df: :class:`.DesignFrame`
+
+    .. rubric:: Example
+
+    .. code-block:: python
+
+        watcher = SilentFileWatcher('run/output', multi=True)
+        while jobs_are_running():
+            new = watcher.poll()
+            time.sleep(60)
+        watcher.poll(complete=True)
+        df = watcher.data
+    """
+    def __init__( self, filename, description=None, multi=False, df=None ):
+        self.filename    = filename
+        self.multi       = multi
+        self.description = _file_vs_json( description )
+        self.offsets     = OrderedDict()
+        self.headers     = {}
+        self.streams     = {}
+        self.data        = df if df is not None else rc.DesignFrame()
+
+    def _files( self ):
+        try:
+            files = _gather_file_list( self.filename, self.multi )
+        except IOError:
+            if not self.multi:
+                raise
+            files = []
+        for f in sorted(files):
+            if f not in self.offsets and not f.endswith('.idx'):
+                self.offsets[f] = 0
+        return list(self.offsets)
+
+    def _read_new( self, filename, complete ):
+        """Read the completed decoys after the last parsed position.
+
+        :return: :class:`str`
+        """
+        offset = self.offsets[filename]
+        if filename in self.streams or _is_gzip(filename):
+            text = self._decompress_new(filename)
+        else:
+            with open(filename, 'rb') as fd:
+                fd.seek(offset)
+                text = fd.read()
+
+        last = text.rfind(b'\n') + 1
+        cut = last if complete else 0
+        if not complete:
+            for m in _BOUNDARY.finditer(text, 0, last):
+                fields = m.group(2).split()
+                if m.group(1) == b'SCORE:' and len(fields) > 0 and fields[-1] != b'description':
+                    cut = m.start()
+        self.offsets[filename] += cut
+        if filename in self.streams:
+            self.streams[filename][2] = text[cut:]
+        return text[:cut].decode('utf8')
+
+    def _decompress_new( self, filename ):
+        """Decompress the bytes added to a gzip file since the last call.
+
+        Partial members of files still being written are decompressed as far as possible.
+
+        :return: :class:`bytes` - the data not parsed yet.
+        """
+        cpos, dobj, pending = self.streams.setdefault(filename, [0, zlib.decompressobj(31), b''])
+        data = [pending]
+        with open(filename, 'rb') as fd:
+            fd.seek(cpos)
+            for chunk in iter(lambda: fd.read(_CHUNKSIZE), b''):
+                cpos += len(chunk)
+                while chunk:
+                    data.append(dobj.decompress(chunk))
+                    chunk = b''
+                    if dobj.eof:
+                        chunk = dobj.unused_data
+                        dobj = zlib.decompressobj(31)
+        self.streams[filename][:2] = [cpos, dobj]
+        return b''.join(data)
+
+    def poll( self, complete=False ):
+        """Parse the decoys completed since the last call.
+
+        :param bool complete: If :data:`True`, the files are assumed to be finished
+            and their last decoy is loaded too.
+
+        :return: :class:`.DesignFrame` with the new decoys.
+
+        :raises:
+            :IOError: if ``filename`` cannot be found (when ``multi=False``).
+        """
+        frames = []
+        for f in self._files():
+            text = self._read_new(f, complete)
+            if len(text) == 0:
+                continue
+            lines = self.headers.get(f, []) + text.splitlines(True)
+            for line in lines:
+                fields = line.split()
+                if len(fields) > 0 and fields[0] == 'SCORE:' and fields[-1] == 'description':
+                    self.headers[f] = [line]
+            manager = rc.Description(**copy.deepcopy(self.description))
+            df = rc.DesignFrame(next(_iter_rosetta_data(_filter_rosetta_lines(lines), manager)))
+            if df.shape[0] > 0:
+                df.add_source_file(f)
+                frames.append(df)
+
+        if len(frames) == 0:
+            return rc.DesignFrame()
+        new = pd.concat(frames, sort=False).reset_index(drop=True)
+        if self.data.shape[0] == 0:
+            self.data = new
+        else:
+            self.data = pd.concat([self.data, new], sort=False).reset_index(drop=True)
+        return new
@@ -36,6 +36,7 @@ from rstoolbox.analysis import binary_overlap, sequence_similarity
 from rstoolbox.analysis.SimilarityMatrix import SimilarityMatrix
 from rstoolbox.components import DesignFrame, DesignSeries, SequenceFrame
 from rstoolbox.components import get_selection
+from rstoolbox.components.designFrame import _decode_sequences, _symbol_codes, _SEQUENCE_SYMBOLS
 from rstoolbox.utils.getters import _check_column
 from rstoolbox.utils import discrete_cmap_from_colors, add_column
 from .color_schemes import color_scheme
@@ -264,18 +265,6 @@ def plot_alignment( df, seqID, ax, line_break=None, matrix=None ):
             does not have one.
         :KeyError: |reference_error|.
     """
-    def score(col, matrix):
-        if matrix is None:
-            return pd.Series([0 if _ == col.name else 1 for _ in col.values])
-        else:
-            data = []
-            for _ in col.values:
-                if _ == col.name:
-                    data.append(0)
-                else:
-                    data.append(1 if int(matrix.get_value(col.name, _)) >= 0 else -1)
-            return pd.Series(data)
-
     def chunks(l, n):
         """Yield successive n-sized chunks from l."""
         # https://stackoverflow.com/a/312464/2806632
@@ -297,17 +286,21 @@ def plot_alignment( df, seqID, ax, line_break=None, matrix=None ):
     if isinstance(pos, int):
         pos = list(range(pos, len(seq) + pos))
 
-    cname = _check_column(df, "sequence", seqID)
-    df = df[cname].apply(lambda x: pd.Series(list(x)))
-    df.columns = seq
+    _check_column(df, "sequence", seqID)
+    ref = _symbol_codes("".join(seq))
+    codes = df.get_sequence_matrix(seqID)
+    # Differences are 1; with a matrix, similar (1) and dissimilar (-1) residues.
+    scores = (codes != ref).astype(int)
     if matrix is not None:
         matrix = SimilarityMatrix.get_matrix(matrix)
-    ref = pd.DataFrame([seq])
-    ref.columns = seq
-    df = pd.concat([ref, df], ignore_index=True)
+        rows, cols = np.nonzero(scores)
+        pairs, pairidx = np.unique(ref[cols].astype(int) * 256 + codes[rows, cols], return_inverse=True)
+        values = [1 if int(matrix.get_value(_SEQUENCE_SYMBOLS[x // 256], _SEQUENCE_SYMBOLS[x % 256])) >= 0
+                  else -1 for x in pairs]
+        scores[rows, cols] = np.array(values, dtype=int)[pairidx]
+    df = pd.DataFrame(np.vstack([np.array(seq, dtype=object), _decode_sequences(codes)]), columns=seq)
     ids.insert(0, "reference")
-    df2 = df.apply(lambda col: score(col, matrix), axis=0)
-    df2.index = ids
+    df2 = pd.DataFrame(np.vstack([np.zeros((1, len(seq)), dtype=int), scores]), columns=seq, index=ids)
 
     if matrix is None:
         cmap = discrete_cmap_from_colors([(255.0 / 255, 255.0 / 255, 255.0 / 255),
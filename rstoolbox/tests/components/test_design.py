@@ -260,7 +260,22 @@ class TestDesign( object ):
         # Start test
         df = ri.parse_rosetta_file(self.silent1, sc_des)
         assert df.shape[0] == 6
-        df.get_sequence_with('B', [(1, 'T')]).shape[0] == 3
+        assert df.get_sequence_with('B', [(1, 'T')]).shape[0] == 3
+        assert df.get_sequence_with('B', [(1, 'T')], invert=True).shape[0] == 3
+        assert df.get_sequence_with('B', [(1, 'TK')]).shape[0] == 4
+        rules = [(1, 'T'), (2, 'R')]
+        assert df.get_sequence_with('B', rules).index.tolist() == [0]
+        assert df.get_sequence_with('B', rules, confidence=0.5).index.tolist() == [0, 2, 3, 5]
+        assert df.get_sequence_with('B', [rules, [(1, 'K')]]).index.tolist() == [0, 4]
+        assert df.get_sequence_with('B', [rules, [(1, 'K')]], invert=True).index.tolist() == [1, 2, 3, 5]
+        # single patterns with list-style rules
+        assert df.get_sequence_with('B', [[1, 'T']]).shape[0] == 3
+        assert df.get_sequence_with('B', [[1, 'T'], [2, 'R']]).index.tolist() == [0]
+        assert df.get_sequence_with('B', [[[1, 'T'], [2, 'R']], [[1, 'K']]]).index.tolist() == [0, 4]
+        with pytest.raises(ValueError):
+            df.get_sequence_with('B', [])
+        with pytest.raises(ValueError):
+            df.get_sequence_with('B', [rules, []])
 
     def test_split_values(self):
         # Start test
@@ -300,6 +315,42 @@ class TestDesign( object ):
         df = ru.split_dataframe_rows(df, ['a', 'b'])
         assert df.shape[0] == 6
 
+    def test_sequence_matrix(self):
+        df = ri.parse_rosetta_file(self.silent3, {'sequence': 'C', 'structure': 'C'})
+        matrix = df.get_sequence_matrix('C')
+        assert matrix.dtype == np.uint8
+        assert matrix.shape == (df.shape[0], len(df.iloc[0]['sequence_C']))
+        assert not matrix.flags.writeable
+        assert df.get_sequence_matrix('C') is matrix
+        assert df.get_sequence_matrix('C', 'structure') is not matrix
+
+        # Slices and edited data get their own matrix
+        sl = df.iloc[:5]
+        assert np.array_equal(sl.get_sequence_matrix('C'), matrix[:5])
+        assert df.get_sequence_matrix('C') is matrix
+        df2 = df.copy()
+        df2.at[0, 'sequence_C'] = 'A' * 10
+        matrix2 = df2.get_sequence_matrix('C')
+        assert matrix2 is not matrix
+        assert (matrix2[0, 10:] == 255).all()
+        assert np.array_equal(matrix2[1:], matrix[1:])
+
+        with pytest.raises(KeyError):
+            df.get_sequence_matrix('C', 'dihedrals')
+
+        # Symbols outside of the alphabet share the unknown code, whatever was read before
+        df2.at[0, 'sequence_C'] = u'A1A\u03b2'
+        df2.at[1, 'sequence_C'] = u'\u03b21'
+        matrix3 = df2.get_sequence_matrix('C')
+        assert matrix3[0, 1] == matrix3[0, 3] == matrix3[1, 0] == matrix3[1, 1] == 254
+        assert df2.get_sequence_matrix('C') is matrix3
+        df3 = df2.iloc[:2].copy()
+        df3.at[0, 'sequence_C'] = u'A#A\u03b1'
+        assert (df3.get_sequence_matrix('C') == matrix3[:2, :4]).all()
+        freqs = ra.sequential_frequencies(df2.iloc[:2], 'C')
+        assert freqs.loc[1, 'A'] == 0.5
+        assert freqs.loc[2, 'A'] == 0.0
+
     def test_clean_rosetta_suffix(self):
         # Start test
         df = ri.parse_rosetta_file(self.silent1)
@@ -307,6 +358,30 @@ class TestDesign( object ):
         assert len(df['description'].unique()) == df.shape[0]
         assert len(df2['description'].unique()) == 1
 
+    def test_compact(self):
+        sc_des = {'dihedrals': '*', 'sequence': '*'}
+        df = ri.parse_rosetta_file(self.silent4, sc_des)
+        dc = ri.parse_rosetta_file(self.silent4, sc_des, compact=True)
+        assert isinstance(dc, rc.DesignFrame)
+        assert dc.memory_usage(deep=True).sum() * 3 < df.memory_usage(deep=True).sum()
+        assert dc['description'].dtype.name == 'category'
+        assert dc['description'].tolist() == df['description'].tolist()
+        for c in [x for x in df.columns if df[x].dtype == np.float64]:
+            assert dc[c].dtype == np.float32
+            assert np.abs(dc[c].values - df[c].values).max() < 5e-4
+        phi = dc.get_phi('A')
+        assert phi.iloc[0].dtype == np.float32
+        assert phi.iloc[0].base is phi.iloc[-1].base
+        assert np.allclose(np.vstack(phi.values), np.vstack(df.get_phi('A').values))
+        assert dc.get_dihedrals('A').shape == (df.shape[0], 2)
+        assert df.compact()['sequence_A'].tolist() == df['sequence_A'].tolist()
+
+        # Values that would lose precision as float32 are kept.
+        df = rc.DesignFrame({'description': ['a', 'b'], 'big': [123456789.123, 1.0], 'n': [1, 2]})
+        dc = df.compact()
+        assert dc['big'].dtype == np.float64
+        assert dc['n'].dtype == np.int8
+
     @pytest.mark.mpl_image_compare(baseline_dir=baseline_test_dir(),
                                    filename='plot_global_preview.png')
     def test_global_preview(self):
@@ -695,6 +770,64 @@ class TestDesign( object ):
         assert dif2.equals(dif3)
         assert dif2.max().max() == 81
 
+        # Tiles, processes and alternative outputs
+        assert dif2.equals(df.sequence_distance('B', blocksize=2, workers=2))
+        assert df.iloc[:2].sequence_distance('B', df.iloc[3:]).equals(dif2.iloc[:2, 3:])
+        cond = df.sequence_distance('B', output='condensed', blocksize=4)
+        iu = np.triu_indices(df.shape[0], 1)
+        assert np.array_equal(cond, dif2.values[iu])
+        outfile = os.path.join(self.tmpdir, 'distances.npy')
+        assert np.array_equal(df.sequence_distance('B', output='condensed', filename=outfile), cond)
+        assert np.array_equal(np.load(outfile), cond)
+        top = df.sequence_distance('B', output='top', top=2, blocksize=3)
+        assert top.shape == (df.shape[0] * 2, 3)
+        for name, group in top.groupby('description', sort=False):
+            row = dif2.loc[name].drop(name)
+            assert group['distance'].tolist() == sorted(row.values)[:2]
+            assert name not in group['neighbor'].tolist()
+        blosum = df.sequence_distance('B', matrix='BLOSUM62')
+        assert (blosum.values <= dif2.values).all()
+        assert (np.diag(blosum.values) == 0).all()
+        with pytest.raises(ValueError):
+            df.sequence_distance('B', df, output='condensed')
+        with pytest.raises(ValueError):
+            df.sequence_distance('B', output='dense')
+
+    def test_cluster_sequences( self ):
+        sc_des  = {"scores": ["score", "description"], "sequence": "B"}
+        df = ri.parse_rosetta_file(self.silent1, sc_des)
+        dist = df.sequence_distance('B')
+        length = len(df.iloc[0]['sequence_B'])
+
+        for identity in [1, 0.5, 0.1, 0]:
+            dc = df.cluster_sequences('B', identity=identity)
+            assert dc.shape[0] == df.shape[0]
+            reps = dc[dc['representative_B']].sort_values('cluster_B')
+            assert reps['cluster_B'].tolist() == list(range(1, reps.shape[0] + 1))
+            assert reps['score'].is_monotonic_increasing
+            # Every decoy is close enough to its representative; representatives are not.
+            for _, row in dc.iterrows():
+                rep = reps[reps['cluster_B'] == row['cluster_B']].iloc[0]
+                assert dist.loc[row['description'], rep['description']] <= (1 - identity) * length
+            rdist = dist.loc[reps['description'], reps['description']].values
+            assert (rdist[np.triu_indices(reps.shape[0], 1)] > (1 - identity) * length).all()
+        assert df.cluster_sequences('B', identity=0)['cluster_B'].max() == 1
+
+        # Duplicated sequences share cluster; the best one is the representative.
+        dd = pd.concat([df, df.assign(score=df['score'] - 1)], ignore_index=True)
+        dd = dd.cluster_sequences('B', identity=1)
+        assert dd['cluster_B'].max() == df.shape[0]
+        assert dd['representative_B'].tolist() == [False] * df.shape[0] + [True] * df.shape[0]
+
+        # key_residues and score order
+        dk = df.cluster_sequences('B', key_residues='1-10', score=None)
+        assert dk.iloc[0]['representative_B']
+        assert dk['cluster_B'].max() <= df.cluster_sequences('B')['cluster_B'].max()
+        with pytest.raises(ValueError):
+            df.cluster_sequences('B', identity=1.2)
+        with pytest.raises(KeyError):
+            df.cluster_sequences('B', score='total_score')
+
     def test_sequence_similarities(self):
         refseq = "GSISDIRKDAEVRMDKAVEAFKNKLDKFKAAVRKVFPTEERIDMRPEIWIAQELRRIGDE" \
                  "FNAYRDANDKAAALGKDKEINWFDISQSLWDVQKLTDAAIKKIEAALADMEAWLTQ"
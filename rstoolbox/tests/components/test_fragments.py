@@ -8,6 +8,7 @@
 """
 # Standard Libraries
 import os
+import gzip
 from tempfile import NamedTemporaryFile
 
 # External Libraries
@@ -16,6 +17,7 @@ if os.environ.get('DISPLAY', '') == '':
     mpl.use('Agg')
 import matplotlib.pyplot as plt
 import pytest
+import pandas as pd
 
 # This Library
 from rstoolbox.io import parse_rosetta_fragments, write_rosetta_fragments
@@ -35,6 +37,75 @@ class TestFragments( object ):
         self.frag9 = os.path.join(self.dirpath, 'wauto.200.9mers.gz')
         self.frag9q = os.path.join(self.dirpath, 'wauto.200.9mers.qual.gz')
 
+    @pytest.fixture(autouse=True)
+    def setup( self, tmpdir ):
+        self.tmpdir = tmpdir.strpath
+
+    def test_fragment_formats( self ):
+        df3 = parse_rosetta_fragments(self.frag3)
+        df9 = parse_rosetta_fragments(self.frag9)
+        assert df3.shape == (33600, 11)
+        assert df3['size'].unique().tolist() == [3]
+        assert df3['neighbors'].unique().tolist() == [200]
+        assert df3['neighbor'].max() == 200
+
+        # Varying size fragment sets
+        mixed = os.path.join(self.tmpdir, 'mixed.frags')
+        with open(mixed, 'wb') as fd:
+            fd.write(gzip.open(self.frag3).read() + gzip.open(self.frag9).read())
+        df = parse_rosetta_fragments(mixed)
+        assert df.equals(pd.concat([df3, df9]).reset_index(drop=True))
+
+        # Old format
+        old = os.path.join(self.tmpdir, 'old.frags')
+        with open(old, 'w') as fd:
+            for frame, fdf in df3.groupby('frame'):
+                fd.write(' position: {:>12d} neighbors: {:>12d}\n\n'.format(frame, 200))
+                for _, ndf in fdf.groupby('neighbor'):
+                    for _, row in ndf.iterrows():
+                        fd.write(' {} A {:>5d} {} {} {:>8.3f} {:>8.3f} {:>8.3f}\n'.format(
+                                 row['pdb'], 1, row['aa'], row['sse'], row['phi'], row['psi'], row['omega']))
+                    fd.write('\n')
+        assert parse_rosetta_fragments(old).equals(df3)
+
+        # Non fixed-width lines
+        with open(old, 'w') as fd:
+            fd.write('FRAME 1 2\n 1 1 1abc BBTorsion A L -60.0 -40.0 180.0\n'
+                     ' 2 1 1abc BBTorsion A H -60.00 -40.0 180.0\n\n')
+        df = parse_rosetta_fragments(old)
+        assert df['phi'].tolist() == [-60.0, -60.0]
+        assert df['sse'].tolist() == ['L', 'H']
+        assert df['size'].tolist() == [2, 2]
+
+    def test_write_fragments( self ):
+        df = parse_rosetta_fragments(self.frag9)
+        prefix = os.path.join(self.tmpdir, 'frags')
+
+        # New format; lines have to be identical to those read
+        ofile = write_rosetta_fragments(df, prefix=prefix, strict=True)
+        assert os.path.basename(ofile) == 'frags.200.9mers'
+        with gzip.open(self.frag9) as fd:
+            lines = [x[16:] for x in fd.read().decode('utf8').splitlines()]
+        assert [x[16:] for x in open(ofile).read().splitlines()] == lines
+        assert parse_rosetta_fragments(ofile).drop(columns=['position']).equals(df.drop(columns=['position']))
+
+        zfile = write_rosetta_fragments(df, prefix=prefix, strict=True, compress=True)
+        assert zfile == ofile + '.gz'
+        assert gzip.open(zfile).read() == open(ofile, 'rb').read()
+
+        # Old format
+        ofile = write_rosetta_fragments(df, 9, 200, prefix)
+        assert parse_rosetta_fragments(ofile).equals(df)
+
+        # Values that do not fit the fixed-width columns are written as python would.
+        df = df.iloc[:18].copy()
+        df.loc[df.index[0], 'pdb'] = '1abcA'
+        df.loc[df.index[1], 'phi'] = 123456.0625
+        ofile = write_rosetta_fragments(df, 9, 2, prefix)
+        lines = open(ofile).read().splitlines()
+        assert lines[2].startswith(' 1abcA X     0 ')
+        assert lines[3].split()[5] == '123456.062'
+
     @pytest.mark.mpl_image_compare(baseline_dir=baseline_test_dir(),
                                    filename='plot_fragment_profiles.png')
     def test_quality_plot( self ):
@@ -124,6 +195,30 @@ class TestFragments( object ):
                 value = 1 - G.get_edge_data(origin, target)['weight']
                 assert matrix["R"].values[n] == pytest.approx(value)
 
+    def test_position_index( self ):
+        df = parse_rosetta_fragments(self.frag9)
+        positions, offsets, order = df._position_index()
+        assert df._position_index()[2] is order
+        assert list(positions) == sorted(df['position'].unique())
+        for i in [1, 25, positions[-1]]:
+            rows = order[offsets[i - 1]:offsets[i]]
+            assert df.iloc[rows]['aa'].tolist() == df[df['position'] == i]['aa'].tolist()
+
+        counts = df.make_sequence_matrix(frequency=True)
+        consensus = df.quick_consensus_sequence()
+        for i in [1, 25, positions[-1]]:
+            values = df[df['position'] == i]['aa']
+            assert counts.loc[i, 'A'] == pytest.approx((values == 'A').mean())
+            top = values.value_counts()
+            assert consensus[i - 1] == sorted(top[top == top.max()].index)[0]
+
+        # Changes in the data are picked up.
+        df.loc[df['position'] == 3, 'aa'] = 'W'
+        assert df.quick_consensus_sequence()[2] == 'W'
+        df['position'] = df['position'] + 1
+        assert df._position_index()[2] is not order
+        assert set(df._position_values('aa')[4]) == set(['W'])
+
     def test_concat_fragments( self ):
         # load fragments
         _3mers = parse_rosetta_fragments(self.frag3)
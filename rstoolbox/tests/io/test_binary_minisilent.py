@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+.. codeauthor:: Jaume Bonet <jaume.bonet@gmail.com>
+
+.. affiliation::
+    Laboratory of Protein Design and Immunoengineering <lpdi.epfl.ch>
+    Bruno Correia <bruno.correia@epfl.ch>
+"""
+# Standard Libraries
+import os
+
+# External Libraries
+import pytest
+import numpy as np
+import pandas as pd
+
+# This Library
+import rstoolbox.io as ri
+import rstoolbox.components as rc
+import rstoolbox.core as core
+
+
+class TestBinaryMinisilent( object ):
+    """
+    Test the binary minisilent round trip.
+    """
+
+    def setup_method( self, method ):
+        self.dirpath = os.path.join(os.path.dirname(__file__), '..', 'data')
+        self.silent1 = os.path.join(self.dirpath, 'input_2seq.minisilent.gz')
+        self.silent2 = os.path.join(self.dirpath, 'input_ssebig.minisilent.gz')
+
+    @pytest.fixture(autouse=True)
+    def setup( self, tmpdir ):
+        self.tmpdir = tmpdir.strpath
+
+    def test_round_trip( self ):
+        sc_des = {'sequence': '*', 'structure': '*', 'psipred': '*', 'dihedrals': '*'}
+        df = ri.parse_rosetta_file(self.silent2, sc_des)
+        df.add_reference_sequence('C', df.iloc[0]['sequence_C'])
+
+        for name in ['sse.bmini', 'sse.bmini.gz']:
+            binary = os.path.join(self.tmpdir, name)
+            ri.write_binary_minisilent(df, binary)
+            df2 = ri.parse_rosetta_file(binary)
+            assert isinstance(df2, rc.DesignFrame)
+            assert list(df2.columns) == list(df.columns)
+            assert df2.get_source_files() == df.get_source_files()
+            assert df2.get_reference_sequence('C') == df.get_reference_sequence('C')
+            for c in df.columns:
+                if c.startswith(('phi_', 'psi_')):
+                    assert df2[c].iloc[0].dtype == np.float32
+                    assert all([np.allclose(x, y, atol=1e-4) for x, y in zip(df[c], df2[c])])
+                else:
+                    assert df2[c].equals(df[c])
+
+        # Dihedrals of uncompressed files stay in the mapped file; scores are copied.
+        df2 = ri.read_binary_minisilent(os.path.join(self.tmpdir, 'sse.bmini'))
+        assert isinstance(df2['phi_C'].iloc[0], np.memmap)
+        assert not df2['phi_C'].iloc[0].flags.writeable
+        assert df2['score'].values.flags.writeable
+
+        core.set_option('system', 'overwrite', False)
+        try:
+            with pytest.raises(IOError):
+                ri.write_binary_minisilent(df, binary)
+        finally:
+            core.reset_option('system', 'overwrite')
+
+    def test_labels_and_missing( self ):
+        df = ri.parse_rosetta_file(self.silent1, {'labels': ['MOTIF', 'CONTACT'], 'sequence': 'AB'})
+        df = df.iloc[:3].reset_index(drop=True)
+        # Shifted and reversed selections, missing values
+        df.at[0, 'lbl_MOTIF'] = rc.SelectionContainer(('B', rc.Selection('3B-5B,9B')),
+                                                      ('A', ~rc.Selection([1, 2])))
+        df.at[1, 'lbl_CONTACT'] = np.nan
+        df.at[2, 'sequence_A'] = np.nan
+        df['description'] = df['description'].astype('category')
+
+        binary = os.path.join(self.tmpdir, 'labels.bmini')
+        ri.write_binary_minisilent(df, binary)
+        df2 = ri.read_binary_minisilent(binary)
+        assert df2['description'].tolist() == df['description'].tolist()
+        assert pd.isnull(df2.at[2, 'sequence_A'])
+        assert df2.at[1, 'sequence_A'] == df.at[1, 'sequence_A']
+        assert pd.isnull(df2.at[1, 'lbl_CONTACT'])
+        assert df2.at[0, 'lbl_MOTIF'] == df.at[0, 'lbl_MOTIF']
+        assert df2.at[0, 'lbl_MOTIF']['B'].is_shifted()
+        assert df2.at[0, 'lbl_MOTIF']['A'].to_list(5) == [3, 4, 5]
+        for c in ['lbl_MOTIF', 'lbl_CONTACT']:
+            assert [str(x) for x in df2[c]] == [str(x) for x in df[c]]
+
+        # Text and binary files together
+        df3 = ri.parse_rosetta_file([binary, self.silent1], {'sequence': 'AB'})
+        assert df3.shape[0] == 3 + 6
+        assert df3.get_source_files() == set([self.silent1])
+
+        with pytest.raises(ValueError):
+            ri.read_binary_minisilent(self.silent1)
+
+    def test_streaming_apis( self ):
+        df = ri.parse_rosetta_file(self.silent2, {'sequence': '*'})
+        df.add_reference_sequence('C', df.iloc[0]['sequence_C'])
+        binary = os.path.join(self.tmpdir, 'sse.bmini.gz')
+        ri.write_binary_minisilent(df, binary)
+
+        # Chunks of binary files, alone or with text files
+        chunks = list(ri.iter_rosetta_file(binary, chunksize=100))
+        assert [x.shape[0] for x in chunks] == [100] * (df.shape[0] // 100) + [df.shape[0] % 100]
+        assert all([isinstance(x, rc.DesignFrame) for x in chunks])
+        assert chunks[-1].get_reference_sequence('C') == df.get_reference_sequence('C')
+        assert chunks[-1].get_source_files() == df.get_source_files()
+        assert pd.concat(chunks).reset_index(drop=True).equals(df)
+        chunks = list(ri.iter_rosetta_file([self.silent1, binary], {'sequence': '*'}, chunksize=500))
+        assert [x.shape[0] for x in chunks] == [6, 500, df.shape[0] - 500]
+        assert chunks[0].get_source_files() == set([self.silent1])
+
+        # Binary files have no lines
+        with pytest.raises(ValueError):
+            next(ri.open_rosetta_file(binary))
+        with pytest.raises(ValueError):
+            list(ri.open_rosetta_file([self.silent1, binary]))
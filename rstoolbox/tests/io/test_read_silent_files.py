@@ -8,15 +8,23 @@
 """
 # Standard Libraries
 import os
+import sys
+import gzip
+import shutil
+import timeit
+import multiprocessing
+from collections import OrderedDict
 
 # External Libraries
 import six
 import pytest
+import numpy as np
 import pandas as pd
 
 # This Library
 import rstoolbox.io as ri
 import rstoolbox.components as rc
+import rstoolbox.core as core
 
 
 if six.PY3:
@@ -27,6 +35,37 @@ if six.PY3:
             return 1
 
 
+def _two_pass_scan( filename ):
+    """Scan of a silent file that looks for symmetry before reading it again."""
+    symm, counter = False, 0
+    fd = gzip.open(filename)
+    for line in fd:
+        line = line.decode('utf8')
+        if line.startswith('SYMMETRY_INFO'):
+            symm = True
+        if line.startswith('SCORE') and not line.strip().split()[-1] == "description":
+            counter += 1
+        if counter == 2:
+            break
+    fd.close()
+    fd = gzip.open(filename)
+    for line in fd:
+        line = line.decode('utf8')
+        if line.strip().split()[0].strip(":") in ri.rosetta._headers:
+            yield line, line.strip().split()[-1] == "description", 0, symm
+    fd.close()
+
+
+def _best_time( func, repeat=5 ):
+    """Best wall time of several runs of ``func``, to compare two implementations."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+# Benchmarks compare the timing of two implementations; they only run on demand.
+benchmark = pytest.mark.skipif(not os.environ.get('RSTOOLBOX_BENCHMARK'),
+                               reason='set RSTOOLBOX_BENCHMARK to run benchmarks')
+
+
 class TestReadSilentFiles( object ):
     """
     Test reading silent files.
@@ -59,6 +98,21 @@ class TestReadSilentFiles( object ):
                         "shape_int_area", "side1_normalized", "side1_score", "side2_normalized",
                         "side2_score", "time", "description"]
 
+    def big_symmetry_file( self, copies ):
+        """Build a bigger symmetric silent file out of :attr:`silent3`."""
+        with gzip.open(self.silent3) as fd:
+            lines = [x.decode('utf8') for x in fd]
+        bigfile = os.path.join(self.tmpdir, 'big_symmetry.minisilent.gz')
+        with gzip.open(bigfile, 'wb') as fd:
+            fd.write(lines[0].encode('utf8'))
+            for i in range(copies):
+                fd.write(''.join(lines[1:]).replace('_00001', '_{:05d}'.format(i)).encode('utf8'))
+        return bigfile
+
+    @pytest.fixture(autouse=True)
+    def setup( self, tmpdir ):
+        self.tmpdir = tmpdir.strpath
+
     def test_read_default( self ):
         """
         What do we pick when nothing is defined.
@@ -70,9 +124,124 @@ class TestReadSilentFiles( object ):
         assert df["score"].mean() == pytest.approx(-207.9, 0.2)
         assert df["packstat"].mean() == pytest.approx(0.59, 0.02)
 
+    def test_iter_chunks( self ):
+        """
+        Read a silent file in chunks of decoys.
+        """
+        sc_des = {"labels": ["MOTIF", "CONTACT", "CONTEXT"], "sequence": "AB"}
+        df = ri.parse_rosetta_file(self.silent1, sc_des)
+        chunks = list(ri.iter_rosetta_file(self.silent1, sc_des, chunksize=4))
+
+        assert [x.shape[0] for x in chunks] == [4, 2]
+        for chunk in chunks:
+            assert isinstance(chunk, rc.DesignFrame)
+            assert chunk.get_source_files() == df.get_source_files()
+            assert list(chunk.columns.values) == list(df.columns.values)
+        dfc = pd.concat(chunks).reset_index(drop=True)
+        assert dfc.get_source_files() == df.get_source_files()
+        assert dfc.drop(columns=["lbl_MOTIF", "lbl_CONTACT", "lbl_CONTEXT"]).equals(
+            df.drop(columns=["lbl_MOTIF", "lbl_CONTACT", "lbl_CONTEXT"]))
+        for lbl in ["lbl_MOTIF", "lbl_CONTACT", "lbl_CONTEXT"]:
+            assert [str(x) for x in dfc[lbl]] == [str(x) for x in df[lbl]]
+
+        with pytest.raises(ValueError):
+            next(ri.iter_rosetta_file(self.silent1, chunksize=0))
+
+    def test_read_multiple_workers( self ):
+        """
+        Parallel reading of multiple files matches the serial reading.
+        """
+        files = []
+        for i in range(3):
+            files.append(os.path.join(self.tmpdir, 'input_{}.minisilent.gz'.format(i)))
+            shutil.copy(self.silent1, files[-1])
+        sc_des = {"scores": ["score", "description"], "sequence": "*", "labels": ["MOTIF"]}
+        df1 = ri.parse_rosetta_file(files, sc_des, workers=1)
+        df2 = ri.parse_rosetta_file(files, sc_des, workers=3)
+
+        assert isinstance(df2, rc.DesignFrame)
+        assert df1.shape == df2.shape
+        assert list(df1.columns.values) == list(df2.columns.values)
+        assert list(df1["description"].values) == list(df2["description"].values)
+        assert df1.get_source_files() == df2.get_source_files()
+        assert df1.drop(columns=["lbl_MOTIF"]).equals(df2.drop(columns=["lbl_MOTIF"]))
+        assert [str(x) for x in df1["lbl_MOTIF"]] == [str(x) for x in df2["lbl_MOTIF"]]
+
+    def test_read_multiple_workers_headers( self ):
+        """
+        Parallel reading matches the serial reading with different headers
+        and files that depend on the header of the previous file.
+        """
+        silent5 = os.path.join(self.dirpath, 'input_ssebig.minisilent.gz')
+        noheader = os.path.join(self.tmpdir, 'noheader.minisilent')
+        with gzip.open(self.silent1, 'rt') as fd:
+            lines = fd.readlines()
+        with open(noheader, 'w') as fd:
+            fd.writelines([x for x in lines if not x.rstrip().endswith(' description')])
+        files = [self.silent1, silent5, self.silent1, noheader]
+        sc_des = {"sequence": "*"}
+        df1 = ri.parse_rosetta_file(files, sc_des, workers=1)
+        df2 = ri.parse_rosetta_file(files, sc_des, workers=3)
+
+        assert df1.equals(df2)
+        assert df1.get_source_files() == df2.get_source_files()
+        # columns that only exist in the second file stay with its decoys
+        assert df1["ALIGNRMSD"].iloc[:6].isnull().all()
+        assert df1["ALIGNRMSD"].iloc[-12:].isnull().all()
+        assert not df1["ALIGNRMSD"].iloc[6:-12].isnull().any()
+        assert df1.iloc[-6:].reset_index(drop=True).equals(df1.iloc[:6])
+
+    def test_read_multiple_workers_option( self, monkeypatch ):
+        """
+        The number of processes comes from the system.cpu option.
+        """
+        pools, pool = [], multiprocessing.Pool
+
+        class CountPool( object ):
+            def __init__( self, workers ):
+                pools.append(workers)
+                self.pool = pool(workers)
+
+            def __getattr__( self, name ):
+                return getattr(self.pool, name)
+
+        files = [self.silent1, self.silent1, self.silent1]
+        cpu = core.get_option("system", "cpu")
+        monkeypatch.setattr(ri.rosetta.multiprocessing, "Pool", CountPool)
+        try:
+            core.set_option("system", "cpu", 1)
+            df1 = ri.parse_rosetta_file(files)
+            assert pools == []
+            core.set_option("system", "cpu", 2)
+            df2 = ri.parse_rosetta_file(files)
+            assert pools == [2]
+        finally:
+            core.set_option("system", "cpu", cpu)
+        assert df1.equals(df2)
+
+        # A single file is never sent to a pool
+        ri.parse_rosetta_file(self.silent1, workers=3)
+        assert pools == [2]
+
     def test_read_json( self ):
         df = ri.parse_rosetta_json(self.jsonscr)
         assert df.shape == (88, 39)
+        assert list(df.columns)[-1] == 'description'
+        assert 'decoy' not in df
+        assert df['description'].iloc[0].endswith('_0001_0001')
+        assert df.get_source_files() == set([self.jsonscr])
+        assert df.drop(columns=['description']).dtypes.unique().tolist() == [np.float64]
+
+        # Chunked reading does not change the result
+        assert ri.parse_rosetta_json(self.jsonscr, chunksize=7).equals(df)
+
+        df2 = ri.parse_rosetta_json([self.jsonscr, self.jsonscr], columns=['BUNS', 'fa_atr'],
+                                    dtype={'BUNS': np.int64, 'fa_atr': np.float32})
+        assert list(df2.columns) == ['BUNS', 'fa_atr', 'description']
+        assert df2.shape[0] == 2 * df.shape[0]
+        assert df2['BUNS'].dtype == np.int64
+        assert df2['fa_atr'].dtype == np.float32
+        assert ri.parse_rosetta_json(self.jsonscr, dtype=np.float32)['fa_atr'].dtype == np.float32
 
     def test_read_pdb( self ):
         """
@@ -90,6 +259,17 @@ class TestReadSilentFiles( object ):
         assert df2.shape == (2, 24)
         assert 'label' in df2
 
+        # Batch reading, with gzipped files
+        files = [os.path.join(self.dirpath, 'INPUT_000{}.pdb'.format(x)) for x in range(1, 4)]
+        gzfile = os.path.join(self.tmpdir, 'INPUT_0002.pdb.gz')
+        with gzip.open(gzfile, 'wb') as fd:
+            fd.write(open(files[1], 'rb').read())
+        files[1] = gzfile
+        df3 = ri.parse_rosetta_pdbs(files, workers=2)
+        assert isinstance(df3, rc.DesignFrame)
+        assert df3.equals(df)
+        assert ri.parse_rosetta_pdbs(files, workers=1).equals(df)
+
     def test_read_score_and_complete( self ):
         """
         Read a score file and add sequences from the PDB.
@@ -250,6 +430,45 @@ class TestReadSilentFiles( object ):
         assert set(df.columns.values) == set(self.symhead + ["sequence_A", "sequence_B"])
         assert df.iloc[0]["sequence_A"] == df.iloc[0]["sequence_B"]
 
+    def test_symmetry_single_pass( self, monkeypatch ):
+        """
+        Symmetry is detected without re-reading the file; output matches the two-pass scan.
+        """
+        bigfile = self.big_symmetry_file(20)
+
+        opened = []
+        gzip_open = gzip.open
+
+        def counting_open( *args, **kwargs ):
+            opened.append(args[0])
+            return gzip_open(*args, **kwargs)
+        monkeypatch.setattr(ri.rosetta.gzip, 'open', counting_open)
+
+        old = list(_two_pass_scan(bigfile))
+        assert opened == [bigfile, bigfile]
+        del opened[:]
+        new = list(ri.open_rosetta_file(bigfile))
+        assert opened == [bigfile]
+
+        assert new == old
+        assert all([x[-1] for x in new])
+
+        # No symmetry is reported for files without it, even after a symmetric one.
+        data = list(ri.open_rosetta_file([self.silent3, self.silent1]))
+        assert all([x[-1] for x in data if x[2] == 0])
+        assert not any([x[-1] for x in data if x[2] == 1])
+
+    @benchmark
+    def test_symmetry_single_pass_benchmark( self ):
+        """
+        Reading a symmetric silent file once is not slower than the two-pass scan.
+        """
+        bigfile = self.big_symmetry_file(2000)
+        old = _best_time(lambda: list(_two_pass_scan(bigfile)))
+        new = _best_time(lambda: list(ri.open_rosetta_file(bigfile)))
+        sys.stdout.write('\ntwo-pass: {:.4f}s single-pass: {:.4f}s\n'.format(old, new))
+        assert new < old
+
     def test_motifgraft( self ):
         """
         Check reading from a 2-motif MotifGraftMover output with missing values.
@@ -264,6 +483,291 @@ class TestReadSilentFiles( object ):
         assert 'graft_scaffold_size_change01' in df.columns
         assert len(df.columns) == 45
 
+    def test_cache( self ):
+        """
+        Check that parsed data is loaded back from the cache.
+        """
+        core.set_option('cache', 'active', True)
+        core.set_option('cache', 'path', os.path.join(self.tmpdir, 'cache'))
+        try:
+            sc_des = {'graft_ranges': 2,
+                      'scores_missing': ['rama_per_res_filter'],
+                      'scores_ignore': ['graft_out_scaffold_ranges']}
+            df1 = ri.parse_rosetta_file(self.silent4, sc_des)
+            df2 = ri.parse_rosetta_file(self.silent4, sc_des)
+            assert len(os.listdir(os.path.join(self.tmpdir, 'cache'))) == 2
+            assert df1.equals(df2)
+
+            sc_des = {'labels': ['MOTIF', 'CONTACT', 'CONTEXT'], 'sequence': 'AB'}
+            df1 = ri.parse_rosetta_file(self.silent1, sc_des)
+            df1.add_reference_sequence('A', df1.iloc[0]['sequence_A'])
+            df2 = ri.parse_rosetta_file(self.silent1, sc_des)
+            assert df1.drop(columns=['lbl_MOTIF', 'lbl_CONTACT', 'lbl_CONTEXT']).equals(
+                df2.drop(columns=['lbl_MOTIF', 'lbl_CONTACT', 'lbl_CONTEXT']))
+            assert str(df1.iloc[0]['lbl_MOTIF']) == str(df2.iloc[0]['lbl_MOTIF'])
+            assert df2.get_source_files() == set([self.silent1])
+            assert len(os.listdir(os.path.join(self.tmpdir, 'cache'))) == 4
+            # Objects are stored without pickling them.
+            for f in os.listdir(os.path.join(self.tmpdir, 'cache')):
+                if f.endswith('.npz'):
+                    data = np.load(os.path.join(self.tmpdir, 'cache', f), allow_pickle=False)
+                    assert all([data[x].dtype != object for x in data.files])
+
+            # Different parsing rules do not reuse the data.
+            df3 = ri.parse_rosetta_file(self.silent1)
+            assert 'sequence_A' not in df3.columns
+            assert len(os.listdir(os.path.join(self.tmpdir, 'cache'))) == 6
+
+            # Columns mixing types cannot be stored without pickling them.
+            silent = os.path.join(self.tmpdir, 'mixed.minisilent')
+            with open(silent, 'w') as fd:
+                fd.write('SCORE: score value description\n')
+                fd.write('SCORE: -1.5 10 decoy_1\n')
+                fd.write('SCORE: -2 none decoy_2\n')
+            assert ri.parse_rosetta_file(silent)['value'].tolist() == [10, 'none']
+            assert len(os.listdir(os.path.join(self.tmpdir, 'cache'))) == 6
+
+            # Oldest entries are removed when over the limit.
+            core.set_option('cache', 'size', 0)
+            ri.parse_rosetta_file(self.silent2)
+            assert len(os.listdir(os.path.join(self.tmpdir, 'cache'))) == 0
+
+            core.set_option('cache', 'size', 1024)
+            ri.parse_rosetta_file(self.silent2)
+            ri.clear_rosetta_cache()
+            assert len(os.listdir(os.path.join(self.tmpdir, 'cache'))) == 0
+        finally:
+            core.reset_option('cache', 'active')
+            core.reset_option('cache', 'path')
+            core.reset_option('cache', 'size')
+
+    def test_column_typing( self ):
+        """
+        Check that typing whole columns matches typing each value.
+        """
+        from rstoolbox.io.rosetta import _check_type, _cast_column
+        np.random.seed(0)
+        ndecoys = 1000
+        columns = OrderedDict([('score{}'.format(i), ['{:.3f}'.format(x) for x in np.random.randn(ndecoys)])
+                               for i in range(10)])
+        columns['int'] = [str(x) for x in np.random.randint(0, 1000, ndecoys)]
+        columns['score3'][5] = np.nan
+        others = {'mixed': ['{:.1f}'.format(x) for x in np.random.randn(ndecoys)],
+                  'text': ['decoy_{}'.format(x) for x in range(ndecoys)]}
+        others['mixed'][10] = 'N/A'
+
+        # Score columns, which are most of the data.
+        old = pd.DataFrame(OrderedDict([(k, [_check_type(x) for x in v]) for k, v in columns.items()]))
+        new = pd.DataFrame(OrderedDict([(k, _cast_column(v)) for k, v in columns.items()]))
+        assert old.equals(new)
+        assert list(new.dtypes.astype(str)) == ['float64'] * 10 + ['int64']
+
+        # Columns that cannot be typed at once keep each value typed on its own.
+        old = pd.DataFrame({k: [_check_type(x) for x in v] for k, v in others.items()})
+        new = pd.DataFrame({k: _cast_column(v) for k, v in others.items()})
+        assert old.equals(new)
+        assert new['mixed'].iloc[10] == 'N/A'
+        assert isinstance(new['mixed'].iloc[0], float)
+
+        # Mixed types in a file
+        silent = os.path.join(self.tmpdir, 'mixed.minisilent')
+        with open(silent, 'w') as fd:
+            fd.write('SCORE: score value description\n')
+            fd.write('SCORE: -1.5 10 decoy_1\n')
+            fd.write('SCORE: -2 none decoy_2\n')
+            fd.write('SCORE: 3 5 decoy_3\n')
+        df = ri.parse_rosetta_file(silent, {'naming': ['', 'id']})
+        assert df['score'].dtype == np.float64
+        assert df['value'].tolist() == [10, 'none', 5]
+        assert df['id'].dtype == np.int64
+
+    @benchmark
+    def test_column_typing_benchmark( self ):
+        """
+        Typing whole columns is faster than typing each value.
+        """
+        from rstoolbox.io.rosetta import _check_type, _cast_column
+        np.random.seed(0)
+        columns = OrderedDict([('score{}'.format(i), ['{:.3f}'.format(x) for x in np.random.randn(50000)])
+                               for i in range(10)])
+
+        old = _best_time(lambda: pd.DataFrame(OrderedDict([(k, [_check_type(x) for x in v])
+                                                           for k, v in columns.items()])))
+        new = _best_time(lambda: pd.DataFrame(OrderedDict([(k, _cast_column(v))
+                                                           for k, v in columns.items()])))
+        sys.stdout.write('\nper value: {:.4f}s per column: {:.4f}s\n'.format(old, new))
+        assert new < old
+
+    def test_column_plan( self, monkeypatch ):
+        """
+        Check that score selection is decided once per header.
+        """
+        calls = []
+        wanted_score = rc.Description.wanted_score
+
+        def counted( self, score_name ):
+            calls.append(score_name)
+            return wanted_score(self, score_name)
+        monkeypatch.setattr(rc.Description, 'wanted_score', counted)
+
+        with gzip.open(self.silent3) as fd:
+            lines = [x.decode('utf8') for x in fd if x.startswith(b'SCORE')]
+        silent = os.path.join(self.tmpdir, 'many.minisilent')
+        with open(silent, 'w') as fd:
+            fd.write(lines[0])
+            for i in range(50):
+                fd.write(lines[1].replace(lines[1].split()[-1], 'decoy_{}'.format(i)))
+        lines = [x.split() for x in lines]
+        header = lines[0][1:]
+
+        sc_des = {'scores_by_residue': ['residue_ddg_'], 'scores_ignore': ['fa_*', 'time'],
+                  'scores_rename': {'score': 'total'}}
+        df = ri.parse_rosetta_file(silent, sc_des)
+        assert len(calls) < len(header) * 2
+        assert df.shape[0] == 50
+
+        assert 'total' in df.columns and 'score' not in df.columns
+        assert not any([x.startswith('fa_') for x in df.columns])
+        assert 'time' not in df.columns
+        residues = sorted([(int(h.split('_')[-1]), i) for i, h in enumerate(header)
+                           if h.startswith('residue_ddg_')])
+        assert df['residue_ddg_'].iloc[1] == [float(lines[1][i + 1]) for _, i in residues]
+
+    def test_filters( self, monkeypatch ):
+        """
+        Check that decoys are filtered while reading.
+        """
+        sc_des = {'labels': ['MOTIF', 'CONTACT', 'CONTEXT'], 'sequence': 'AB'}
+        df = ri.parse_rosetta_file(self.silent1, sc_des)
+        cutoff = df['score'].median()
+        prefix = df['description'].iloc[0][:-2]
+
+        calls = []
+        get_expected_sequences = rc.Description.get_expected_sequences
+
+        def counted( self, chains ):
+            calls.append(1)
+            return get_expected_sequences(self, chains)
+        monkeypatch.setattr(rc.Description, 'get_expected_sequences', counted)
+
+        sc_des['filters'] = [['score', '<', cutoff], ['description', 'startswith', prefix]]
+        dff = ri.parse_rosetta_file(self.silent1, sc_des)
+        expected = df[(df['score'] < cutoff) & (df['description'].str.startswith(prefix))]
+        assert dff.shape[0] == expected.shape[0] > 0
+        assert dff.drop(columns=['lbl_MOTIF', 'lbl_CONTACT', 'lbl_CONTEXT']).equals(
+            expected.drop(columns=['lbl_MOTIF', 'lbl_CONTACT', 'lbl_CONTEXT']).reset_index(drop=True))
+        assert [str(x) for x in dff['lbl_MOTIF']] == [str(x) for x in expected['lbl_MOTIF']]
+        assert len(calls) == dff.shape[0]
+
+        # Filters also apply to chunks.
+        chunks = list(ri.iter_rosetta_file(self.silent1, sc_des, chunksize=2))
+        assert pd.concat(chunks)['description'].tolist() == dff['description'].tolist()
+
+        with pytest.raises(AttributeError):
+            ri.parse_rosetta_file(self.silent1, {'filters': [['score', '~', 0]]})
+        with pytest.raises(AttributeError):
+            ri.parse_rosetta_file(self.silent1, {'filters': [['not_a_score', '<', 0]]})
+
+    def test_sequence_and_structure_batch( self ):
+        """
+        Check the batch dssp evaluation with a fake Rosetta executable.
+        """
+        reference = os.path.join(self.dirpath, '2pw9C.dssp.minisilent')
+        lines = open(reference).readlines()
+        pdbs = []
+        for name in ['first', 'second', 'third', 'fourth']:
+            pdbs.append(os.path.join(self.tmpdir, name + '.pdb'))
+            shutil.copy(os.path.join(self.dirpath, '2pw9C.pdb'), pdbs[-1])
+        shutil.copy(reference, os.path.join(self.tmpdir, 'second.dssp.minisilent'))
+
+        # Writes the reference output for each structure in the -l list.
+        exe = os.path.join(self.tmpdir, 'rosetta_scripts.fakerelease')
+        with open(exe, 'w') as fd:
+            fd.write('#!{}\n'.format(sys.executable))
+            fd.write('import os, sys\n')
+            fd.write('args = sys.argv[1:]\n')
+            fd.write('pdbs = open(args[args.index("-l") + 1]).read().split()\n')
+            fd.write('open(os.path.join({!r}, "calls"), "a").write(" ".join(pdbs) + "\\n")\n'.format(self.tmpdir))
+            fd.write('lines = {!r}\n'.format(lines))
+            fd.write('with open(args[args.index("-out:file:silent") + 1], "w") as fd:\n')
+            fd.write('    fd.write("".join(lines[:2]))\n')
+            fd.write('    for p in pdbs:\n')
+            fd.write('        tag = os.path.basename(p)[:-4] + "_0001"\n')
+            fd.write('        fd.write("".join([x.replace("2pw9C_0001", tag) for x in lines[2:]]))\n')
+        os.chmod(exe, 0o755)
+
+        core.set_option('rosetta', 'path', self.tmpdir)
+        core.set_option('rosetta', 'compilation', 'fakerelease')
+        try:
+            df = ri.get_sequences_and_structures(pdbs, workers=2, batchsize=2)
+            assert df['description'].tolist() == ['first_0001', '2pw9C_0001',
+                                                  'third_0001', 'fourth_0001']
+            assert len(set(df.get_sequence('C'))) == 1
+            assert len(set(df.get_structure('C'))) == 1
+            calls = sorted(open(os.path.join(self.tmpdir, 'calls')).read().splitlines())
+            assert calls == sorted([pdbs[0] + " " + pdbs[2], pdbs[3]])
+            for pdb in pdbs:
+                assert os.path.isfile(pdb[:-4] + '.dssp.minisilent')
+
+            # Everything is cached now.
+            os.unlink(os.path.join(self.tmpdir, 'calls'))
+            df2 = ri.get_sequence_and_structure(pdbs[0])
+            assert df2.shape[0] == 1
+            assert df2['description'].tolist() == ['first_0001']
+            assert not os.path.isfile(os.path.join(self.tmpdir, 'calls'))
+            assert not os.path.isfile('dssp.xml')
+
+            with pytest.raises(IOError):
+                ri.get_sequences_and_structures([os.path.join(self.tmpdir, 'none.pdb')])
+        finally:
+            core.reset_option('rosetta', 'path')
+            core.reset_option('rosetta', 'compilation')
+
+    def test_make_structures( self, monkeypatch, capsys ):
+        """
+        Check that decoys are extracted from the file that contains them.
+        """
+        files = [os.path.join(self.tmpdir, 'variants.silent.gz'),
+                 os.path.join(self.tmpdir, 'input_2seq.silent.gz')]
+        shutil.copy(os.path.join(self.dirpath, 'variants.silent.gz'), files[0])
+        shutil.copy(self.silent1, files[1])
+        df = ri.parse_rosetta_file(files)
+        df = df.iloc[[1, 2, 3, 5, 6, 7]]
+        open(os.path.join(self.tmpdir, 'extract_pdbs.fakerelease'), 'w').close()
+
+        calls = []
+
+        def fake_process( command ):
+            args = command.split()
+            tags = open(args[args.index('-in:file:tagfile') + 1]).read().split()
+            calls.append((args[args.index('-in:file:silent') + 1], tags))
+            return int(args[args.index('-in:file:silent') + 1] == files[0])
+        monkeypatch.setattr(ri.rosetta, 'execute_process', fake_process)
+
+        core.set_option('rosetta', 'path', self.tmpdir)
+        core.set_option('rosetta', 'compilation', 'fakerelease')
+        core.set_option('system', 'overwrite', True)
+        try:
+            outdir = os.path.join(self.tmpdir, 'pdbs')
+            failed = ri.make_structures(df, outdir=outdir, workers=2, shardsize=2)
+            tags = df['description'].tolist()
+            assert sorted(calls) == sorted([(files[0], tags[:2]), (files[1], tags[2:4]),
+                                            (files[1], tags[4:])])
+            assert failed == [files[0]]
+            out = capsys.readouterr().out
+            assert 'Finished 3 of 3 extractions' in out
+            assert 'Extraction of 2 decoys from {} has failed'.format(files[0]) in out
+            assert open(os.path.join(outdir, 'tags')).read().split() == tags
+
+            calls[:] = []
+            ri.make_structures(df.iloc[2:], outdir=outdir, keep_tagfile=False)
+            assert calls == [(files[1], tags[2:])]
+            assert not os.path.isfile(os.path.join(outdir, 'tags'))
+        finally:
+            core.reset_option('rosetta', 'path')
+            core.reset_option('rosetta', 'compilation')
+            core.reset_option('system', 'overwrite')
+
     def test_contacts( self ):
         """
         Check reading contact files.
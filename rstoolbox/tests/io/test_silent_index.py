@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+.. codeauthor:: Jaume Bonet <jaume.bonet@gmail.com>
+
+.. affiliation::
+    Laboratory of Protein Design and Immunoengineering <lpdi.epfl.ch>
+    Bruno Correia <bruno.correia@epfl.ch>
+"""
+# Standard Libraries
+import os
+import gzip
+import time
+import struct
+
+# External Libraries
+import pytest
+import numpy as np
+
+# This Library
+import rstoolbox.io as ri
+import rstoolbox.core as core
+
+
+class TestSilentIndex( object ):
+    """
+    Test random access to silent files.
+    """
+
+    def setup_method( self, method ):
+        self.dirpath = os.path.join(os.path.dirname(__file__), '..', 'data')
+        self.silent1 = os.path.join(self.dirpath, 'variants.silent.gz')
+        self.silent2 = os.path.join(self.dirpath, 'input_2seq.minisilent.gz')
+        self.pdb1 = os.path.join(self.dirpath, 'INPUT_0001.pdb')
+
+    @pytest.fixture(autouse=True)
+    def setup( self, tmpdir ):
+        self.tmpdir = tmpdir.strpath
+
+    def split_decoys( self, filename ):
+        """Reference split of a silent file into header and decoys.
+        """
+        with gzip.open(filename) as fd:
+            lines = fd.read().decode('utf8').splitlines(True)
+        header, decoys = '', []
+        for line in lines:
+            if line.startswith('SEQUENCE:') or line.rstrip().endswith(' description'):
+                header += line
+            elif len(decoys) == 0 and not line.startswith('SCORE:'):
+                header += line
+            elif line.startswith('SCORE:'):
+                decoys.append([line.split()[-1], line])
+            else:
+                decoys[-1][1] += line
+        return header, decoys
+
+    def test_plain_and_gzip( self ):
+        header, decoys = self.split_decoys(self.silent1)
+        tags = [decoys[2][0], decoys[0][0]]
+        expected = header + decoys[2][1] + decoys[0][1]
+
+        # Single member gzip
+        gzfile = os.path.join(self.tmpdir, 'single.silent.gz')
+        with open(gzfile, 'wb') as fd:
+            fd.write(open(self.silent1, 'rb').read())
+        index = ri.index_silent_file(gzfile)
+        assert list(index['tags']) == [d[0] for d in decoys]
+        assert len(index['points']) == 1
+        assert not os.path.isfile(gzfile + '.idx')
+        assert ri.fetch_decoys(gzfile, tags) == expected
+        assert ri.index_silent_file(gzfile, store=True) == index
+        assert os.path.isfile(gzfile + '.idx')
+
+        # One member per decoy
+        mmfile = os.path.join(self.tmpdir, 'multi.silent.gz')
+        for text in [header] + [d[1] for d in decoys]:
+            with gzip.open(mmfile, 'ab') as fd:
+                fd.write(text.encode('utf8'))
+        index = ri.index_silent_file(mmfile)
+        assert len(index['points']) == len(decoys) + 1
+        assert ri.fetch_decoys(mmfile, tags) == expected
+        assert ri.fetch_decoys(mmfile, decoys[-1][0]) == header + decoys[-1][1]
+
+        # Plain text
+        txfile = os.path.join(self.tmpdir, 'plain.silent')
+        with open(txfile, 'w') as fd:
+            fd.write(header + "".join([d[1] for d in decoys]))
+        assert ri.fetch_decoys(txfile, tags) == expected
+
+        with pytest.raises(KeyError):
+            ri.fetch_decoys(txfile, ['not_a_decoy'])
+
+        # A modified file is indexed again.
+        time.sleep(0.01)
+        with open(txfile, 'w') as fd:
+            fd.write(header + "".join([d[1] for d in decoys[:2]]))
+        assert len(ri.index_silent_file(txfile)['tags']) == 2
+
+    def test_single_member_checkpoints( self, monkeypatch ):
+        """
+        Single member gzip files are decompressed from the start only until
+        checkpoints of the file exist.
+        """
+        from rstoolbox.io import silent
+        header, decoys = self.split_decoys(self.silent1)
+        gzfile = os.path.join(self.tmpdir, 'big.silent.gz')
+        with gzip.open(gzfile, 'wb') as fd:
+            fd.write(header.encode('utf8'))
+            for i in range(50):
+                for tag, text in decoys:
+                    fd.write(text.replace(tag, '{0}_{1:03d}'.format(tag, i)).encode('utf8'))
+        last = '{0}_049'.format(decoys[-1][0])
+
+        monkeypatch.setattr(silent, '_CHUNKSIZE', 1024)
+        monkeypatch.setattr(silent, '_CHECKPOINT_SPACING', 1 << 14)
+        readed = []
+
+        class CountingFile( object ):
+            def __init__( self, fd ):
+                self.fd = fd
+
+            def read( self, size ):
+                data = self.fd.read(size)
+                readed.append(len(data))
+                return data
+
+            def __getattr__( self, name ):
+                return getattr(self.fd, name)
+
+        class CountingReader( silent._GzipSpanReader ):
+            def __init__( self, *args ):
+                super(CountingReader, self).__init__(*args)
+                self.fd = CountingFile(self.fd)
+        monkeypatch.setattr(silent, '_GzipSpanReader', CountingReader)
+
+        def fetch( index ):
+            del readed[:]
+            text = ri.fetch_decoys(gzfile, last, index)
+            assert text.endswith(decoys[-1][1].replace(decoys[-1][0], last))
+            return sum(readed)
+
+        index = ri.index_silent_file(gzfile)
+        assert len(index['points']) == 1
+        # Without checkpoints (as with a stored index in a new session), the whole file is read.
+        silent._CHECKPOINTS.clear()
+        assert fetch(index) >= os.path.getsize(gzfile) - 1024
+        # Checkpoints taken in the previous read allow to start close to the decoy.
+        assert fetch(index) < os.path.getsize(gzfile) / 10
+
+    def test_minisilent( self ):
+        header, decoys = self.split_decoys(self.silent2)
+        silent = os.path.join(self.tmpdir, 'input.minisilent.gz')
+        with open(silent, 'wb') as fd:
+            fd.write(open(self.silent2, 'rb').read())
+        index = ri.index_silent_file(silent)
+        assert len(index['tags']) == len(decoys)
+        assert ri.fetch_decoys(silent, decoys[3][0], index) == header + decoys[3][1]
+
+    def encode_pdb( self, pdbfile, tag ):
+        """Binary silent lines for a Rosetta PDB (inverse of the decoder).
+        """
+        letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+        three = {'ALA': 'A', 'CYS': 'C', 'ASP': 'D', 'GLU': 'E', 'PHE': 'F', 'GLY': 'G',
+                 'HIS': 'H', 'ILE': 'I', 'LYS': 'K', 'LEU': 'L', 'MET': 'M', 'ASN': 'N',
+                 'PRO': 'P', 'GLN': 'Q', 'ARG': 'R', 'SER': 'S', 'THR': 'T', 'VAL': 'V',
+                 'TRP': 'W', 'TYR': 'Y'}
+        residues, heavy = [], []
+        for line in open(pdbfile):
+            if not line.startswith('ATOM'):
+                continue
+            key = (line[21], int(line[22:26]), three[line[17:20]])
+            if len(residues) == 0 or residues[-1][0] != key:
+                residues.append([key, []])
+            xyz = [float(line[30:38]), float(line[38:46]), float(line[46:54])]
+            residues[-1][1].append(xyz)
+            if line[77] != 'H':
+                heavy.append([key[0], key[1], line[12:16].strip()] + xyz)
+        lines, sequence = [], ''
+        for i, ((chain, num, aa), xyz) in enumerate(residues):
+            data = struct.pack('<{}f'.format(len(xyz) * 3), *np.array(xyz).ravel())
+            text = aa
+            for j in range(0, len(data), 3):
+                v = data[j] | (data[j + 1] << 8) | (data[j + 2] << 16)
+                text += "".join([letters[(v >> k) & 63] for k in [0, 6, 12, 18]])
+            lines.append('{} {}\n'.format(text, tag))
+            last = i + 1 == len(residues) or residues[i + 1][0][0] != chain
+            sequence += aa + ('[{}:CtermProteinFull]'.format(aa) if last else '')
+        chains = [r[0][0] for r in residues]
+        resnum = ['{0}:{1}-{2}'.format(c, min(r[0][1] for r in residues if r[0][0] == c),
+                                       max(r[0][1] for r in residues if r[0][0] == c))
+                  for c in sorted(set(chains), key=chains.index)]
+        text = 'SCORE: 0.000 {0}\nREMARK BINARY SILENTFILE\nANNOTATED_SEQUENCE: {1} {0}\n' \
+               'RES_NUM {2} {0}\n'.format(tag, sequence, " ".join(resnum))
+        return text + "".join(lines), heavy
+
+    def test_binary_structures( self ):
+        text1, heavy = self.encode_pdb(self.pdb1, 'decoy_1')
+        text2, _ = self.encode_pdb(self.pdb1, 'decoy_2')
+        silent = os.path.join(self.tmpdir, 'binary.silent')
+        with open(silent, 'w') as fd:
+            fd.write('SEQUENCE: X\nSCORE: score description\n' + text1 + text2)
+
+        data = ri.read_silent_structures(silent)
+        assert list(data) == ['decoy_1', 'decoy_2']
+        df = data['decoy_2']
+        assert df.shape[0] == len(heavy)
+        assert df[['chain', 'resnum', 'atom']].values.tolist() == [h[:3] for h in heavy]
+        assert np.abs(df[['x', 'y', 'z']].values - np.array([h[3:] for h in heavy])).max() < 1e-3
+
+        outfiles = ri.write_silent_structures(silent, 'decoy_1', outdir=self.tmpdir)
+        pdb = [x for x in open(self.pdb1) if x.startswith('ATOM') and x[77] != 'H']
+        new = [x for x in open(outfiles[0]) if x.startswith('ATOM')]
+        assert [x[12:54] for x in new] == [x[12:54] for x in pdb]
+        core.set_option('system', 'overwrite', False)
+        try:
+            with pytest.raises(IOError):
+                ri.write_silent_structures(silent, 'decoy_1', outdir=self.tmpdir)
+        finally:
+            core.reset_option('system', 'overwrite')
+
+    def test_binary_fixture( self ):
+        """
+        Decode binary lines encoded from a Rosetta PDB, with all its atoms, by an
+        encoder independent from the library; coordinates must match the PDB.
+        """
+        silent = os.path.join(self.dirpath, 'input_binary.silent.gz')
+        heavy = []
+        for line in open(self.pdb1):
+            if line.startswith('ATOM') and line[21] == 'A' and line[77] != 'H':
+                heavy.append([line[21], int(line[22:26]), line[17:20], line[12:16].strip(),
+                              float(line[30:38]), float(line[38:46]), float(line[46:54])])
+
+        data = ri.read_silent_structures(silent)
+        assert list(data) == ['INPUT_0001']
+        df = data['INPUT_0001']
+        assert df.shape[0] == len(heavy)
+        assert df[['chain', 'resnum', 'atom']].values.tolist() == [h[:2] + h[3:4] for h in heavy]
+        assert df['resname'].tolist() == [h[2] for h in heavy]
+        assert np.abs(df[['x', 'y', 'z']].values - np.array([h[4:] for h in heavy])).max() < 1e-3
+
+    def test_protein_structures( self ):
+        silent = os.path.join(self.tmpdir, 'variants.silent.gz')
+        with open(silent, 'wb') as fd:
+            fd.write(open(self.silent1, 'rb').read())
+        with gzip.open(silent) as fd:
+            lines = [x.split() for x in fd.read().decode('utf8').splitlines()]
+        lines = [x for x in lines if len(x) == 13 and x[0].isdigit()]
+
+        data = ri.read_silent_structures(silent)
+        assert len(data) == 3
+        for tag, df in data.items():
+            ca = df[df['atom'] == 'CA'][['x', 'y', 'z']].values
+            assert ca.shape[0] == 273
+            assert list(df['chain'].unique()) == ['B', 'A']
+            stored = np.array([[float(v) for v in x[5:8]] for x in lines if x[-1] == tag])
+            assert np.linalg.norm(ca - stored, axis=1).mean() < 0.1
+
+            # Backbone geometry of the rebuilt residues.
+            xyz = dict([(a, df[df['atom'] == a][['x', 'y', 'z']].values) for a in ['N', 'CA', 'C', 'O']])
+            assert np.allclose(np.linalg.norm(xyz['N'] - xyz['CA'], axis=1), 1.458, atol=1e-3)
+            assert np.allclose(np.linalg.norm(xyz['CA'] - xyz['C'], axis=1), 1.523, atol=1e-3)
+            assert np.allclose(np.linalg.norm(xyz['C'] - xyz['O'], axis=1), 1.231, atol=1e-3)
+            chains = df[df['atom'] == 'CA']['chain'].values
+            same = chains[:-1] == chains[1:]
+            peptide = np.linalg.norm(xyz['C'][:-1] - xyz['N'][1:], axis=1)[same]
+            assert np.abs(np.median(peptide) - 1.329) < 0.01
+            assert np.abs(peptide - 1.329).max() < 0.2
+
+        outdir = os.path.join(self.tmpdir, 'pdbs')
+        outfiles = ri.write_silent_structures(silent, outdir=outdir, prefix='bb_',
+                                              workers=2, batchsize=2)
+        assert [os.path.basename(f) for f in outfiles] == ['bb_' + t + '.pdb' for t in data]
+        assert all([os.path.isfile(f) for f in outfiles])
+
+    def test_watcher( self ):
+        with gzip.open(self.silent2) as fd:
+            text = fd.read().decode('utf8')
+        lines = text.splitlines(True)
+        starts = [i for i, x in enumerate(lines)
+                  if x.startswith('SCORE:') and not x.rstrip().endswith('description')]
+        sc_des = {'sequence': 'AB'}
+        expected = ri.parse_rosetta_file(self.silent2, sc_des)
+
+        silent = os.path.join(self.tmpdir, 'run_1.silent')
+        watcher = ri.SilentFileWatcher(os.path.join(self.tmpdir, 'run_'), sc_des, multi=True)
+        assert watcher.poll().shape[0] == 0
+
+        # Header, two decoys and half a line of the third
+        with open(silent, 'w') as fd:
+            fd.write("".join(lines[:starts[2] + 1]) + lines[starts[2] + 1][:10])
+        new = watcher.poll()
+        assert new['description'].tolist() == expected['description'].tolist()[:2]
+        assert new.get_source_files() == set([silent])
+
+        with open(silent, 'w') as fd:
+            fd.write(text)
+        # The last decoy cannot be known to be finished yet.
+        new = watcher.poll()
+        assert new.shape[0] == len(starts) - 3
+        assert watcher.poll().shape[0] == 0
+
+        # A new file under the pattern
+        with gzip.open(os.path.join(self.tmpdir, 'run_2.silent.gz'), 'wb') as fd:
+            fd.write("".join(lines[:starts[3]]).encode('utf8'))
+        assert watcher.poll().shape[0] == 2
+
+        new = watcher.poll(complete=True)
+        assert new.shape[0] == 2
+        df = watcher.data
+        assert df.shape[0] == expected.shape[0] + 3
+        assert sorted(df['description']) == sorted(expected['description'].tolist() +
+                                                   expected['description'].tolist()[:3])
+        # Both files hold the same decoys; files are polled independently.
+        df = df.drop_duplicates('description').sort_values('description').reset_index(drop=True)
+        assert df.equals(expected.sort_values('description').reset_index(drop=True))
+
+    def test_watcher_gzip_stream( self ):
+        with gzip.open(self.silent2) as fd:
+            text = fd.read().decode('utf8')
+        lines = text.splitlines(True)
+        starts = [i for i, x in enumerate(lines)
+                  if x.startswith('SCORE:') and not x.rstrip().endswith('description')]
+        expected = ri.parse_rosetta_file(self.silent2)
+
+        # A single gzip member still being written.
+        silent = os.path.join(self.tmpdir, 'stream.silent.gz')
+        raw = open(silent, 'wb')
+        fd = gzip.GzipFile(fileobj=raw, mode='wb')
+        watcher = ri.SilentFileWatcher(silent)
+        parts = [lines[:starts[2] + 1], lines[starts[2] + 1:starts[4]], lines[starts[4]:]]
+        for part in parts:
+            fd.write("".join(part).encode('utf8'))
+            fd.flush()
+            raw.flush()
+            watcher.poll()
+            # Decompression resumes where the previous poll stopped.
+            assert watcher.streams[silent][0] == os.path.getsize(silent)
+        fd.close()
+        raw.close()
+        watcher.poll(complete=True)
+        assert watcher.streams[silent][0] == os.path.getsize(silent)
+        assert watcher.data.equals(expected)
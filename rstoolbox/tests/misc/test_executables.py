@@ -8,12 +8,15 @@
 """
 # Standard Libraries
 import os
+import gzip
+import shutil
 from argparse import Namespace
 
 # External Libraries
 import pytest
 
 # This Library
+from rstoolbox.io import parse_rosetta_file, open_rosetta_file
 from rstoolbox.bin.minisilent import main as minisilent_main
 from rstoolbox.bin.rename_decoys import main as rename_main
 from rstoolbox.bin.check_mutants import main as check_mutants_main
@@ -52,6 +55,45 @@ class TestExecutables( object ):
                             ofile=os.path.join(self.tmpdir, "minisilent.sc"))
         minisilent_main(options)
 
+    def test_exe_minisilent_parallel(self):
+        files = []
+        for i in range(3):
+            files.append(os.path.join(self.tmpdir, "input_{}.silent.gz".format(i)))
+            shutil.copy(self.silent1, files[-1])
+        expected = "".join([x[0] for x in open_rosetta_file(files, True, check_symmetry=False)])
+
+        # Merged output matches the sequential one
+        options = Namespace(ifile=None, ifiles=files, force=False, workers=3,
+                            ofile=os.path.join(self.tmpdir, "merged.minisilent"))
+        counts = minisilent_main(options)
+        assert counts == {'decoys': 18, 'skipped': 0}
+        assert open(options.ofile).read() == expected
+
+        # Deduplicated tags and a selection of remarks
+        options = Namespace(ifile=None, ifiles=files, force=False, workers=2, unique=True,
+                            remarks=['LABELS'], ofile=os.path.join(self.tmpdir, "unique.gz"))
+        counts = minisilent_main(options)
+        assert counts == {'decoys': 6, 'skipped': 12}
+        df = parse_rosetta_file(options.ofile, {'labels': ['MOTIF']})
+        assert df.shape[0] == 6
+        assert df['description'].tolist() == parse_rosetta_file(self.silent1)['description'].tolist()
+        with gzip.open(options.ofile) as fd:
+            remarks = set([x.split()[1] for x in fd.read().decode('utf8').splitlines() if x.startswith('REMARK')])
+        assert remarks == set(['LABELS'])
+
+        # One output per input file
+        odir = os.path.join(self.tmpdir, 'compact')
+        options = Namespace(ifile=None, ifiles=files, force=False, ofile=None, odir=odir, workers=2)
+        counts = minisilent_main(options)
+        assert counts == {'decoys': 18, 'skipped': 0}
+        outputs = sorted(os.listdir(odir))
+        assert outputs == ['input_{}.minisilent.gz'.format(i) for i in range(3)]
+        with gzip.open(os.path.join(odir, outputs[0])) as fd:
+            assert fd.read().decode('utf8') == \
+                "".join([x[0] for x in open_rosetta_file(files[0], check_symmetry=False)])
+        with pytest.raises(IOError):
+            minisilent_main(options)
+
     def test_exe_rename_gz(self):
         options = Namespace(ifile=self.silent1, prefix='test', force=False,
                             ofile=os.path.join(self.tmpdir, "renamed.gz"))
@@ -61,6 +103,21 @@ class TestExecutables( object ):
         options = Namespace(ifile=self.silent1, prefix='test', force=False,
                             ofile=os.path.join(self.tmpdir, "renamed.sc"))
         rename_main(options)
+        df1 = parse_rosetta_file(self.silent1)
+        df2 = parse_rosetta_file(options.ofile)
+        assert df2['description'].tolist() == ['test_{0:05d}'.format(i + 1) for i in range(df1.shape[0])]
+        assert df1.drop(columns=['description']).equals(df2.drop(columns=['description']))
+
+        # Only the trailing description changes; re-reading the gzipped output matches.
+        names = dict(zip(df1['description'], df2['description']))
+        with gzip.open(self.silent1) as fd:
+            lines = fd.read().decode('utf8').splitlines()
+        for old, new in zip(lines, open(options.ofile).read().splitlines()):
+            head, tag = old.rsplit(' ', 1)
+            assert new == head + ' ' + names.get(tag, tag)
+        options.ifile, options.ofile = options.ofile, os.path.join(self.tmpdir, "renamed2.gz")
+        rename_main(options)
+        assert parse_rosetta_file(options.ofile).equals(df2)
 
     @pytest.mark.mpl_image_compare(baseline_dir=baseline_test_dir(),
                                    filename='plot_exe_check_mutants_logo.png')
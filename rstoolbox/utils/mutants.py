@@ -181,9 +181,27 @@ def identify_mutants( self, seqID ):
     mcounts = "mutant_count_{0}".format(seqID)
     df = self.copy()
     if isinstance(self, pd.DataFrame):
-        df[[mutants, mposits, mcounts]] = df.apply(
-            lambda row: mutations(refseq, row, seqID),
-            axis=1, result_type="expand" )
+        from rstoolbox.components.designFrame import _SEQUENCE_UPPER, _SEQUENCE_PAD
+        from rstoolbox.components.designFrame import _decode_sequences, _symbol_codes
+
+        matrix = _SEQUENCE_UPPER[self.get_sequence_matrix(seqID)]
+        if ((matrix != _SEQUENCE_PAD).sum(1) != len(refseq)).any():
+            raise ValueError("Sequence lengths do not match")
+        matrix = matrix.reshape(len(matrix), len(refseq))
+        refupp = refseq.upper()
+        refcod = _SEQUENCE_UPPER[_symbol_codes(refseq)]
+        rows, cols = np.nonzero(matrix != refcod)
+        letter = _decode_sequences(matrix[rows, cols].reshape(1, -1))[0]
+        shifts = [str(get_selection(i + 1, seqID, self.get_reference_shift(seqID))[0])
+                  for i in range(len(refseq))]
+        data = [[] for _ in range(len(matrix))]
+        datn = [[] for _ in range(len(matrix))]
+        for i, j, aa in zip(rows, cols, letter):
+            data[i].append(refupp[j] + shifts[j] + aa)
+            datn[i].append(shifts[j])
+        df[mutants] = [",".join(x) for x in data]
+        df[mposits] = [",".join(x) for x in datn]
+        df[mcounts] = [len(x) for x in data]
     elif isinstance(df, pd.Series):
         a, b, c = mutations(refseq, df, seqID)
         df[mutants], df[mposits], df[mcounts] = a, b, c
@@ -815,6 +833,8 @@ def view_mutants_alignment( self, seqID, mutants_bg_color="IndianRed", mutants_t
     :raise:
         :KeyError: |reference_error|.
     """
+    from rstoolbox.components.designFrame import _decode_sequences
+
     if not self.has_reference_sequence(seqID):
         raise KeyError("A reference sequence for {} is needed.".format(seqID))
 
@@ -838,9 +858,9 @@ def view_mutants_alignment( self, seqID, mutants_bg_color="IndianRed", mutants_t
     else:
         df = self.copy()
 
-    df = df[_check_column(df, "sequence", seqID)].apply(lambda x: pd.Series(list(x)))
-    df.columns = cols
-    df.index = self["description"].values
+    _check_column(df, "sequence", seqID)
+    df = pd.DataFrame(_decode_sequences(self.get_sequence_matrix(seqID)),
+                      columns=cols, index=self["description"].values)
 
     return df.style.set_caption('sequence alignment') \
              .set_table_attributes('class="dataframe"') \